@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Preparação do áudio antes do reconhecimento.
+
+O microfone entrega a taxa e a largura de amostra do dispositivo (muitas vezes
+44,1/48 kHz). Antes do envio o áudio é:
+- recortado (silêncio no início e no fim, pela energia dos quadros do vad.py)
+- convertido para mono 16 bits e reamostrado para no máximo 16 kHz
+- codificado em FLAC numa thread em segundo plano
+
+O resultado é um PreparedAudio (AudioData do SpeechRecognition) cujo
+get_flac_data devolve o FLAC já codificado, de modo que qualquer reconhecedor
+(inclusive recognize_google) reaproveita a codificação.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import speech_recognition as sr
+
+import vad
+
+TARGET_RATE = 16000
+
+# Margem mantida antes e depois da fala ao recortar o silêncio (ms)
+TRIM_MARGIN_MS = 100
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Thread única de codificação, criada no primeiro uso
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='flac-encoder')
+        return _executor
+
+
+class PreparedAudio(sr.AudioData):
+    """
+    AudioData com o FLAC sendo codificado em segundo plano
+    """
+
+    def __init__(self, frame_data, sample_rate, sample_width):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self.encode_ms = None
+        self.flac = get_executor().submit(self._encode)
+
+    def _encode(self):
+        start = time.perf_counter()
+        try:
+            return super().get_flac_data()
+        finally:
+            self.encode_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        if convert_rate in (None, self.sample_rate) and convert_width in (None, self.sample_width):
+            return self.flac.result()
+        return super().get_flac_data(convert_rate, convert_width)
+
+
+def to_int16(frame_data, sample_width):
+    """
+    Amostras PCM (1 a 4 bytes, little-endian) como int16
+    """
+    if sample_width == 2:
+        return np.frombuffer(frame_data, dtype='<i2')
+    if sample_width == 1:
+        # WAV de 8 bits é sem sinal
+        return ((np.frombuffer(frame_data, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(np.int16)
+    if sample_width == 3:
+        raw = np.frombuffer(frame_data, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        return (padded.view('<i4').ravel() >> 16).astype(np.int16)
+    if sample_width == 4:
+        return (np.frombuffer(frame_data, dtype='<i4') >> 16).astype(np.int16)
+    raise ValueError(f"Largura de amostra não suportada: {sample_width}")
+
+
+def resample(samples, rate, target=TARGET_RATE):
+    """
+    Reduz a taxa de amostragem (nunca aumenta). Múltiplos inteiros usam média
+    por grupo; outras taxas, média móvel (passa-baixa) e interpolação linear.
+    """
+    if rate <= target or not len(samples):
+        return samples, rate
+    if rate % target == 0:
+        factor = rate // target
+        usable = len(samples) - len(samples) % factor
+        reduced = samples[:usable].reshape(-1, factor).astype(np.float32).mean(axis=1)
+    else:
+        width = int(np.ceil(rate / target))
+        smoothed = np.convolve(samples.astype(np.float32), np.full(width, 1.0 / width), mode='same')
+        positions = np.arange(int(len(samples) * target / rate)) * (rate / target)
+        reduced = np.interp(positions, np.arange(len(samples)), smoothed)
+    return np.clip(np.round(reduced), -32768, 32767).astype(np.int16), target
+
+
+def trim_silence(samples, rate, margin_ms=TRIM_MARGIN_MS, energy_ratio=3.0):
+    """
+    Remove silêncio no início e no fim; sem nenhum quadro de fala, devolve tudo
+    """
+    frame_length = int(rate * vad.FRAME_MS / 1000)
+    energy, _ = vad.frame_features(samples, frame_length)
+    if not len(energy):
+        return samples
+    threshold = max(vad.MIN_ENERGY, float(np.percentile(energy, 10)) * energy_ratio)
+    voiced = np.flatnonzero(energy > threshold)
+    if not len(voiced):
+        return samples
+    margin = int(rate * margin_ms / 1000)
+    start = max(0, voiced[0] * frame_length - margin)
+    end = min(len(samples), (voiced[-1] + 1) * frame_length + margin)
+    return samples[start:end]
+
+
+def prepare(audio, trim=True):
+    """
+    Recorta, converte e reamostra o AudioData e inicia a codificação FLAC.
+    Retorna (PreparedAudio, info) com bytes_before (PCM original),
+    bytes_pcm (PCM preparado), sample_rate e preprocess_ms; bytes_after e
+    encode_ms vêm de finish(audio, info) depois do envio.
+    """
+    start = time.perf_counter()
+    samples = to_int16(audio.frame_data, audio.sample_width)
+    rate = audio.sample_rate
+    if trim:
+        samples = trim_silence(samples, rate)
+    samples, rate = resample(samples, rate)
+    prepared = PreparedAudio(samples.astype('<i2').tobytes(), rate, 2)
+    info = {
+        "bytes_before": len(audio.frame_data),
+        "bytes_pcm": len(prepared.frame_data),
+        "sample_rate_before": audio.sample_rate,
+        "sample_rate": rate,
+        "preprocess_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    return prepared, info
+
+
+def finish(audio, info):
+    """
+    Completa info com o tamanho do FLAC e o tempo de codificação
+    """
+    if not isinstance(audio, PreparedAudio):
+        return info
+    try:
+        info["bytes_after"] = len(audio.flac.result())
+    except Exception:
+        return info
+    info["encode_ms"] = audio.encode_ms
+    if info.get("bytes_before"):
+        info["ratio"] = round(info["bytes_after"] / info["bytes_before"], 3)
+    return info
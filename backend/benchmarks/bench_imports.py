@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de tempo de import e de inicialização dos scripts.
+
+Executa cada ponto de entrada com `python -X importtime`, soma o custo dos
+imports atribuíveis ao script (descontando os imports do próprio interpretador)
+e mede o tempo total do processo. Os orçamentos de ENTRY_POINTS são múltiplos
+do custo de `import json` (que quase todo script faz), medido na mesma
+execução: assim a comparação não depende da velocidade da máquina nem do
+disco. Falha (código 1) se algum ponto de entrada passar do orçamento.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_imports.py [--repeat 5] [--all] [--no-budget]
+
+--all inclui ações com efeitos colaterais (abrir apps, mudar volume, capturar tela).
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Referência dos orçamentos, medida em toda execução
+REFERENCE = ('import json', ['-c', 'import json'])
+
+# (nome, argumentos do interpretador, orçamento de import em múltiplos da
+# referência, seguro para rodar). Ações que só validam argumentos ou importam
+# o módulo não devem carregar pyautogui/pygetwindow/psutil/speech_recognition.
+ENTRY_POINTS = [
+    ('open_app (import)', ['-c', 'import open_app'], 3.5, True),
+    ('open_app (uso)', ['scripts/open_app.py'], 3.5, True),
+    ('open_app <app>', ['scripts/open_app.py', 'notepad'], 55, False),
+    ('volume_control (import)', ['-c', 'import volume_control'], 2, True),
+    ('volume_control (uso)', ['scripts/volume_control.py'], 2, True),
+    ('volume_control up', ['scripts/volume_control.py', 'up'], 40, False),
+    ('volume_control get', ['scripts/volume_control.py', 'get'], 6, False),
+    ('screenshot (import)', ['-c', 'import screenshot'], 5.5, True),
+    ('screenshot', ['scripts/screenshot.py'], 70, False),
+    ('screenshot_advanced (import)', ['-c', 'import screenshot_advanced'], 3.5, True),
+    ('screenshot_advanced list_windows', ['scripts/screenshot_advanced.py', 'list_windows'], 17, True),
+    ('screenshot_advanced screenshot', ['scripts/screenshot_advanced.py', 'screenshot', 'full', '', '', 'true', 'false'], 70, False),
+    ('focus_window (import)', ['-c', 'import focus_window'], 3.5, True),
+    ('focus_window list_windows', ['scripts/focus_window.py', 'list_windows'], 17, True),
+    ('list_windows', ['scripts/list_windows.py'], 20, True),
+    ('close_window (import)', ['-c', 'import close_window'], 2, True),
+    ('run_command (import)', ['-c', 'import run_command'], 5.5, True),
+    ('run_command <cmd>', ['scripts/run_command.py', 'echo ok'], 5.5, True),
+    ('voice_recognition (import)', ['-c', 'import voice_recognition'], 3.5, True),
+    ('voice_recognition', ['voice_recognition.py', '1'], 55, False),
+]
+
+
+def parse_importtime(stderr):
+    """
+    Soma o tempo cumulativo (µs) dos imports de primeiro nível de uma saída -X importtime
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, raw_name = line.split('|', 2)
+        try:
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        # Imports de primeiro nível têm exatamente um espaço antes do nome
+        if raw_name.startswith(' ') and not raw_name.startswith('  '):
+            modules[raw_name.strip()] = cumulative
+    return modules
+
+
+def measure(args, env):
+    """
+    Executa o interpretador uma vez e devolve (imports {módulo: µs}, tempo total em s)
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                               cwd=BACKEND_DIR, env=env, capture_output=True,
+                               text=True, encoding='utf-8', errors='replace')
+    elapsed = time.perf_counter() - start
+    return parse_importtime(completed.stderr), elapsed
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--all', action='store_true', help="incluir ações com efeitos colaterais")
+    parser.add_argument('--no-budget', action='store_true', help="apenas reportar, sem falhar")
+    options = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.join(BACKEND_DIR, 'scripts'),
+                                                      BACKEND_DIR, env.get('PYTHONPATH')]))
+    env['PYTHONIOENCODING'] = 'utf-8'
+
+    # Imports feitos pelo interpretador antes de qualquer script (site, encodings...)
+    baseline_modules, _ = measure(['-c', 'pass'], env)
+
+    def sample(args):
+        """
+        Medianas (imports em ms, total em ms) e os imports mais pesados
+        """
+        import_samples = []
+        wall_samples = []
+        heaviest = {}
+        for _ in range(options.repeat):
+            modules, elapsed = measure(args, env)
+            own = {m: us for m, us in modules.items() if m not in baseline_modules}
+            import_samples.append(sum(own.values()) / 1000)
+            wall_samples.append(elapsed * 1000)
+            heaviest = own
+        return (statistics.median(import_samples), statistics.median(wall_samples),
+                sorted(heaviest.items(), key=lambda item: -item[1])[:3])
+
+    reference_ms, _, _ = sample(REFERENCE[1])
+
+    results = []
+    for name, args, budget, safe in ENTRY_POINTS:
+        if not safe and not options.all:
+            continue
+
+        import_ms, wall_ms, heaviest = sample(args)
+        budget_ms = round(budget * reference_ms, 2)
+        results.append({
+            "entry_point": name,
+            "import_ms": round(import_ms, 2),
+            "wall_ms": round(wall_ms, 2),
+            "budget": budget,
+            "budget_ms": budget_ms,
+            "over_budget": import_ms > budget_ms,
+            "heaviest": heaviest,
+        })
+
+    print(f"referência ({REFERENCE[0]}): {reference_ms:.2f} ms")
+    print(f"{'ponto de entrada':<36} {'imports (ms)':>13} {'total (ms)':>11} {'orçamento (ms)':>15}")
+    for row in results:
+        flag = '  ESTOURADO' if row['over_budget'] else ''
+        budget = f"{row['budget_ms']} ({row['budget']}x)"
+        print(f"{row['entry_point']:<36} {row['import_ms']:>13} {row['wall_ms']:>11} {budget:>15}{flag}")
+    print(json.dumps({"reference_ms": round(reference_ms, 2), "results": results}, ensure_ascii=False),
+          file=sys.stderr)
+
+    if not options.no_budget and any(row['over_budget'] for row in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
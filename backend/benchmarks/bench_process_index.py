@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da tabela incremental de processos (scripts/process_index.py).
+
+Compara a varredura completa usada antes (process_iter com pid, name e exe a
+cada chamada) com a atualização incremental. Duas fontes:
+- sintética: --processes processos (padrão 1000) com custo simulado por
+  consulta (--pids-us, --name-us, --exe-us), uma fração com exe negado
+  (--denied) e --churn processos trocados entre atualizações
+- real (--real): psutil nesta máquina
+
+Uso (a partir de backend/):
+    python benchmarks/bench_process_index.py [--processes 1000] [--rounds 50] [--churn 5] [--real]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from process_index import ProcessIndex
+
+NAMES = ['chrome', 'firefox', 'code', 'explorer', 'svchost', 'spotify', 'discord', 'slack',
+         'winword', 'excel', 'notepad', 'python', 'node', 'steam', 'conhost', 'runtimebroker']
+
+
+def busy_wait(microseconds):
+    """
+    Simula o custo de uma chamada ao sistema sem ceder a CPU
+    """
+    deadline = time.perf_counter() + microseconds / 1e6
+    while time.perf_counter() < deadline:
+        pass
+
+
+class SyntheticSource:
+    """
+    Tabela de processos simulada com custos por chamada
+    """
+
+    def __init__(self, count, rng, pids_us=300, name_us=15, exe_us=120, denied=0.3):
+        self.rng = rng
+        self.pids_us = pids_us
+        self.name_us = name_us
+        self.exe_us = exe_us
+        self.denied = denied
+        self.next_pid = 4
+        self.processes = {}
+        for _ in range(count):
+            self.spawn()
+
+    def spawn(self):
+        pid = self.next_pid
+        self.next_pid += 4
+        name = self.rng.choice(NAMES)
+        self.processes[pid] = {
+            "name": f"{name}.exe",
+            "exe": None if self.rng.random() < self.denied else f"C:\\Apps\\{name}\\{name}.exe",
+            "create_time": time.time() + pid * 1e-6,
+        }
+
+    def churn(self, count):
+        for pid in self.rng.sample(list(self.processes), min(count, len(self.processes))):
+            del self.processes[pid]
+        for _ in range(count):
+            self.spawn()
+
+    def pids(self):
+        busy_wait(self.pids_us)
+        return list(self.processes)
+
+    def create_time(self, pid):
+        busy_wait(self.name_us)
+        process = self.processes.get(pid)
+        return process["create_time"] if process else None
+
+    def inspect(self, pid):
+        process = self.processes.get(pid)
+        if process is None:
+            return None
+        busy_wait(self.name_us + self.exe_us)
+        return {"pid": pid, **process}
+
+
+def full_scan(source):
+    """
+    Comportamento anterior: resolve nome e exe de todos os processos
+    """
+    running = []
+    for pid in source.pids():
+        info = source.inspect(pid)
+        if info and info["exe"]:
+            running.append({"name": info["name"], "exe": info["exe"], "pid": pid})
+    return running
+
+
+def real_full_scan():
+    import psutil
+    running = []
+    for proc in psutil.process_iter(['pid', 'name', 'exe']):
+        try:
+            if proc.info['exe']:
+                running.append({'name': proc.info['name'], 'exe': proc.info['exe'], 'pid': proc.info['pid']})
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return running
+
+
+def measure(function, rounds, between=None):
+    samples = []
+    for _ in range(rounds):
+        if between:
+            between()
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {"median_ms": round(statistics.median(samples), 3),
+            "p90_ms": round(ordered[int(0.9 * (len(ordered) - 1))], 3),
+            "max_ms": round(max(samples), 3)}
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--churn', type=int, default=5, help='processos trocados entre atualizações')
+    parser.add_argument('--pids-us', type=float, default=300)
+    parser.add_argument('--name-us', type=float, default=15)
+    parser.add_argument('--exe-us', type=float, default=120)
+    parser.add_argument('--denied', type=float, default=0.3, help='fração de processos com exe negado')
+    parser.add_argument('--real', action='store_true', help='também mede com psutil nesta máquina')
+    parser.add_argument('--seed', type=int, default=42)
+    options = parser.parse_args(argv)
+
+    rng = random.Random(options.seed)
+    source = SyntheticSource(options.processes, rng, options.pids_us, options.name_us,
+                             options.exe_us, options.denied)
+    churn = lambda: source.churn(options.churn)
+
+    report = {"processes": options.processes, "churn": options.churn, "synthetic": {}}
+    report["synthetic"]["full_scan"] = summarize(measure(lambda: full_scan(source), options.rounds, churn))
+
+    index = ProcessIndex(source=source, refresh_interval=0)
+    start = time.perf_counter()
+    index.refresh(force=True)
+    report["synthetic"]["initial_build_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    report["synthetic"]["incremental"] = summarize(
+        measure(lambda: index.refresh(force=True), options.rounds, churn))
+    # Consultas com a tabela ainda recente são respondidas da memória
+    index.refresh_interval = 3600
+    report["synthetic"]["lookup"] = summarize(
+        measure(lambda: index.find({'chrome'}), options.rounds))
+    report["synthetic"]["consistent"] = (
+        sorted(p["pid"] for p in index.processes(with_exe=True)) == sorted(p["pid"] for p in full_scan(source)))
+
+    if options.real:
+        real_index = ProcessIndex(refresh_interval=0)
+        real_index.refresh(force=True)
+        report["real"] = {
+            "processes": len(real_index.entries),
+            "full_scan": summarize(measure(real_full_scan, options.rounds)),
+            "incremental": summarize(measure(lambda: real_index.refresh(force=True), options.rounds)),
+        }
+
+    def row(label, stats):
+        print(f"{label:>26} {stats['median_ms']:>12} {stats['p90_ms']:>10} {stats['max_ms']:>10}")
+
+    print(f"{'':>26} {'mediana (ms)':>12} {'p90':>10} {'máx':>10}")
+    print(f"sintético: {options.processes} processos, {options.churn} trocados por rodada, "
+          f"construção inicial {report['synthetic']['initial_build_ms']} ms")
+    row('varredura completa', report["synthetic"]["full_scan"])
+    row('atualização incremental', report["synthetic"]["incremental"])
+    row('consulta por app (memória)', report["synthetic"]["lookup"])
+    if "real" in report:
+        print(f"real: {report['real']['processes']} processos")
+        row('varredura completa', report["real"]["full_scan"])
+        row('atualização incremental', report["real"]["incremental"])
+    print(json.dumps(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
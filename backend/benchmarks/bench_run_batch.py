@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do modo lote de scripts/run_command.py.
+
+Compara o tempo total de um conjunto de comandos limitados por E/S (cada um
+espera --sleep-ms, como uma consulta de rede ou disco) executados um por vez
+com run_command (o comportamento de um pedido por comando) e com run_batch
+em vários níveis de concorrência (--jobs).
+
+Uso (a partir de backend/):
+    python benchmarks/bench_run_batch.py [--commands 12] [--sleep-ms 200] [--jobs 1,2,4,8] [--rounds 3]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from run_command import run_command, run_batch
+
+
+def io_command(sleep_ms, index):
+    """
+    Comando portátil que espera sleep_ms e imprime uma linha
+    """
+    code = f"import time; time.sleep({sleep_ms / 1000}); print('comando {index}')"
+    return f'"{sys.executable}" -c "{code}"'
+
+
+def measure(function, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 1)
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--commands', type=int, default=12)
+    parser.add_argument('--sleep-ms', type=float, default=200)
+    parser.add_argument('--jobs', default='1,2,4,8', help='níveis de concorrência separados por vírgula')
+    parser.add_argument('--rounds', type=int, default=3)
+    options = parser.parse_args(argv)
+
+    commands = [io_command(options.sleep_ms, index) for index in range(options.commands)]
+    levels = [int(level) for level in options.jobs.split(',') if level.strip()]
+
+    report = {"commands": options.commands, "sleep_ms": options.sleep_ms, "rounds": options.rounds}
+    report["serial_ms"] = measure(lambda: [run_command(command) for command in commands], options.rounds)
+    report["batch"] = {}
+    for jobs in levels:
+        result = run_batch(commands, jobs=jobs)
+        if not result["success"]:
+            print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+            sys.exit(1)
+        report["batch"][jobs] = measure(lambda: run_batch(commands, jobs=jobs), options.rounds)
+
+    print(f"{options.commands} comandos de {options.sleep_ms:g} ms cada (mediana de {options.rounds} rodadas)")
+    print(f"{'':>20} {'total (ms)':>12} {'aceleração':>12}")
+    print(f"{'serial (run_command)':>20} {report['serial_ms']:>12} {'1.0x':>12}")
+    for jobs, elapsed in report["batch"].items():
+        speedup = f"{report['serial_ms'] / elapsed:.1f}x"
+        print(f"{f'lote, jobs={jobs}':>20} {elapsed:>12} {speedup:>12}")
+    print(json.dumps(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
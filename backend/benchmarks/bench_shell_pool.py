@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do pool de sessões de shell (scripts/shell_session.py).
+
+Compara um processo novo por comando (o comportamento anterior: iniciar o
+shell, carregar as definições e só então trabalhar) com o pool de sessões
+persistentes, em que o início e o preload acontecem uma vez por sessão.
+
+Com --shell powershell (Windows) o preload é o WIN32_TYPES real; com bash
+(padrão fora do Windows) o custo de compilar os tipos é simulado com
+--preload-ms de espera.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_shell_pool.py [--shell bash] [--commands 30] [--preload-ms 150] [--jobs 1]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from shell_session import SessionPool, WIN32_TYPES, default_shell, get_dialect, PowerShellDialect
+
+
+def workload(shell, index):
+    """
+    Comando curto, como os dos scripts (consultar algo e imprimir)
+    """
+    if isinstance(get_dialect(shell), PowerShellDialect):
+        return f"[AssistantWin32]::GetForegroundWindow() | Out-Null; Write-Output 'comando {index}'"
+    return f"echo \"comando {index}\""
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {"median_ms": round(statistics.median(samples), 2),
+            "p90_ms": round(ordered[int(0.9 * (len(ordered) - 1))], 2),
+            "total_ms": round(sum(samples), 1)}
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--shell', default=default_shell())
+    parser.add_argument('--commands', type=int, default=30)
+    parser.add_argument('--preload-ms', type=float, default=150,
+                        help='custo simulado do preload fora do PowerShell')
+    parser.add_argument('--jobs', type=int, default=1, help='comandos simultâneos')
+    parser.add_argument('--max-uses', type=int, default=50)
+    options = parser.parse_args(argv)
+
+    dialect = get_dialect(options.shell)
+    if isinstance(dialect, PowerShellDialect):
+        preload = WIN32_TYPES
+    else:
+        preload = f"sleep {options.preload_ms / 1000}"
+    commands = [workload(options.shell, index) for index in range(options.commands)]
+
+    def one_shot(command):
+        completed = subprocess.run(dialect.one_shot(preload + '\n' + command), capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr or completed.stdout)
+
+    pool = SessionPool(options.shell, size=options.jobs, max_uses=options.max_uses, preload=[preload])
+
+    with ThreadPoolExecutor(max_workers=options.jobs) as executor:
+        spawn_samples = list(executor.map(lambda command: timed(lambda: one_shot(command)), commands))
+        wall_start = time.perf_counter()
+        pool_samples = list(executor.map(lambda command: timed(lambda: pool.run(command, check=True)), commands))
+        pool_wall_ms = (time.perf_counter() - wall_start) * 1000
+
+    report = {"shell": options.shell, "commands": options.commands, "jobs": options.jobs,
+              "spawn": summarize(spawn_samples), "pool": summarize(pool_samples),
+              "pool_wall_ms": round(pool_wall_ms, 1), "pool_stats": pool.stats()}
+    pool.close()
+
+    print(f"{options.commands} comandos em {options.shell}, {options.jobs} por vez")
+    print(f"{'':>24} {'mediana (ms)':>12} {'p90':>10} {'soma':>10}")
+    for label, key in (('processo por comando', 'spawn'), ('pool de sessões', 'pool')):
+        stats = report[key]
+        print(f"{label:>24} {stats['median_ms']:>12} {stats['p90_ms']:>10} {stats['total_ms']:>10}")
+    print(f"sessões iniciadas: {report['pool_stats']['started']}, "
+          f"início médio {report['pool_stats']['startup_ms_mean']} ms")
+    print(json.dumps(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
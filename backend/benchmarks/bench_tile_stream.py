@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do streaming de tela por blocos (scripts/frame_diff.py).
+
+Gera sequências sintéticas de quadros e mede a vazão (quadros/s) da
+detecção de blocos sozinha e com codificação, além dos bytes emitidos em
+comparação com enviar cada quadro inteiro.
+
+Cenários:
+- static: tela parada (só keyframes periódicos)
+- cursor: um cursor piscando e uma linha de texto sendo digitada
+- scroll: metade da tela rolando a cada quadro
+- video: uma região 640x360 com conteúdo novo a cada quadro
+
+Uso (a partir de backend/):
+    python benchmarks/bench_tile_stream.py [--frames 60] [--size 1920x1080] [--tile 64]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import numpy as np
+
+from frame_diff import FrameDiffer
+from screenshot_advanced import build_frame_event
+
+
+def make_base(height, width, rng):
+    """
+    Quadro parecido com uma área de trabalho: fundo liso, janelas e "texto"
+    """
+    frame = np.full((height, width, 3), 235, dtype=np.uint8)
+    for _ in range(12):
+        top, left = rng.integers(0, height - 200), rng.integers(0, width - 300)
+        frame[top:top + rng.integers(150, 500), left:left + rng.integers(250, 900)] = rng.integers(0, 255, 3)
+    text = rng.random((height, width)) < 0.02
+    frame[text] = 20
+    return frame
+
+
+def scenario_frames(name, count, height, width, seed=0):
+    """
+    Gera os quadros de um cenário
+    """
+    rng = np.random.default_rng(seed)
+    base = make_base(height, width, rng)
+    for index in range(count):
+        frame = base.copy()
+        if name == 'cursor':
+            if index % 2:
+                frame[200:220, 300:302] = 0
+            frame[240:256, 300:300 + 8 * index] = 30
+        elif name == 'scroll':
+            half = height // 2
+            frame[half:] = np.roll(base[half:], -12 * index, axis=0)
+        elif name == 'video':
+            frame[100:460, 100:740] = rng.integers(0, 255, (360, 640, 3), dtype=np.uint8)
+        yield frame
+
+
+def run_scenario(name, frames, tile_size, keyframe_interval, encode, profile):
+    """
+    Processa a sequência; retorna quadros/s, bytes emitidos e blocos
+    """
+    differ = FrameDiffer(tile_size=tile_size, keyframe_interval=keyframe_interval)
+    emitted = 0
+    tiles = 0
+    start = time.perf_counter()
+    for number, frame in enumerate(frames):
+        keyframe, rectangles = differ.diff(frame)
+        tiles += len(rectangles)
+        if encode and rectangles:
+            emitted += build_frame_event(frame, number, keyframe, rectangles, profile)["size"]
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, emitted, tiles
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--size', default='1920x1080')
+    parser.add_argument('--tile', type=int, default=64)
+    parser.add_argument('--keyframe', type=int, default=30)
+    parser.add_argument('--profile', default='analysis')
+    parser.add_argument('--scenarios', default='static,cursor,scroll,video')
+    options = parser.parse_args(argv)
+
+    width, height = [int(value) for value in options.size.split('x')]
+    results = []
+    for name in options.scenarios.split(','):
+        frames = list(scenario_frames(name, options.frames, height, width))
+
+        diff_fps, _, tiles = run_scenario(name, frames, options.tile, options.keyframe, False, options.profile)
+        full_fps, emitted, _ = run_scenario(name, frames, options.tile, options.keyframe, True, options.profile)
+        # Referência: todo quadro enviado inteiro (keyframe_interval=1)
+        _, baseline, _ = run_scenario(name, frames, options.tile, 1, True, options.profile)
+
+        results.append({
+            "scenario": name,
+            "frames": len(frames),
+            "tiles": tiles,
+            "diff_fps": round(diff_fps, 1),
+            "stream_fps": round(full_fps, 1),
+            "bytes": emitted,
+            "full_frame_bytes": baseline,
+            "ratio": round(emitted / baseline, 3) if baseline else 0.0,
+        })
+
+    print(f"{'cenário':>8} {'blocos':>7} {'diff q/s':>9} {'total q/s':>10} {'bytes':>11} {'quadros inteiros':>17} {'razão':>6}")
+    for row in results:
+        print(f"{row['scenario']:>8} {row['tiles']:>7} {row['diff_fps']:>9} {row['stream_fps']:>10} "
+              f"{row['bytes']:>11} {row['full_frame_bytes']:>17} {row['ratio']:>6}")
+    print(json.dumps(results), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do índice de títulos (scripts/text_index.py).
+
+Gera listas sintéticas de 100/1k/10k títulos de janelas e compara a busca no
+índice com duas varreduras lineares: a busca por substring usada antes, que
+para no primeiro título encontrado e não tolera erros de digitação, e uma
+varredura com o mesmo ranking do índice (prefixo e trigramas por palavra),
+que precisa pontuar todos os títulos a cada busca.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_title_matcher.py [--sizes 100,1000,10000] [--queries 200]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from text_index import FUZZY_THRESHOLD, TextIndex, normalize, trigrams
+
+APPS = ['Google Chrome', 'Mozilla Firefox', 'Visual Studio Code', 'Paint', 'Bloco de Notas',
+        'Explorador de Arquivos', 'Spotify', 'Discord', 'Slack', 'Microsoft Word',
+        'Microsoft Excel', 'Configurações', 'Calculadora', 'Terminal', 'Steam']
+WORDS = ['relatório', 'projeto', 'reunião', 'main.py', 'index.html', 'planilha', 'música',
+         'vídeo', 'documento', 'sem título', 'notas', 'orçamento', 'backup', 'imagem', 'config']
+
+
+def make_titles(count, rng):
+    """
+    Títulos no formato '<documento> - <aplicativo>'
+    """
+    return [f"{' '.join(rng.sample(WORDS, 2))} {i} - {rng.choice(APPS)}" for i in range(count)]
+
+
+def make_queries(titles, count, rng):
+    """
+    Mistura de buscas por aplicativo, por documento, com erro de digitação e inexistentes
+    """
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(rng.choice(APPS).split()[-1].lower())
+        elif kind < 0.7:
+            queries.append(rng.choice(titles).split(' - ')[0])
+        elif kind < 0.9:
+            word = rng.choice(APPS).split()[-1].lower()
+            position = rng.randrange(1, len(word))
+            queries.append(word[:position] + word[position + 1:])
+        else:
+            queries.append('janela inexistente')
+    return queries
+
+
+def linear_scan(titles, query):
+    """
+    Comportamento anterior: primeira janela com substring em qualquer direção
+    """
+    query = query.lower().strip()
+    for title in titles:
+        actual = title.lower().strip()
+        if query in actual or actual in query:
+            return title
+    return None
+
+
+def ranked_scan(texts, query, limit=5, min_score=0.35):
+    """
+    Mesmo ranking do índice sem índice: cada título (já normalizado) é
+    comparado palavra a palavra com a busca
+    """
+    query = normalize(query)
+    query_tokens = set(query.split())
+    query_grams = {token: trigrams(token) for token in query_tokens}
+    scored = []
+    for position, text in enumerate(texts):
+        tokens = set(text.split())
+        total, found = 0.0, 0
+        for query_token, grams in query_grams.items():
+            if any(token.startswith(query_token) for token in tokens):
+                similarity = 1.0
+            else:
+                similarity = round(max((2 * len(grams & trigrams(token)) / (len(grams) + len(trigrams(token)))
+                                        for token in tokens), default=0.0), 4)
+                if similarity < FUZZY_THRESHOLD:
+                    continue
+            total += similarity
+            found += 1
+        if not found:
+            continue
+        score = 0.75 * total / len(query_tokens) + 0.2 * min(1.0, found / len(tokens))
+        if query in text:
+            score = max(score, 0.8 + 0.15 * len(query) / len(text))
+        elif text in query:
+            score = max(score, 0.7 + 0.15 * len(text) / len(query))
+        if score >= min_score:
+            scored.append((-found, -score, position))
+    scored.sort()
+    return scored[:limit]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    options = parser.parse_args(argv)
+
+    results = []
+    for size in [int(value) for value in options.sizes.split(',')]:
+        rng = random.Random(options.seed)
+        titles = make_titles(size, rng)
+        queries = make_queries(titles, options.queries, rng)
+
+        start = time.perf_counter()
+        index = TextIndex(titles)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        indexed = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, limit=5)
+            indexed.append((time.perf_counter() - start) * 1000)
+
+        linear = []
+        for query in queries:
+            start = time.perf_counter()
+            linear_scan(titles, query)
+            linear.append((time.perf_counter() - start) * 1000)
+
+        # A normalização dos títulos fica fora da medição, como no índice
+        texts = [normalize(title) for title in titles]
+        ranked = []
+        for query in queries:
+            start = time.perf_counter()
+            ranked_scan(texts, query)
+            ranked.append((time.perf_counter() - start) * 1000)
+
+        results.append({
+            "titles": size,
+            "build_ms": round(build_ms, 2),
+            "index_median_ms": round(statistics.median(indexed), 4),
+            "index_p99_ms": round(percentile(indexed, 0.99), 4),
+            "linear_median_ms": round(statistics.median(linear), 4),
+            "linear_p99_ms": round(percentile(linear, 0.99), 4),
+            "ranked_median_ms": round(statistics.median(ranked), 4),
+            "ranked_p99_ms": round(percentile(ranked, 0.99), 4),
+        })
+
+    print(f"{'títulos':>8} {'índice (ms)':>12} {'mediana':>10} {'p99':>10} {'linear med.':>12} {'linear p99':>11} "
+          f"{'ranking med.':>13} {'ranking p99':>12}")
+    for row in results:
+        print(f"{row['titles']:>8} {row['build_ms']:>12} {row['index_median_ms']:>10} {row['index_p99_ms']:>10} "
+              f"{row['linear_median_ms']:>12} {row['linear_p99_ms']:>11} "
+              f"{row['ranked_median_ms']:>13} {row['ranked_p99_ms']:>12}")
+    print(json.dumps(results), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
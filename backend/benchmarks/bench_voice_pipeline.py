@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de latência do pipeline de voz (voice_recognition.py).
+
+Reproduz um diretório de arquivos WAV pelo mesmo caminho do microfone
+(calibração -> escuta até o fim da frase -> codificação -> reconhecimento)
+usando AudioFile como fonte e um reconhecedor local (stand-in), sem rede.
+Relata percentis de cada etapa no corpus. Com arquivo, capture_ms é só o
+processamento da escuta; no microfone soma-se a espera de silêncio do fim
+da frase (Recognizer.pause_threshold, 0,8 s por padrão, ou o hangover do
+VAD). Com --endpointing vad, end_of_speech_ms é a latência do fim da fala
+até o resultado: hangover ouvido + processamento depois da detecção.
+
+Com --recognizer http, um servidor substituto local (formato da API Web
+Speech) recebe o FLAC; --link-kbps simula um link lento no upload e o
+relatório traz os bytes enviados. --no-preprocess desliga o preparo do áudio
+(recorte, 16 kHz, FLAC em segundo plano) para comparar; --rate gera o corpus
+sintético na taxa do microfone (ex.: 48000).
+
+Um arquivo `<nome>.txt` ao lado de `<nome>.wav` traz a transcrição esperada,
+devolvida pelo stand-in. Os arquivos devem começar com silêncio de pelo
+menos --calibration segundos (consumido pela calibração). Sem --corpus, um
+corpus sintético é gerado em um diretório temporário.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_voice_pipeline.py [--corpus DIR] [--recognizer stand-in]
+        [--latency 0.0] [--calibration 0.5] [--repeat 1] [--endpointing vad|energy]
+        [--hangover 300] [--rate 16000] [--link-kbps 0] [--no-preprocess]
+"""
+
+import sys
+import os
+import json
+import math
+import wave
+import array
+import random
+import time
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+STAGES = ('calibration_ms', 'capture_ms', 'preprocess_ms', 'encoding_ms', 'recognition_ms', 'total_ms')
+ENDPOINT_STAGE = 'end_of_speech_ms'
+
+
+def write_wav(path, samples, rate=16000):
+    """
+    Grava amostras PCM de 16 bits mono
+    """
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(array.array('h', samples).tobytes())
+
+
+def make_corpus(directory, count, rate=16000, seed=7):
+    """
+    Gera falas sintéticas: silêncio com ruído leve, um trecho "falado" (tons
+    modulados com ruído) de 0,5 a 3 s e silêncio final
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        samples = [int(rng.gauss(0, 40)) for _ in range(int(rate * 0.8))]
+        speech_seconds = rng.uniform(0.5, 3.0)
+        base = rng.uniform(120, 260)
+        for i in range(int(rate * speech_seconds)):
+            t = i / rate
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * t)
+            value = 6000 * envelope * (math.sin(2 * math.pi * base * t) + 0.4 * math.sin(2 * math.pi * 2.5 * base * t))
+            samples.append(max(-32768, min(32767, int(value + rng.gauss(0, 300)))))
+        samples.extend(int(rng.gauss(0, 40)) for _ in range(int(rate * 1.2)))
+
+        name = f"fala_{index:03d}"
+        write_wav(os.path.join(directory, f"{name}.wav"), samples, rate)
+        with open(os.path.join(directory, f"{name}.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"frase de teste {index}")
+
+
+class StandInServer:
+    """
+    Servidor HTTP local no formato da API Web Speech: devolve a transcrição
+    esperada atual e registra o tamanho de cada upload. Com link_kbps, a
+    resposta espera o tempo que o corpo levaria para subir nessa velocidade.
+    """
+
+    def __init__(self, link_kbps=0):
+        self.current = ''
+        self.uploads = []
+        self.link_kbps = link_kbps
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                server.uploads.append(len(body))
+                if server.link_kbps:
+                    time.sleep(len(body) * 8 / (server.link_kbps * 1000))
+                response = json.dumps({"result": []}) + "\n"
+                if server.current:
+                    response += json.dumps({"result": [{"alternative": [{"transcript": server.current}],
+                                                        "final": True}], "result_index": 0}) + "\n"
+                data = response.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/recognize"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def load_corpus(directory):
+    """
+    [(nome, caminho do wav, transcrição esperada ou None)]
+    """
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        if extension.lower() != '.wav':
+            continue
+        transcript_path = os.path.join(directory, f"{stem}.txt")
+        transcript = None
+        if os.path.exists(transcript_path):
+            with open(transcript_path, 'r', encoding='utf-8') as f:
+                transcript = f.read().strip()
+        corpus.append((stem, os.path.join(directory, name), transcript))
+    return corpus
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', help='diretório com arquivos .wav (e .txt opcionais)')
+    parser.add_argument('--files', type=int, default=20, help='arquivos do corpus sintético')
+    parser.add_argument('--recognizer', default='stand-in')
+    parser.add_argument('--latency', type=float, default=0.0, help='latência simulada do stand-in (s)')
+    parser.add_argument('--calibration', type=float, default=0.5, help='duração da calibração (s)')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--endpointing', choices=('vad', 'energy'), default='vad')
+    parser.add_argument('--hangover', type=int, default=None, help='silêncio que encerra a frase no VAD (ms)')
+    parser.add_argument('--rate', type=int, default=16000, help='taxa do corpus sintético (Hz)')
+    parser.add_argument('--link-kbps', type=float, default=0, help='velocidade de upload simulada (http)')
+    parser.add_argument('--no-preprocess', action='store_true', help='envia o áudio sem preparo')
+    options = parser.parse_args(argv)
+
+    import recognizers
+    from voice_recognition import recognize_speech
+
+    directory = options.corpus
+    temporary = None
+    if not directory:
+        temporary = tempfile.TemporaryDirectory()
+        directory = temporary.name
+        make_corpus(directory, options.files, rate=options.rate)
+
+    corpus = load_corpus(directory)
+    if not corpus:
+        print(f"Nenhum arquivo .wav em {directory}", file=sys.stderr)
+        sys.exit(1)
+
+    transcripts = {stem: text for stem, _, text in corpus if text}
+    server = None
+    if options.recognizer == 'stand-in':
+        engine = recognizers.get_recognizer('stand-in', latency=options.latency, transcripts=transcripts)
+    elif options.recognizer == 'http' and not os.environ.get('VOICE_RECOGNIZER_URL'):
+        server = StandInServer(options.link_kbps)
+        engine = recognizers.get_recognizer('http', url=server.url)
+    else:
+        engine = recognizers.get_recognizer(options.recognizer)
+
+    samples = {stage: [] for stage in STAGES + (ENDPOINT_STAGE,)}
+    audio_seconds = []
+    payload_sizes = {"bytes_before": [], "bytes_after": [], "encode_ms": []}
+    failures = 0
+    matches = 0
+    expected = 0
+    for _ in range(options.repeat):
+        for stem, path, transcript in corpus:
+            if hasattr(engine, 'expect'):
+                engine.expect(stem)
+            if server:
+                server.current = transcripts.get(stem, '')
+            result = recognize_speech(duration=10, wav=path, engine=engine, calibration=options.calibration,
+                                      endpointing=options.endpointing, hangover_ms=options.hangover,
+                                      preprocess=not options.no_preprocess)
+            timings = result.get("timings", {})
+            if not result.get("success") or 'capture_ms' not in timings:
+                failures += 1
+                continue
+            timings.setdefault('preprocess_ms', 0.0)
+            timings.setdefault('encoding_ms', 0.0)
+            timings.setdefault('recognition_ms', 0.0)
+            timings['total_ms'] = sum(timings[stage] for stage in STAGES[:-1])
+            for stage in STAGES:
+                samples[stage].append(timings[stage])
+            if ENDPOINT_STAGE in timings:
+                samples[ENDPOINT_STAGE].append(timings[ENDPOINT_STAGE])
+            audio_seconds.append(result.get("audio_s", 0.0))
+            for key, values in payload_sizes.items():
+                if key in result.get("payload", {}):
+                    values.append(result["payload"][key])
+            if transcript:
+                expected += 1
+                matches += result.get("text", "").strip().lower() == transcript.lower()
+
+    if server:
+        server.close()
+    if temporary:
+        temporary.cleanup()
+
+    report = {
+        "files": len(corpus),
+        "runs": len(samples['total_ms']),
+        "failures": failures,
+        "recognizer": options.recognizer,
+        "endpointing": options.endpointing,
+        "exact_match": round(matches / expected, 3) if expected else None,
+        "audio_s_mean": round(sum(audio_seconds) / len(audio_seconds), 2) if audio_seconds else None,
+        "preprocess": not options.no_preprocess,
+        "stages": {},
+    }
+    for key, values in payload_sizes.items():
+        if values:
+            report[f"{key}_mean"] = round(sum(values) / len(values), 1)
+    if server and server.uploads:
+        report["uploaded_bytes_mean"] = round(sum(server.uploads) / len(server.uploads), 1)
+    for stage in STAGES + (ENDPOINT_STAGE,):
+        values = samples[stage]
+        if values:
+            report["stages"][stage] = {
+                "p50": round(percentile(values, 0.5), 2),
+                "p90": round(percentile(values, 0.9), 2),
+                "p99": round(percentile(values, 0.99), 2),
+                "max": round(max(values), 2),
+            }
+
+    print(f"{'etapa':>16} {'p50':>9} {'p90':>9} {'p99':>9} {'máx':>9}")
+    for stage, row in report["stages"].items():
+        print(f"{stage:>16} {row['p50']:>9} {row['p90']:>9} {row['p99']:>9} {row['max']:>9}")
+    print(f"arquivos: {report['files']}  execuções: {report['runs']}  falhas: {failures}  "
+          f"acerto exato: {report['exact_match']}  áudio médio: {report['audio_s_mean']} s")
+    if "bytes_before_mean" in report:
+        print(f"PCM capturado médio: {report['bytes_before_mean']:.0f} B  FLAC preparado médio: "
+              f"{report['bytes_after_mean']:.0f} B  codificação (thread): {report['encode_ms_mean']} ms")
+    if "uploaded_bytes_mean" in report:
+        print(f"upload médio: {report['uploaded_bytes_mean']:.0f} B")
+    print(json.dumps(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: processo novo por comando vs worker persistente.
+
+Para cada ação mede a latência de `python scripts/<script> <args>` (cold spawn)
+e da mesma ação enviada ao worker (`python -m scripts.worker`) já aquecido.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_worker.py [--repeat 10] [--action script.py:arg1,arg2 ...]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ações sem efeitos colaterais (listagens e mensagens de uso)
+DEFAULT_ACTIONS = [
+    ('run_command.py', ['echo ok']),
+    ('list_windows.py', []),
+    ('focus_window.py', ['list_windows']),
+    ('screenshot_advanced.py', ['list_windows']),
+    ('open_app.py', []),
+    ('volume_control.py', []),
+]
+
+
+def parse_action(text):
+    """
+    Converte 'script.py:arg1,arg2' em (script, [args])
+    """
+    script, _, args = text.partition(':')
+    return script, [arg for arg in args.split(',') if arg] if args else []
+
+
+def summarize(samples):
+    """
+    Estatísticas em milissegundos
+    """
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "median_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+    }
+
+
+def bench_cold(script, args, repeat):
+    """
+    Mede o tempo de um processo Python novo por execução
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join('scripts', script), *args],
+                       cwd=BACKEND_DIR, capture_output=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class WorkerClient:
+    """
+    Cliente mínimo do protocolo de linhas do worker
+    """
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'scripts.worker'],
+            cwd=BACKEND_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, encoding='utf-8', bufsize=1
+        )
+        self.next_id = 1
+
+    def request(self, method, params=None):
+        request_id = self.next_id
+        self.next_id += 1
+        self.process.stdin.write(json.dumps({"jsonrpc": "2.0", "id": request_id,
+                                             "method": method, "params": params or {}}) + '\n')
+        self.process.stdin.flush()
+        while True:
+            response = json.loads(self.process.stdout.readline())
+            if response.get('id') == request_id:
+                return response
+
+    def close(self):
+        self.request('shutdown')
+        self.process.wait(timeout=10)
+
+
+def bench_warm(client, script, args, repeat):
+    """
+    Mede o tempo de ida e volta no worker aquecido
+    """
+    # Primeira chamada importa o módulo; não entra na medição
+    client.request('run', {"script": script, "args": args})
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.request('run', {"script": script, "args": args})
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--action', action='append', type=parse_action,
+                        help="script.py:arg1,arg2 (pode ser repetido)")
+    options = parser.parse_args(argv)
+
+    actions = options.action or DEFAULT_ACTIONS
+    client = WorkerClient()
+    results = []
+    try:
+        for script, args in actions:
+            cold = summarize(bench_cold(script, args, options.repeat))
+            warm = summarize(bench_warm(client, script, args, options.repeat))
+            results.append({
+                "action": ' '.join([script, *args]),
+                "cold": cold,
+                "warm": warm,
+                "speedup": round(cold["median_ms"] / max(warm["median_ms"], 0.001), 1),
+            })
+    finally:
+        client.close()
+
+    print(f"{'ação':<40} {'cold (ms)':>12} {'warm (ms)':>12} {'speedup':>9}")
+    for row in results:
+        print(f"{row['action']:<40} {row['cold']['median_ms']:>12} {row['warm']['median_ms']:>12} {row['speedup']:>8}x")
+    print(json.dumps(results, ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
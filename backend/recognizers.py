@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reconhecedores de fala intercambiáveis.
+
+Cada reconhecedor separa duas etapas para que possam ser medidas:
+- encode(audio): prepara o payload a partir do AudioData
+- recognize(recognizer, payload): devolve o texto
+
+O reconhecedor padrão vem de VOICE_RECOGNIZER (google). Áudio preparado por
+audio_preprocessing.py já traz o FLAC codificado em segundo plano; encode só
+espera por ele.
+"""
+
+import os
+import json
+import time
+
+LANGUAGE = 'pt-BR'
+
+
+class GoogleRecognizer:
+    """
+    Google Web Speech (gratuito). O SpeechRecognition converte para FLAC
+    dentro de recognize_google; com áudio preparado ele reaproveita o FLAC
+    já codificado, e encode mede a espera por essa codificação.
+    """
+
+    name = 'google'
+
+    def __init__(self, language=LANGUAGE):
+        self.language = language
+
+    def encode(self, audio):
+        if hasattr(audio, 'flac'):
+            audio.get_flac_data()
+        return audio
+
+    def recognize(self, recognizer, payload):
+        return recognizer.recognize_google(payload, language=self.language)
+
+
+class StandInRecognizer:
+    """
+    Substituto local e determinístico para benchmarks e testes sem rede:
+    codifica em FLAC como o serviço real faria e devolve a transcrição
+    conhecida do áudio (ou texto vazio) depois de `latency` segundos.
+    """
+
+    name = 'stand-in'
+
+    def __init__(self, transcripts=None, latency=0.0, encode_flac=True):
+        self.transcripts = transcripts or {}
+        self.latency = latency
+        self.encode_flac = encode_flac
+        self.current = None
+
+    def expect(self, key):
+        """
+        Define qual transcrição do dicionário corresponde ao próximo áudio
+        """
+        self.current = key
+
+    def encode(self, audio):
+        return audio.get_flac_data() if self.encode_flac else audio.get_raw_data()
+
+    def recognize(self, recognizer, payload):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.transcripts.get(self.current, '')
+
+
+class HttpRecognizer:
+    """
+    Envia o FLAC por HTTP POST no formato da API Web Speech do Google
+    (Content-Type audio/x-flac; rate=N, resposta com uma linha JSON por
+    resultado). Aponta para VOICE_RECOGNIZER_URL, por exemplo um servidor
+    substituto local em testes e benchmarks.
+    """
+
+    name = 'http'
+
+    def __init__(self, url=None, language=LANGUAGE, timeout=10):
+        self.url = url or os.environ.get('VOICE_RECOGNIZER_URL', 'http://127.0.0.1:8765/recognize')
+        self.language = language
+        self.timeout = timeout
+
+    def encode(self, audio):
+        return audio.get_flac_data(), audio.sample_rate
+
+    def recognize(self, recognizer, payload):
+        import speech_recognition as sr
+        from urllib.error import URLError
+        from urllib.parse import urlencode
+        from urllib.request import Request, urlopen
+
+        flac, rate = payload
+        separator = '&' if '?' in self.url else '?'
+        request = Request(f"{self.url}{separator}{urlencode({'lang': self.language})}", data=flac,
+                          headers={"Content-Type": f"audio/x-flac; rate={rate}"})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                body = response.read().decode('utf-8')
+        except (URLError, OSError) as e:
+            raise sr.RequestError(f"falha na requisição de reconhecimento: {e}")
+
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                results = json.loads(line).get("result", [])
+            except ValueError:
+                raise sr.RequestError("resposta inválida do reconhecedor")
+            for result in results:
+                alternatives = result.get("alternative") or []
+                if alternatives and "transcript" in alternatives[0]:
+                    return alternatives[0]["transcript"]
+        raise sr.UnknownValueError()
+
+
+RECOGNIZERS = {
+    GoogleRecognizer.name: GoogleRecognizer,
+    StandInRecognizer.name: StandInRecognizer,
+    HttpRecognizer.name: HttpRecognizer,
+}
+
+
+def get_recognizer(name=None, **options):
+    """
+    Instancia o reconhecedor pelo nome (padrão: VOICE_RECOGNIZER ou google)
+    """
+    name = name or os.environ.get('VOICE_RECOGNIZER', GoogleRecognizer.name)
+    if name not in RECOGNIZERS:
+        raise ValueError(f"Reconhecedor '{name}' não suportado")
+    return RECOGNIZERS[name](**options)
+
+
+def transcribe(recognizer, engine, audio, timings=None):
+    """
+    Codifica e reconhece o áudio, somando o tempo de cada etapa em timings
+    (encoding_ms, recognition_ms). Exceções do SpeechRecognition propagam.
+    """
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    payload = engine.encode(audio)
+    timings["encoding_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    start = time.perf_counter()
+    try:
+        return engine.recognize(recognizer, payload)
+    finally:
+        timings["recognition_ms"] = round((time.perf_counter() - start) * 1000, 2)
@@ -57,31 +57,39 @@ const findAppByKeyword = (message) => {
 // Rota para análise de imagens
 router.post('/analyze-image', async (req, res) => {
   try {
-    const { imagePath, prompt = "Descreva o que você vê nesta imagem" } = req.body;
+    const { imagePath, imageBase64, mimeType: imageMimeType, prompt = "Descreva o que você vê nesta imagem" } = req.body;
     
-    console.log('Análise de imagem - Parâmetros recebidos:', { imagePath, prompt });
+    console.log('Análise de imagem - Parâmetros recebidos:', { imagePath, inMemory: Boolean(imageBase64), prompt });
     
-    if (!imagePath) {
-      return res.status(400).json({ error: 'Caminho da imagem é obrigatório' });
-    }
-
-    // Verificar se o arquivo existe
-    const fs = require('fs');
-    console.log('Verificando se arquivo existe:', imagePath);
-    console.log('Arquivo existe:', fs.existsSync(imagePath));
+    let base64Image;
+    let mimeType;
     
-    if (!fs.existsSync(imagePath)) {
-      console.log('Arquivo não encontrado:', imagePath);
-      return res.status(400).json({ error: 'Arquivo de imagem não encontrado' });
-    }
+    if (imageBase64) {
+      // Imagem enviada em memória (ex.: screenshot sem passar pelo disco)
+      base64Image = imageBase64;
+      mimeType = imageMimeType || 'image/png';
+    } else {
+      if (!imagePath) {
+        return res.status(400).json({ error: 'Caminho da imagem é obrigatório' });
+      }
 
-    // Ler a imagem como base64
-    const imageBuffer = fs.readFileSync(imagePath);
-    const base64Image = imageBuffer.toString('base64');
-    const mimeType = getMimeType(imagePath);
+      // Verificar se o arquivo existe
+      const fs = require('fs');
+      console.log('Verificando se arquivo existe:', imagePath);
+      console.log('Arquivo existe:', fs.existsSync(imagePath));
+      
+      if (!fs.existsSync(imagePath)) {
+        console.log('Arquivo não encontrado:', imagePath);
+        return res.status(400).json({ error: 'Arquivo de imagem não encontrado' });
+      }
+
+      // Ler a imagem como base64
+      const imageBuffer = fs.readFileSync(imagePath);
+      base64Image = imageBuffer.toString('base64');
+      mimeType = getMimeType(imagePath);
+    }
     
     console.log('Imagem processada:', {
-      tamanhoBuffer: imageBuffer.length,
       tamanhoBase64: base64Image.length,
       mimeType: mimeType
     });
@@ -1,15 +1,27 @@
 const express = require('express');
 const { spawn } = require('child_process');
 const path = require('path');
+const readline = require('readline');
 const router = express.Router();
 
+const { getPythonWorker } = require('../utils/pythonWorker');
+const { getAnalysisCache } = require('../utils/analysisCache');
+
+// Usar o worker persistente por padrão (PYTHON_WORKER=false volta a criar um processo por comando)
+const USE_PYTHON_WORKER = process.env.PYTHON_WORKER !== 'false';
+
 // Função para executar comandos Python
-const runPythonScript = (scriptPath, args = []) => {
+// input (opcional) é escrito no stdin do processo, em UTF-8
+const spawnPythonScript = (scriptPath, args = [], input = null) => {
   return new Promise((resolve, reject) => {
     const pythonProcess = spawn('python', [scriptPath, ...args], {
       cwd: path.join(__dirname, '..'),
       stdio: ['pipe', 'pipe', 'pipe']
     });
+    if (input !== null) {
+      pythonProcess.stdin.on('error', () => {});
+      pythonProcess.stdin.end(input, 'utf8');
+    }
 
     let output = '';
     let error = '';
@@ -36,11 +48,31 @@ const runPythonScript = (scriptPath, args = []) => {
   });
 };
 
+// Executa o script no worker persistente, com o mesmo formato de resultado do spawn
+const runPythonScript = async (scriptPath, args = []) => {
+  if (!USE_PYTHON_WORKER) {
+    return spawnPythonScript(scriptPath, args.map((arg) => (arg === null || arg === undefined ? '' : arg)));
+  }
+
+  let result;
+  try {
+    result = await getPythonWorker().run(scriptPath, args);
+  } catch (err) {
+    throw { success: false, error: err.message };
+  }
+
+  if (result.code === 0) {
+    return { success: true, output: result.output.trim() };
+  }
+  throw { success: false, error: result.error.trim() || 'Erro desconhecido' };
+};
+
 
 // Comando para abrir aplicativo
 router.post('/open-app', async (req, res) => {
   try {
-    const { appName, appPath } = req.body;
+    // forceNew: abre outra instância mesmo se o app já estiver aberto
+    const { appName, appPath, forceNew = false } = req.body;
     
     if (!appName && !appPath) {
       return res.status(400).json({ 
@@ -49,18 +81,31 @@ router.post('/open-app', async (req, res) => {
       });
     }
 
-    console.log('Backend: Abrindo aplicativo:', { appName, appPath });
+    console.log('Backend: Abrindo aplicativo:', { appName, appPath, forceNew });
     const scriptPath = 'scripts/open_app.py';
-    const scriptArgs = [appName || appPath];
+    const scriptArgs = [appName || appPath, '--json', ...(forceNew ? ['--new'] : [])];
     console.log('Backend: Executando script Python:', { scriptPath, scriptArgs });
     
     const result = await runPythonScript(scriptPath, scriptArgs);
     console.log('Backend: Resultado do script:', result);
     
+    // path: focused (janela existente focada), launched, path ou fallback
+    let details = {};
+    try {
+      details = JSON.parse(result.output);
+    } catch (error) {
+      details = { message: result.output };
+    }
+    
     res.json({
-      success: true,
-      message: `Aplicativo ${appName || appPath} aberto`,
-      output: result.output
+      success: details.path !== 'error',
+      message: details.path === 'focused'
+        ? `Aplicativo ${appName || appPath} já estava aberto`
+        : `Aplicativo ${appName || appPath} aberto`,
+      output: details.message,
+      path: details.path,
+      method: details.method,
+      elapsedMs: details.elapsed_ms
     });
   } catch (error) {
     console.error('Backend: Erro ao abrir aplicativo:', error);
@@ -74,7 +119,7 @@ router.post('/open-app', async (req, res) => {
 // Comando para controlar volume
 router.post('/volume-control', async (req, res) => {
   try {
-    const { action, value } = req.body; // action: 'set', 'up', 'down', 'mute', 'unmute'
+    const { action, value } = req.body; // action: 'set', 'up', 'down', 'mute', 'unmute', 'get'
     
     if (!action) {
       return res.status(400).json({ 
@@ -85,13 +130,20 @@ router.post('/volume-control', async (req, res) => {
 
     const args = [action];
     if (value !== undefined) args.push(value.toString());
+    args.push('--json');
 
     const result = await runPythonScript('scripts/volume_control.py', args);
-    
-    res.json({
-      success: true,
-      message: `Volume ${action} executado`,
-      output: result.output
+    const state = JSON.parse(result.output);
+    
+    // level: nível atual (0-100) informado pelo backend de áudio, null se desconhecido
+    res.status(state.success === false ? 500 : 200).json({
+      success: state.success !== false,
+      message: state.message || `Volume ${action} executado`,
+      output: state.message || result.output,
+      error: state.error,
+      level: state.level,
+      muted: state.muted,
+      backend: state.backend
     });
   } catch (error) {
     res.status(500).json({
@@ -172,18 +224,46 @@ router.post('/screenshot-advanced', async (req, res) => {
   }
 });
 
+// Screenshot de várias janelas em uma única execução
+router.post('/screenshot-batch', async (req, res) => {
+  try {
+    const { titles, exclude_assistant = true, output = 'file', profile = 'original' } = req.body;
+    
+    if (!Array.isArray(titles) || titles.length === 0) {
+      return res.status(400).json({
+        success: false,
+        error: 'Lista de títulos de janelas é obrigatória'
+      });
+    }
+    
+    const scriptPath = path.join(__dirname, '..', 'scripts', 'screenshot_advanced.py');
+    const args = ['batch', JSON.stringify(titles), exclude_assistant.toString(), output, profile];
+    const result = await runPythonScript(scriptPath, args);
+    
+    res.json(JSON.parse(result.output));
+  } catch (error) {
+    console.error('Erro no screenshot em lote:', error);
+    res.status(500).json({
+      success: false,
+      error: error.error || 'Erro ao capturar janelas'
+    });
+  }
+});
+
 // Analisar tela (screenshot + análise)
 router.post('/analyze-screen', async (req, res) => {
   try {
-    const { prompt = "Descreva o que você vê nesta tela" } = req.body;
+    const { prompt = "Descreva o que você vê nesta tela", saveScreenshot = false, useCache = true } = req.body;
     
-    console.log('Analisando tela - Parâmetros recebidos:', { prompt });
+    console.log('Analisando tela - Parâmetros recebidos:', { prompt, saveScreenshot, useCache });
     
     // 1. Primeiro, tirar screenshot
     const screenshotScriptPath = path.join(__dirname, '..', 'scripts', 'screenshot_advanced.py');
+    // A imagem volta em base64 no próprio JSON; saveScreenshot=true também grava em screenshots/
     const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
-    const filename = `screen_analysis_${timestamp}.png`;
-    const screenshotArgs = ['screenshot', 'full', null, filename, 'true', 'false']; // exclude_assistant = true, open_image = false
+    const filename = saveScreenshot ? `screen_analysis_${timestamp}` : null;
+    // exclude_assistant = true, open_image = false, perfil reduzido para análise, com hash perceptual
+    const screenshotArgs = ['screenshot', 'full', null, filename, 'true', 'false', 'stdout', 'analysis', 'true'];
     
     console.log('Tirando screenshot...');
     const screenshotResult = await runPythonScript(screenshotScriptPath, screenshotArgs);
@@ -196,14 +276,34 @@ router.post('/analyze-screen', async (req, res) => {
       });
     }
     
-    console.log('Screenshot capturado:', screenshotData.filepath);
+    console.log('Screenshot capturado:', screenshotData.filepath || `${screenshotData.size} bytes em memória`);
+    
+    // Tela praticamente igual a uma já analisada com o mesmo prompt: reaproveitar a resposta
+    const cache = getAnalysisCache();
+    cache.recordHashTime(screenshotData.hash_ms);
+    if (useCache && screenshotData.phash) {
+      const cached = cache.get(screenshotData.phash, prompt);
+      if (cached) {
+        console.log('Análise reaproveitada do cache:', { distance: cached.distance, ageMs: cached.ageMs });
+        return res.json({
+          success: true,
+          message: 'Tela analisada com sucesso',
+          screenshotPath: screenshotData.filepath || null,
+          analysis: cached.value,
+          cached: true,
+          phash: screenshotData.phash,
+          timestamp: new Date().toISOString()
+        });
+      }
+    }
     
     // 2. Analisar a imagem capturada
     const analyzeResult = await fetch('http://localhost:3001/api/ai/analyze-image', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({
-        imagePath: screenshotData.filepath,
+        imageBase64: screenshotData.image_base64,
+        mimeType: screenshotData.mime_type,
         prompt: prompt
       })
     });
@@ -219,11 +319,17 @@ router.post('/analyze-screen', async (req, res) => {
     
     console.log('Análise concluída');
     
+    if (screenshotData.phash) {
+      cache.set(screenshotData.phash, prompt, analyzeData.response);
+    }
+    
     res.json({
       success: true,
       message: 'Tela analisada com sucesso',
-      screenshotPath: screenshotData.filepath,
+      screenshotPath: screenshotData.filepath || null,
       analysis: analyzeData.response,
+      cached: false,
+      phash: screenshotData.phash || null,
       timestamp: new Date().toISOString()
     });
     
@@ -236,6 +342,33 @@ router.post('/analyze-screen', async (req, res) => {
   }
 });
 
+// Contadores do cache de análises de tela
+router.get('/analysis-cache', (req, res) => {
+  res.json({ success: true, stats: getAnalysisCache().stats() });
+});
+
+// Limpar o cache de análises de tela
+router.delete('/analysis-cache', (req, res) => {
+  getAnalysisCache().clear();
+  res.json({ success: true, stats: getAnalysisCache().stats() });
+});
+
+// Listar capturas guardadas (a partir do índice de screenshots/)
+router.get('/screenshots', async (req, res) => {
+  try {
+    const { limit, type } = req.query;
+    const scriptPath = path.join(__dirname, '..', 'scripts', 'screenshot_advanced.py');
+    const result = await runPythonScript(scriptPath, ['list_screenshots', limit || '', type || '']);
+    
+    res.json(JSON.parse(result.output));
+  } catch (error) {
+    res.status(500).json({
+      success: false,
+      error: error.error || 'Erro ao listar capturas'
+    });
+  }
+});
+
 // Listar janelas disponíveis para screenshot
 router.post('/list-windows-screenshot', async (req, res) => {
   try {
@@ -335,11 +468,90 @@ router.post('/close-window', async (req, res) => {
   }
 });
 
+// Comandos em execução no modo streaming, por id (para cancelamento)
+const runningCommands = new Map();
+let nextCommandId = 1;
+
+// Executa o comando em modo streaming: cada linha de stdout/stderr vira um
+// evento NDJSON assim que chega; o resumo final traz só o final da saída
+const streamCommand = (command, tail, timeout, req, res) => {
+  const id = String(nextCommandId++);
+  const args = [path.join(__dirname, '../scripts/run_command.py'), '--stream'];
+  if (tail) args.push('--tail', String(tail));
+  if (timeout) args.push('--timeout', String(timeout));
+  args.push(command);
+
+  const child = spawn(process.env.PYTHON_PATH || 'python', args, {
+    cwd: path.join(__dirname, '..'),
+    stdio: ['pipe', 'pipe', 'pipe'],
+    env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+  });
+  runningCommands.set(id, child);
+
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('X-Command-Id', id);
+
+  let finished = false;
+  const cancel = () => {
+    if (!finished && child.stdin.writable) child.stdin.write('cancel\n');
+  };
+
+  readline.createInterface({ input: child.stdout }).on('line', (line) => {
+    let event;
+    try {
+      event = JSON.parse(line);
+    } catch (error) {
+      return;
+    }
+    if (event.event === 'started') event.id = id;
+    res.write(JSON.stringify(event) + '\n');
+  });
+
+  child.stderr.on('data', (data) => {
+    console.log('run_command stderr:', data.toString());
+  });
+
+  // Cliente desconectou: interrompe o comando
+  res.on('close', cancel);
+
+  child.on('close', () => {
+    finished = true;
+    runningCommands.delete(id);
+    res.end();
+  });
+
+  child.on('error', (error) => {
+    finished = true;
+    runningCommands.delete(id);
+    res.end(JSON.stringify({ event: 'error', error: error.message }) + '\n');
+  });
+};
+
 // Comando para executar comando do sistema
+// stream=true responde em NDJSON (started, line..., exit) em vez de esperar o fim
+// commands=[...] executa um lote de comandos independentes em paralelo (jobs por vez)
 router.post('/run-command', async (req, res) => {
   try {
-    const { command } = req.body;
-    
+    const { command, commands, stream = false, tail, timeout, jobs = 4, overallTimeout = 90 } = req.body;
+    
+    if (Array.isArray(commands)) {
+      const args = ['--batch', '--jobs', String(jobs), '--overall-timeout', String(overallTimeout)];
+      if (timeout) args.push('--timeout', String(timeout));
+      // O lote vai pelo stdin (sem limite de tamanho da linha de comando), então
+      // roda num processo próprio em vez do worker
+      const result = await spawnPythonScript('scripts/run_command.py', [...args, '-'], JSON.stringify(commands));
+      const batch = JSON.parse(result.output);
+      return res.json({
+        success: batch.success,
+        message: `${commands.length} comandos executados`,
+        error: batch.error,
+        results: batch.results,
+        jobs: batch.jobs,
+        durationMs: batch.duration_ms,
+        serialMs: batch.serial_ms
+      });
+    }
+
     if (!command) {
       return res.status(400).json({ 
         success: false, 
@@ -347,6 +559,10 @@ router.post('/run-command', async (req, res) => {
       });
     }
 
+    if (stream) {
+      return streamCommand(command, tail, timeout, req, res);
+    }
+
     const result = await runPythonScript('scripts/run_command.py', [command]);
     
     res.json({
@@ -362,6 +578,17 @@ router.post('/run-command', async (req, res) => {
   }
 });
 
+// Cancela um comando iniciado com stream=true (id do evento started / X-Command-Id)
+router.post('/run-command/cancel', (req, res) => {
+  const { id } = req.body;
+  const child = runningCommands.get(String(id));
+  if (!child) {
+    return res.status(404).json({ success: false, error: 'Comando não encontrado' });
+  }
+  child.stdin.write('cancel\n');
+  res.json({ success: true, message: `Cancelamento do comando ${id} solicitado` });
+});
+
 // Rota para abrir sites
 router.post('/open-website', async (req, res) => {
   try {
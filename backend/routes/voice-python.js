@@ -3,65 +3,114 @@ const { spawn } = require('child_process');
 const path = require('path');
 const router = express.Router();
 
+const { getSpeechService } = require('../utils/speechService');
+const { getTtsService } = require('../utils/ttsService');
+
+// Usar o serviço de voz persistente por padrão (VOICE_SERVICE=false volta a criar um processo por pedido)
+const USE_SPEECH_SERVICE = process.env.VOICE_SERVICE !== 'false';
+
+// Síntese de voz pelo serviço persistente (TTS_SERVICE=false volta a criar um processo por fala)
+const USE_TTS_SERVICE = process.env.TTS_SERVICE !== 'false';
+
+// Faixas aceitas para a fala: palavras por minuto e volume (0 a 1)
+const RATE_RANGE = [50, 400];
+const VOLUME_RANGE = [0, 1];
+
+// Número dentro da faixa; undefined usa o padrão do serviço, null quando inválido
+const clampSetting = (value, [min, max]) => {
+  if (value === undefined) return undefined;
+  const number = typeof value === 'number' ? value : (typeof value === 'string' && value.trim() ? Number(value) : NaN);
+  if (!Number.isFinite(number)) return null;
+  return Math.min(max, Math.max(min, number));
+};
+
+// Reconhecimento com um processo novo por pedido (VOICE_SERVICE=false)
+const recognizeWithSpawn = (duration, res) => {
+  console.log('🐍 Iniciando reconhecimento de voz com Python...');
+  
+  // Caminho para o script Python
+  const pythonScript = path.join(__dirname, '../voice_recognition.py');
+  
+  // Executar script Python
+  const pythonProcess = spawn('python', [pythonScript, duration.toString()], {
+    stdio: ['pipe', 'pipe', 'pipe']
+  });
+  
+  let output = '';
+  let errorOutput = '';
+  
+  pythonProcess.stdout.on('data', (data) => {
+    output += data.toString();
+    console.log('Python output:', data.toString());
+  });
+  
+  pythonProcess.stderr.on('data', (data) => {
+    errorOutput += data.toString();
+    console.log('Python stderr:', data.toString());
+  });
+  
+  pythonProcess.on('close', (code) => {
+    console.log('Python finalizado com código:', code);
+    console.log('Output final:', output);
+    
+    try {
+      // Tentar parsear JSON do output
+      const result = JSON.parse(output);
+      res.json(result);
+    } catch (error) {
+      console.error('Erro ao parsear JSON:', error);
+      res.json({
+        success: false,
+        error: 'Erro ao processar resultado do Python',
+        details: error.message,
+        rawOutput: output,
+        errorOutput: errorOutput
+      });
+    }
+  });
+  
+  pythonProcess.on('error', (error) => {
+    console.error('Erro no Python:', error);
+    res.status(500).json({
+      success: false,
+      error: 'Erro ao executar Python',
+      details: error.message
+    });
+  });
+};
+
 // Rota para reconhecimento de voz usando Python
+// stream=true responde em NDJSON com os eventos (listening, phrase-detected, transcript).
+// Sempre o microfone: caminhos de arquivo não vêm do cliente HTTP
 router.post('/start-recording', async (req, res) => {
   try {
-    const { duration = 5 } = req.body;
-    
-    console.log('🐍 Iniciando reconhecimento de voz com Python...');
+    const { duration = 5, stream = false } = req.body;
     
-    // Caminho para o script Python
-    const pythonScript = path.join(__dirname, '../voice_recognition.py');
-    
-    // Executar script Python
-    const pythonProcess = spawn('python', [pythonScript, duration.toString()], {
-      stdio: ['pipe', 'pipe', 'pipe']
-    });
-    
-    let output = '';
-    let errorOutput = '';
-    
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
-      console.log('Python output:', data.toString());
-    });
+    if (!USE_SPEECH_SERVICE) {
+      return recognizeWithSpawn(duration, res);
+    }
     
-    pythonProcess.stderr.on('data', (data) => {
-      errorOutput += data.toString();
-      console.log('Python stderr:', data.toString());
-    });
+    console.log('🐍 Reconhecendo voz com o serviço persistente...');
+    const service = getSpeechService();
     
-    pythonProcess.on('close', (code) => {
-      console.log('Python finalizado com código:', code);
-      console.log('Output final:', output);
-      
-      try {
-        // Tentar parsear JSON do output
-        const result = JSON.parse(output);
-        res.json(result);
-      } catch (error) {
-        console.error('Erro ao parsear JSON:', error);
-        res.json({
-          success: false,
-          error: 'Erro ao processar resultado do Python',
-          details: error.message,
-          rawOutput: output,
-          errorOutput: errorOutput
-        });
-      }
-    });
+    if (!stream) {
+      const { event, id, ...result } = await service.listen({ duration });
+      return res.json(result);
+    }
     
-    pythonProcess.on('error', (error) => {
-      console.error('Erro no Python:', error);
-      res.status(500).json({
-        success: false,
-        error: 'Erro ao executar Python',
-        details: error.message
-      });
+    res.setHeader('Content-Type', 'application/x-ndjson');
+    await service.listen({
+      duration,
+      onEvent: (event) => res.write(JSON.stringify(event) + '\n')
     });
+    res.end();
     
   } catch (error) {
     console.error('Erro ao iniciar gravação:', error);
+    if (res.headersSent) {
+      res.end(JSON.stringify({ event: 'error', error: error.message }) + '\n');
+      return;
+    }
     res.status(500).json({
       success: false,
       error: 'Erro interno do servidor',
@@ -70,60 +119,76 @@ router.post('/start-recording', async (req, res) => {
   }
 });
 
+// Síntese com um processo novo por pedido (TTS_SERVICE=false); o texto vai
+// como argumento, sem gerar script temporário
+const speakWithSpawn = (text, res) => {
+  const pythonScript = path.join(__dirname, '../tts_service.py');
+  const pythonProcess = spawn('python', [pythonScript, '--say', text], {
+    stdio: ['ignore', 'pipe', 'pipe'],
+    env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+  });
+
+  let output = '';
+  pythonProcess.stdout.on('data', (data) => {
+    output += data.toString();
+  });
+
+  pythonProcess.stderr.on('data', (data) => {
+    console.log('Python stderr:', data.toString());
+  });
+
+  pythonProcess.on('close', () => {
+    const lines = output.trim().split('\n').filter(Boolean);
+    let result = {};
+    try {
+      result = JSON.parse(lines[lines.length - 1] || '{}');
+    } catch (error) {
+      result = { success: false, error: 'Erro ao processar resultado do Python' };
+    }
+    if (result.event === 'error') result = { success: false, error: result.error };
+    const { event, id, ...details } = result;
+    res.json({ success: details.success !== false, message: 'Texto convertido para voz com sucesso', ...details });
+  });
+
+  pythonProcess.on('error', (error) => {
+    res.status(500).json({ success: false, error: 'Erro ao executar Python', details: error.message });
+  });
+};
+
 // Rota para síntese de voz usando Python
+// wait=false responde assim que a fala entra na fila (com a profundidade da fila)
 router.post('/speak', async (req, res) => {
   try {
-    const { text } = req.body;
+    const { text, rate, volume, wait = true } = req.body;
     
     if (!text) {
       return res.status(400).json({ error: 'Texto é obrigatório' });
     }
     
+    const speechRate = clampSetting(rate, RATE_RANGE);
+    const speechVolume = clampSetting(volume, VOLUME_RANGE);
+    if (speechRate === null || speechVolume === null) {
+      return res.status(400).json({
+        success: false,
+        error: `rate (${RATE_RANGE.join('-')}) e volume (${VOLUME_RANGE.join('-')}) devem ser números`
+      });
+    }
+    
     console.log('🔊 Convertendo texto para voz:', text);
     
-    // Usar pyttsx3 para síntese de voz
-    const pythonScript = `
-import pyttsx3
-import sys
-
-try:
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 150)  # Velocidade da fala
-    engine.setProperty('volume', 0.8)  # Volume
-    
-    # Configurar voz em português se disponível
-    voices = engine.getProperty('voices')
-    for voice in voices:
-        if 'portuguese' in voice.name.lower() or 'pt' in voice.id.lower():
-            engine.setProperty('voice', voice.id)
-            break
-    
-    engine.say("${text}")
-    engine.runAndWait()
-    print('{"success": true, "message": "Texto convertido para voz com sucesso"}')
-except Exception as e:
-    print(f'{{"success": false, "error": "{str(e)}"}}')
-`;
-    
-    // Salvar script temporário
-    const fs = require('fs');
-    const scriptPath = path.join(__dirname, '../temp_speech.py');
-    fs.writeFileSync(scriptPath, pythonScript);
-    
-    const pythonProcess = spawn('python', [scriptPath]);
-    
-    pythonProcess.on('close', (code) => {
-      // Limpar arquivo temporário
-      try {
-        fs.unlinkSync(scriptPath);
-      } catch (error) {
-        console.log('Erro ao limpar arquivo temporário:', error.message);
-      }
-      
-      res.json({
-        success: true,
-        message: 'Texto convertido para voz com sucesso'
-      });
+    if (!USE_TTS_SERVICE) {
+      return speakWithSpawn(text, res);
+    }
+    
+    const { event, id, ...result } = await getTtsService().speak({ text, rate: speechRate, volume: speechVolume, wait });
+    if (event === 'error') {
+      return res.status(500).json({ success: false, error: result.error });
+    }
+    
+    res.json({
+      success: result.success !== false,
+      message: wait ? 'Texto convertido para voz com sucesso' : 'Texto adicionado à fila de fala',
+      ...result
     });
     
   } catch (error) {
@@ -136,6 +201,36 @@ except Exception as e:
   }
 });
 
+// Pula a fala atual e segue a fila
+router.post('/speak/skip', async (req, res) => {
+  try {
+    const { event, id, ...result } = await getTtsService().skip();
+    res.json({ success: true, ...result });
+  } catch (error) {
+    res.status(500).json({ success: false, error: error.message });
+  }
+});
+
+// Interrompe a fala atual e esvazia a fila
+router.post('/speak/interrupt', async (req, res) => {
+  try {
+    const { event, id, ...result } = await getTtsService().interrupt();
+    res.json({ success: true, ...result });
+  } catch (error) {
+    res.status(500).json({ success: false, error: error.message });
+  }
+});
+
+// Profundidade da fila, fala atual e voz em uso
+router.get('/speak/status', async (req, res) => {
+  try {
+    const { event, id, ...result } = await getTtsService().status();
+    res.json({ success: true, ...result });
+  } catch (error) {
+    res.status(500).json({ success: false, error: error.message });
+  }
+});
+
 // Rota para verificar se Python está funcionando
 router.get('/test', async (req, res) => {
   try {
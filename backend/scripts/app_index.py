@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de busca de aplicativos compilado a partir de config/apps.json.
+
+IDs, nomes e palavras-chave viram um único TextIndex (sem acentos e sem
+diferença de maiúsculas). O índice fica em memória enquanto o processo vive
+(worker) e também em disco, identificado pelo mtime e tamanho do apps.json,
+para que um processo novo não precise recompilá-lo.
+"""
+
+import os
+import json
+import pickle
+
+from text_index import TextIndex, fold, normalize
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'apps.json')
+CACHE_PATH = os.path.join(os.path.dirname(CONFIG_PATH), '.apps_index.pickle')
+
+# Incrementar quando o formato do índice mudar
+INDEX_VERSION = 1
+
+# Ordem de prioridade em caso de empate: ID, depois nome, depois palavra-chave
+ALIAS_KINDS = ('id', 'name', 'keyword')
+
+# Pontuação de um alias igual à busca só sem acentos ("camera" / "Câmera")
+FOLDED_SCORE = 0.95
+
+# Teto de um alias que só fica igual à busca sem a pontuação ("notepad++" /
+# "notepad"): são apps diferentes, então vira correspondência aproximada
+PUNCTUATION_SCORE = 0.7
+
+# Desempate entre tipos de correspondência com a mesma pontuação
+MATCH_RANK = {'exact': 0, 'folded': 1, 'prefix': 2, 'fuzzy': 3}
+
+_loaded = {"key": None, "data": None}
+
+
+def build_index(config):
+    """
+    Compila o índice a partir da configuração já carregada
+    """
+    apps = (config or {}).get('apps', {})
+    aliases = {kind: [] for kind in ALIAS_KINDS}
+    for app_id, app_info in apps.items():
+        aliases['id'].append((app_id, 'id', app_id))
+        if app_info.get('name'):
+            aliases['name'].append((app_id, 'name', app_info['name']))
+        for keyword in app_info.get('keywords', []):
+            aliases['keyword'].append((app_id, 'keyword', keyword))
+
+    entries = [alias for kind in ALIAS_KINDS for alias in aliases[kind]]
+    return {"apps": apps, "index": TextIndex(entries, key=lambda alias: alias[2])}
+
+
+def _config_key(config_path):
+    stat = os.stat(config_path)
+    return (INDEX_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+def _read_cache(cache_path, key):
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('key') == key:
+            return cached['data']
+    except Exception:
+        pass
+    return None
+
+
+def _write_cache(cache_path, key, data):
+    try:
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump({"key": key, "data": data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except Exception:
+        pass
+
+
+def get_app_index(config_path=CONFIG_PATH, cache_path=CACHE_PATH):
+    """
+    Retorna o índice atual: da memória, do cache em disco ou recompilado do JSON
+    """
+    key = _config_key(config_path)
+    if _loaded["key"] == key:
+        return _loaded["data"]
+
+    data = _read_cache(cache_path, key)
+    if data is None:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data = build_index(json.load(f))
+        _write_cache(cache_path, key, data)
+
+    _loaded["key"] = key
+    _loaded["data"] = data
+    return data
+
+
+def find_apps(query, limit=5, min_score=0.35, data=None):
+    """
+    Busca aplicativos por ID, nome ou palavra-chave. Retorna uma lista
+    ordenada com o melhor alias de cada app:
+    [{"id", "app", "score", "match": exact|folded|prefix|fuzzy, "alias", "kind"}]
+    exact só quando o texto é igual ignorando maiúsculas; folded quando
+    difere só nos acentos.
+    """
+    data = data or get_app_index()
+    normalized_query = normalize(query)
+    raw_query = ' '.join(query.casefold().split())
+    folded_query = fold(query)
+
+    best = {}
+    for order, ((app_id, kind, alias), score) in enumerate(
+            data["index"].search(query, limit=None, min_score=min_score)):
+        normalized_alias = normalize(alias)
+        alias_tokens = normalized_alias.split()
+        if ' '.join(alias.casefold().split()) == raw_query:
+            match = 'exact'
+        elif fold(alias) == folded_query:
+            match, score = 'folded', min(score, FOLDED_SCORE)
+        elif normalized_alias == normalized_query:
+            match, score = 'fuzzy', min(score, PUNCTUATION_SCORE)
+        elif all(any(token.startswith(part) for token in alias_tokens) for part in normalized_query.split()):
+            match = 'prefix'
+        else:
+            match = 'fuzzy'
+        if score < min_score:
+            continue
+
+        rank = (-score, MATCH_RANK[match], order)
+        if app_id not in best or rank < best[app_id][0]:
+            best[app_id] = (rank, {
+                "id": app_id,
+                "app": data["apps"][app_id],
+                "score": score,
+                "match": match,
+                "alias": alias,
+                "kind": kind,
+            })
+
+    results = [result for _, result in sorted(best.values(), key=lambda item: item[0])]
+    return results[:limit] if limit else results
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backends de volume do sistema.
+
+Cada backend lê e define o nível absoluto (0-100) e o mudo do dispositivo de
+saída padrão numa única chamada:
+- EndpointBackend: IAudioEndpointVolume do Windows (Core Audio), via a
+  sessão PowerShell persistente de shell_session (com SHELL_POOL=false, um
+  processo por chamada que carrega a DLL compilada na primeira vez)
+- PactlBackend: PulseAudio/PipeWire via pactl
+- WpctlBackend: PipeWire via wpctl
+- KeyPressBackend: último recurso, teclas de volume (cada uma ~2%); não lê o
+  nível e define um valor absoluto descendo até zero e subindo
+- FakeAudioBackend: volume em memória, para testes
+
+Os backends disponíveis são levantados na primeira chamada (VOLUME_BACKEND,
+ou a ordem da plataforma) e cada operação usa o primeiro que funcionar; uma
+falha (ex.: dispositivo desconectado) só passa aquela chamada adiante.
+"""
+
+import os
+import re
+import sys
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+
+# auto escolhe pela plataforma; ou um nome de BACKENDS
+BACKEND = os.environ.get('VOLUME_BACKEND', 'auto').lower()
+
+# Passo (%) de volume_up/volume_down, o mesmo de uma tecla de volume
+STEP = 2
+
+# Timeout (s) das ferramentas de linha de comando
+TOOL_TIMEOUT = 5
+
+# IAudioEndpointVolume do dispositivo de saída padrão
+AUDIO_SOURCE = r'''
+using System;
+using System.Runtime.InteropServices;
+[Guid("5CDF2C82-841E-4546-9722-0CF74078229A"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown), ComImport]
+interface IAudioEndpointVolume {
+    int NotImpl1(); int NotImpl2(); int NotImpl3(); int NotImpl4();
+    int SetMasterVolumeLevelScalar(float fLevel, Guid pguidEventContext);
+    int NotImpl5();
+    int GetMasterVolumeLevelScalar(out float pfLevel);
+    int NotImpl6(); int NotImpl7(); int NotImpl8(); int NotImpl9();
+    int SetMute([MarshalAs(UnmanagedType.Bool)] bool bMute, Guid pguidEventContext);
+    int GetMute([MarshalAs(UnmanagedType.Bool)] out bool pbMute);
+}
+[Guid("D666063F-1587-4E43-81F1-B948E807363F"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown), ComImport]
+interface IMMDevice {
+    int Activate(ref Guid id, int clsCtx, IntPtr activationParams, out IAudioEndpointVolume aev);
+}
+[Guid("A95664D2-9614-4F35-A746-DE8DB63617E6"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown), ComImport]
+interface IMMDeviceEnumerator {
+    int NotImpl1();
+    int GetDefaultAudioEndpoint(int dataFlow, int role, out IMMDevice endpoint);
+}
+[ComImport, Guid("BCDE0395-E52F-467C-8E3D-C4579291692E")]
+class MMDeviceEnumeratorComObject { }
+public class AssistantAudio {
+    static IAudioEndpointVolume Endpoint() {
+        var enumerator = new MMDeviceEnumeratorComObject() as IMMDeviceEnumerator;
+        IMMDevice device;
+        Marshal.ThrowExceptionForHR(enumerator.GetDefaultAudioEndpoint(0, 1, out device));
+        IAudioEndpointVolume volume;
+        var id = typeof(IAudioEndpointVolume).GUID;
+        Marshal.ThrowExceptionForHR(device.Activate(ref id, 23, IntPtr.Zero, out volume));
+        return volume;
+    }
+    public static string State() {
+        var volume = Endpoint();
+        float level; bool muted;
+        Marshal.ThrowExceptionForHR(volume.GetMasterVolumeLevelScalar(out level));
+        Marshal.ThrowExceptionForHR(volume.GetMute(out muted));
+        return String.Format("{0} {1}", (int)Math.Round(level * 100), muted ? 1 : 0);
+    }
+    public static string SetLevel(int level) {
+        Marshal.ThrowExceptionForHR(Endpoint().SetMasterVolumeLevelScalar(level / 100f, Guid.Empty));
+        return State();
+    }
+    public static string SetMute(bool muted) {
+        Marshal.ThrowExceptionForHR(Endpoint().SetMute(muted, Guid.Empty));
+        return State();
+    }
+}
+'''
+
+# Compilado uma vez por sessão do pool (o teste de tipo evita um segundo Add-Type)
+AUDIO_TYPES = f'''
+if (-not ('AssistantAudio' -as [type])) {{
+Add-Type -TypeDefinition @"
+{AUDIO_SOURCE}
+"@
+}}
+'''
+
+# Sem o pool cada chamada é um processo novo: a DLL é compilada uma vez (o
+# nome muda junto com o código) e depois só carregada
+AUDIO_ASSEMBLY = os.path.join(tempfile.gettempdir(),
+                              f"assistant_audio_{hashlib.sha1(AUDIO_SOURCE.encode()).hexdigest()[:12]}.dll")
+
+AUDIO_ASSEMBLY_LOADER = f'''
+$__dll = '{AUDIO_ASSEMBLY.replace("'", "''")}'
+if (-not (Test-Path -LiteralPath $__dll)) {{
+$__tmp = "$__dll.$PID.dll"
+Add-Type -TypeDefinition @"
+{AUDIO_SOURCE}
+"@ -OutputAssembly $__tmp -OutputType Library
+Move-Item -LiteralPath $__tmp -Destination $__dll -Force -ErrorAction SilentlyContinue
+}}
+if (-not ('AssistantAudio' -as [type])) {{ Add-Type -Path $__dll }}
+'''
+
+
+def clamp(level):
+    return max(0, min(100, int(round(level))))
+
+
+def run_tool(args):
+    """
+    Executa uma ferramenta de áudio e devolve o stdout (levanta em erro)
+    """
+    completed = subprocess.run(args, capture_output=True, text=True, timeout=TOOL_TIMEOUT)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{args[0]} falhou: {(completed.stderr or completed.stdout).strip()}")
+    return completed.stdout
+
+
+class EndpointBackend:
+    """
+    Volume mestre do Windows pela interface Core Audio (IAudioEndpointVolume)
+    """
+
+    name = 'endpoint'
+    absolute = True
+
+    def available(self):
+        return sys.platform == 'win32'
+
+    def _call(self, expression):
+        import shell_session
+        if shell_session.ENABLED:
+            output = shell_session.run_powershell(AUDIO_TYPES + expression)["output"].split()
+        else:
+            # Só a DLL de áudio, sem recompilar nada (nem WIN32_TYPES)
+            dialect = shell_session.get_dialect('powershell')
+            output = run_tool(dialect.one_shot(AUDIO_ASSEMBLY_LOADER + expression)).split()
+        return {"level": int(output[-2]), "muted": output[-1] == '1'}
+
+    def get_state(self):
+        return self._call('[AssistantAudio]::State()')
+
+    def set_level(self, level):
+        return self._call(f'[AssistantAudio]::SetLevel({clamp(level)})')
+
+    def set_mute(self, muted):
+        return self._call(f'[AssistantAudio]::SetMute(${"true" if muted else "false"})')
+
+
+class PactlBackend:
+    """
+    Sink padrão do PulseAudio (ou do pipewire-pulse) via pactl
+    """
+
+    name = 'pactl'
+    absolute = True
+    sink = '@DEFAULT_SINK@'
+
+    def available(self):
+        return shutil.which('pactl') is not None
+
+    def get_state(self):
+        volume = run_tool(['pactl', 'get-sink-volume', self.sink])
+        mute = run_tool(['pactl', 'get-sink-mute', self.sink])
+        levels = [int(value) for value in re.findall(r'(\d+)%', volume)]
+        if not levels:
+            raise RuntimeError(f"Volume não reconhecido na saída do pactl: {volume.strip()}")
+        # Média dos canais (o balanço pode deixá-los diferentes)
+        return {"level": clamp(sum(levels) / len(levels)), "muted": 'yes' in mute.lower()}
+
+    def set_level(self, level):
+        run_tool(['pactl', 'set-sink-volume', self.sink, f"{clamp(level)}%"])
+        return self.get_state()
+
+    def set_mute(self, muted):
+        run_tool(['pactl', 'set-sink-mute', self.sink, '1' if muted else '0'])
+        return self.get_state()
+
+
+class WpctlBackend:
+    """
+    Sink padrão do PipeWire via wpctl (WirePlumber)
+    """
+
+    name = 'wpctl'
+    absolute = True
+    sink = '@DEFAULT_AUDIO_SINK@'
+
+    def available(self):
+        return shutil.which('wpctl') is not None
+
+    def get_state(self):
+        output = run_tool(['wpctl', 'get-volume', self.sink])
+        match = re.search(r'Volume:\s*([\d.]+)', output)
+        if not match:
+            raise RuntimeError(f"Volume não reconhecido na saída do wpctl: {output.strip()}")
+        return {"level": clamp(float(match.group(1)) * 100), "muted": '[MUTED]' in output}
+
+    def set_level(self, level):
+        run_tool(['wpctl', 'set-volume', self.sink, f"{clamp(level) / 100:.2f}"])
+        return self.get_state()
+
+    def set_mute(self, muted):
+        run_tool(['wpctl', 'set-mute', self.sink, '1' if muted else '0'])
+        return self.get_state()
+
+
+class KeyPressBackend:
+    """
+    Teclas de volume (pyautogui, ou AssistantWin32 na sessão PowerShell).
+    Não lê o nível: get_state devolve level None e o mudo só alterna.
+    """
+
+    name = 'keys'
+    absolute = False
+
+    # Tecla virtual do Windows e nome no pyautogui
+    KEYS = {'up': (0xAF, 'volumeup'), 'down': (0xAE, 'volumedown'), 'mute': (0xAD, 'volumemute')}
+
+    def available(self):
+        if sys.platform == 'win32':
+            return True
+        try:
+            import pyautogui  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def press(self, key, times=1, delay_ms=0):
+        code, name = self.KEYS[key]
+        if times <= 0:
+            return
+        try:
+            import pyautogui
+            pyautogui.press(name, presses=times, interval=delay_ms / 1000)
+        except Exception:
+            if sys.platform != 'win32':
+                raise
+            from shell_session import run_powershell
+            run_powershell(f"[AssistantWin32]::PressKey({code}, {times}, {delay_ms})")
+
+    def get_state(self):
+        return {"level": None, "muted": None}
+
+    def set_level(self, level):
+        # Desce até zero antes de subir: o resultado não depende do nível atual
+        self.press('down', 100 // STEP, 10)
+        self.press('up', clamp(level) // STEP, 10)
+        return {"level": clamp(level), "muted": None}
+
+    def step(self, direction):
+        self.press(direction)
+        return {"level": None, "muted": None}
+
+    def set_mute(self, muted):
+        self.press('mute')
+        return {"level": None, "muted": None}
+
+
+class FakeAudioBackend:
+    """
+    Volume em memória; calls registra as operações
+    """
+
+    name = 'fake'
+    absolute = True
+
+    def __init__(self, level=50, muted=False):
+        self.level = clamp(level)
+        self.muted = muted
+        self.calls = []
+
+    def available(self):
+        return True
+
+    def get_state(self):
+        self.calls.append(('get',))
+        return {"level": self.level, "muted": self.muted}
+
+    def set_level(self, level):
+        self.calls.append(('set', level))
+        self.level = clamp(level)
+        return {"level": self.level, "muted": self.muted}
+
+    def set_mute(self, muted):
+        self.calls.append(('mute', muted))
+        self.muted = bool(muted)
+        return {"level": self.level, "muted": self.muted}
+
+
+BACKENDS = {
+    'endpoint': EndpointBackend,
+    'pactl': PactlBackend,
+    'wpctl': WpctlBackend,
+    'keys': KeyPressBackend,
+    'fake': FakeAudioBackend,
+}
+
+# Ordem de preferência por plataforma (teclas sempre por último)
+PLATFORM_ORDER = {
+    'win32': ['endpoint', 'keys'],
+    'darwin': ['keys'],
+}
+DEFAULT_ORDER = ['pactl', 'wpctl', 'keys']
+
+
+_lock = threading.RLock()
+_backend = {"chain": None}
+
+
+def backend_chain():
+    """
+    Backends disponíveis na ordem em que são tentados
+    """
+    with _lock:
+        if _backend["chain"] is None:
+            if BACKEND != 'auto':
+                if BACKEND not in BACKENDS:
+                    raise ValueError(f"Backend de volume desconhecido: {BACKEND} (use {', '.join(BACKENDS)})")
+                names = [BACKEND] + (['keys'] if BACKEND != 'keys' and BACKEND != 'fake' else [])
+            else:
+                names = PLATFORM_ORDER.get(sys.platform, DEFAULT_ORDER)
+            backends = [BACKENDS[name]() for name in names]
+            _backend["chain"] = [backend for backend in backends if backend.available()]
+        return list(_backend["chain"])
+
+
+def set_backend(*backends):
+    """
+    Troca os backends (ex.: FakeAudioBackend em testes); sem argumentos volta
+    à escolha automática
+    """
+    with _lock:
+        _backend["chain"] = list(backends) if backends else None
+
+
+def call(operation, *args):
+    """
+    Executa a operação no primeiro backend que funcionar. Retorna o estado
+    {level, muted} com o nome do backend usado.
+    """
+    errors = []
+    for backend in backend_chain():
+        method = getattr(backend, operation, None)
+        if method is None:
+            continue
+        try:
+            state = method(*args)
+        except Exception as e:
+            errors.append(f"{backend.name}: {e}")
+            continue
+        return {**state, "backend": backend.name, "absolute": backend.absolute}
+    raise RuntimeError('; '.join(errors) or 'Nenhum backend de volume disponível')
+
+
+def get_state():
+    return call('get_state')
+
+
+def set_level(level):
+    return call('set_level', level)
+
+
+def set_mute(muted):
+    return call('set_mute', muted)
+
+
+def step(direction, amount=STEP):
+    """
+    Sobe ('up') ou desce ('down') o volume em amount pontos
+    """
+    errors = []
+    delta = amount if direction == 'up' else -amount
+    for backend in backend_chain():
+        try:
+            if backend.absolute:
+                state = backend.set_level(backend.get_state()["level"] + delta)
+            else:
+                state = backend.step(direction)
+        except Exception as e:
+            errors.append(f"{backend.name}: {e}")
+            continue
+        return {**state, "backend": backend.name, "absolute": backend.absolute}
+    raise RuntimeError('; '.join(errors) or 'Nenhum backend de volume disponível')
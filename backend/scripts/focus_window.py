@@ -2,48 +2,41 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import os
 import time
 import json
 
+import window_snapshot
+
+# Prazo (s) para restaurar e trazer a janela para o primeiro plano
+FOCUS_DEADLINE = 1.5
+
 def focus_window(window_title):
     """
-    Foca em uma janela específica
+    Foca em uma janela específica, esperando pelo estado real da janela
+    (restaurada e ativa) em vez de pausas fixas
     """
     try:
-        import pygetwindow as gw
+        # Encontrar a janela (busca por similaridade, sem acentos/maiúsculas)
+        matches = window_snapshot.find_windows(window_title)
         
-        # Encontrar a janela
-        target_window = None
-        for window in gw.getAllWindows():
-            if window.title and window.visible:
-                # Busca mais flexível - normalizar strings
-                window_title_normalized = window_title.lower().strip()
-                window_title_actual = window.title.lower().strip()
-                
-                if (window_title_normalized in window_title_actual or 
-                    window_title_actual in window_title_normalized or
-                    'paint' in window_title_actual and 'paint' in window_title_normalized):
-                    target_window = window
-                    break
-        
-        if not target_window:
+        if not matches:
             return {"success": False, "error": f"Janela '{window_title}' não encontrada"}
         
-        # Restaurar se estiver minimizada
-        if target_window.isMinimized:
-            target_window.restore()
-            time.sleep(0.5)
-        
-        # Focar na janela
-        target_window.activate()
-        time.sleep(0.3)
+        target_window, score = matches[0]
         
-        return {
-            "success": True,
-            "message": f"Foco direcionado para '{target_window.title}'",
-            "window_title": target_window.title
+        # Restaurar (se minimizada) e focar na janela
+        active, waits = window_snapshot.focus(target_window, deadline=time.monotonic() + FOCUS_DEADLINE)
+        result = {
+            "success": active,
+            "message": f"Foco direcionado para '{target_window['title']}'",
+            "window_title": target_window["title"],
+            "score": score,
+            "candidates": [{"title": w["title"], "score": s} for w, s in matches],
+            "waits": {stage: round(seconds * 1000, 1) for stage, seconds in waits.items()}
         }
+        if not active:
+            result["error"] = f"Janela '{target_window['title']}' não ficou em primeiro plano"
+        return result
         
     except ImportError as e:
         return {"success": False, "error": f"Biblioteca necessária não encontrada: {e}"}
@@ -55,17 +48,15 @@ def list_windows():
     Lista todas as janelas disponíveis para foco
     """
     try:
-        import pygetwindow as gw
-        
         windows = []
-        for window in gw.getAllWindows():
-            if window.title and window.visible and not window.isMinimized:
+        for window in window_snapshot.get_windows():
+            if window["title"] and window["visible"] and not window["isMinimized"]:
                 windows.append({
-                    "title": window.title,
-                    "left": window.left,
-                    "top": window.top,
-                    "width": window.width,
-                    "height": window.height
+                    "title": window["title"],
+                    "left": window["left"],
+                    "top": window["top"],
+                    "width": window["width"],
+                    "height": window["height"]
                 })
         
         return {
@@ -78,16 +69,22 @@ def list_windows():
     except Exception as e:
         return {"success": False, "error": f"Erro ao listar janelas: {e}"}
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if len(argv) < 1:
         print(json.dumps({"success": False, "error": "Parâmetros insuficientes"}))
         sys.exit(1)
     
-    action = sys.argv[1]
+    action = argv[0]
     
     if action == "focus":
         # Parâmetros: window_title
-        window_title = sys.argv[2] if len(sys.argv) > 2 else None
+        window_title = argv[1] if len(argv) > 1 else None
         
         if not window_title:
             print(json.dumps({"success": False, "error": "Título da janela é obrigatório"}))
@@ -101,3 +98,6 @@ if __name__ == "__main__":
     
     else:
         print(json.dumps({"success": False, "error": f"Ação '{action}' não reconhecida"}))
+
+if __name__ == "__main__":
+    main()
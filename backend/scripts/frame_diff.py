@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecção de mudanças entre quadros de tela por blocos (tiles).
+
+Cada quadro (array NumPy altura x largura x canais) é comparado com o
+anterior de uma vez só: a diferença por pixel é reduzida para uma grade de
+blocos de tile_size x tile_size, e só os blocos alterados são reportados.
+A cada keyframe_interval quadros (ou quando a resolução muda) o quadro
+inteiro é marcado como keyframe.
+"""
+
+import numpy as np
+
+
+class FrameDiffer:
+    """
+    Compara quadros consecutivos e retorna os blocos alterados
+    """
+
+    def __init__(self, tile_size=64, keyframe_interval=30, threshold=0):
+        """
+        threshold: diferença máxima por canal ignorada (ruído de compressão/cursor)
+        """
+        self.tile_size = tile_size
+        self.keyframe_interval = keyframe_interval
+        self.threshold = threshold
+        self.previous = None
+        self.frame_count = 0
+
+    def reset(self):
+        """
+        Esquece o quadro anterior; o próximo será um keyframe
+        """
+        self.previous = None
+
+    def changed_mask(self, frame):
+        """
+        Grade booleana (linhas x colunas de blocos) com os blocos alterados
+        """
+        previous = self.previous
+        if self.threshold:
+            changed = np.abs(frame.astype(np.int16) - previous) > self.threshold
+        else:
+            changed = frame != previous
+
+        # Canais ficam juntos na linha (altura x largura*canais): reduzir o
+        # eixo curto dos canais separadamente é muito mais lento
+        tile = self.tile_size
+        height, width = changed.shape[:2]
+        channels = changed.shape[2] if changed.ndim == 3 else 1
+        changed = changed.reshape(height, width * channels)
+
+        rows = -(-height // tile)
+        cols = -(-width // tile)
+        if rows * tile != height or cols * tile != width:
+            padded = np.zeros((rows * tile, cols * tile * channels), dtype=bool)
+            padded[:height, :width * channels] = changed
+            changed = padded
+        return changed.reshape(rows, tile, cols, tile * channels).any(axis=(1, 3))
+
+    def tiles(self, mask, height, width):
+        """
+        Converte a grade de blocos alterados em [(x, y, largura, altura)]
+        """
+        tile = self.tile_size
+        return [(int(col) * tile, int(row) * tile,
+                 min(tile, width - int(col) * tile), min(tile, height - int(row) * tile))
+                for row, col in zip(*np.nonzero(mask))]
+
+    def diff(self, frame):
+        """
+        Processa um quadro; retorna (é_keyframe, [(x, y, largura, altura)]).
+        Em um keyframe a lista traz um único retângulo com o quadro inteiro.
+        """
+        frame = np.ascontiguousarray(frame)
+        height, width = frame.shape[:2]
+        keyframe = bool(self.previous is None
+                        or self.previous.shape != frame.shape
+                        or (self.keyframe_interval and self.frame_count % self.keyframe_interval == 0))
+
+        if keyframe:
+            rectangles = [(0, 0, width, height)]
+        else:
+            rectangles = self.tiles(self.changed_mask(frame), height, width)
+
+        self.previous = frame
+        self.frame_count += 1
+        return keyframe, rectangles
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfis de codificação das capturas de tela.
+
+- original: resolução cheia em PNG, como sempre foi salvo
+- analysis: reduzida para a maior dimensão configurada e codificada com
+  perda (JPEG/WebP), bem menor e mais rápida de gerar para o modelo de visão
+
+A codificação pode rodar em uma thread separada (encode_async): o Pillow
+libera o GIL ao redimensionar e comprimir, então restaurar as janelas do
+assistente acontece em paralelo.
+"""
+
+import os
+import time
+import atexit
+import threading
+
+# Formato -> (tipo MIME, extensão)
+FORMATS = {
+    'PNG': ('image/png', '.png'),
+    'JPEG': ('image/jpeg', '.jpg'),
+    'WEBP': ('image/webp', '.webp'),
+}
+
+CAPTURE_PROFILES = {
+    "original": {
+        "max_dimension": None,
+        "format": 'PNG',
+        "quality": None,
+        "compress_level": 6,
+    },
+    "analysis": {
+        "max_dimension": int(os.environ.get('SCREENSHOT_ANALYSIS_MAX_DIMENSION', '1568')),
+        "format": os.environ.get('SCREENSHOT_ANALYSIS_FORMAT', 'JPEG').upper(),
+        "quality": int(os.environ.get('SCREENSHOT_ANALYSIS_QUALITY', '80')),
+        "compress_level": 1,
+    },
+}
+
+_executor = {"pool": None}
+_executor_lock = threading.Lock()
+
+
+def resolve_profile(profile="original", **overrides):
+    """
+    Configuração final de um perfil; valores None em overrides são ignorados
+    """
+    if profile not in CAPTURE_PROFILES:
+        raise ValueError(f"Perfil de captura '{profile}' não suportado")
+    settings = dict(CAPTURE_PROFILES[profile])
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    settings["format"] = settings["format"].upper()
+    if settings["format"] not in FORMATS:
+        raise ValueError(f"Formato de imagem '{settings['format']}' não suportado")
+    return settings
+
+
+def downscale(image, max_dimension):
+    """
+    Reduz a imagem para que o maior lado tenha no máximo max_dimension pixels
+    """
+    if not max_dimension or max(image.size) <= max_dimension:
+        return image
+    from PIL import Image
+    ratio = max_dimension / max(image.size)
+    size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+    # reducing_gap faz uma redução inteira rápida antes do filtro final
+    return image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+
+def _webp_available():
+    try:
+        from PIL import features
+        return features.check('webp')
+    except Exception:
+        return False
+
+
+def encode_image(image, profile="original", **overrides):
+    """
+    Redimensiona e codifica conforme o perfil. Retorna (bytes, info) com
+    formato, tipo MIME, extensão, dimensões e tempo de codificação em ms.
+    """
+    import io
+
+    settings = resolve_profile(profile, **overrides)
+    start = time.perf_counter()
+
+    image_format = settings["format"]
+    if image_format == 'WEBP' and not _webp_available():
+        image_format = 'JPEG'
+
+    source_size = image.size
+    image = downscale(image, settings["max_dimension"])
+
+    options = {}
+    if image_format == 'PNG':
+        options["compress_level"] = settings["compress_level"]
+    else:
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        options["quality"] = settings["quality"] or 80
+        if image_format == 'WEBP':
+            options["method"] = 0  # mais rápido
+
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    data = buffer.getvalue()
+
+    mime_type, extension = FORMATS[image_format]
+    return data, {
+        "profile": profile,
+        "format": image_format,
+        "mime_type": mime_type,
+        "extension": extension,
+        "width": image.width,
+        "height": image.height,
+        "source_width": source_size[0],
+        "source_height": source_size[1],
+        "size": len(data),
+        "encode_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def run_async(function, *args, **kwargs):
+    """
+    Executa a função na thread de codificação; retorna um Future
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _executor_lock:
+        if _executor["pool"] is None:
+            _executor["pool"] = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-encode')
+        pool = _executor["pool"]
+    return pool.submit(function, *args, **kwargs)
+
+
+def encode_async(image, profile="original", **overrides):
+    """
+    Inicia encode_image em uma thread; retorna um Future com (bytes, info)
+    """
+    return run_async(encode_image, image, profile, **overrides)
+
+
+def shutdown():
+    """
+    Termina as codificações pendentes e encerra as threads
+    """
+    with _executor_lock:
+        pool, _executor["pool"] = _executor["pool"], None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown)
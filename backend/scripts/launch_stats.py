@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estatísticas persistentes dos métodos de abertura de aplicativos.
+
+Para cada app e método guarda tentativas, sucessos, falhas consecutivas e a
+latência média (média móvel exponencial) das aberturas bem-sucedidas. A
+ordem de tentativa de open_application é derivada daqui: o método que
+historicamente abre mais rápido vem primeiro e métodos que falham
+seguidamente são pulados até RETRY_AFTER segundos depois da última falha.
+"""
+
+import os
+import json
+import time
+import threading
+
+STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', '.launch_stats.json')
+
+# Falhas seguidas para um método deixar de ser tentado
+SKIP_AFTER_FAILURES = 3
+
+# Depois desse tempo sem tentar, um método pulado ganha nova chance
+RETRY_AFTER = 24 * 60 * 60
+
+# Peso da última medição na média de latência
+LATENCY_SMOOTHING = 0.3
+
+_lock = threading.Lock()
+
+
+def load_stats(path=STATS_PATH):
+    """
+    Lê o arquivo de estatísticas ({app: {método: {...}}})
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_stats(stats, path=STATS_PATH):
+    """
+    Grava as estatísticas de forma atômica
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def record_attempt(app_id, method, success, elapsed_ms, path=STATS_PATH):
+    """
+    Registra o resultado e a latência de uma tentativa de abertura
+    """
+    with _lock:
+        stats = load_stats(path)
+        entry = stats.setdefault(app_id, {}).setdefault(method, {
+            "attempts": 0, "successes": 0, "consecutive_failures": 0,
+            "avg_ms": None, "last_ms": None, "last_attempt": None,
+        })
+        entry["attempts"] += 1
+        entry["last_ms"] = round(elapsed_ms, 1)
+        entry["last_attempt"] = time.time()
+        if success:
+            entry["successes"] += 1
+            entry["consecutive_failures"] = 0
+            if entry["avg_ms"] is None:
+                entry["avg_ms"] = round(elapsed_ms, 1)
+            else:
+                entry["avg_ms"] = round((1 - LATENCY_SMOOTHING) * entry["avg_ms"]
+                                        + LATENCY_SMOOTHING * elapsed_ms, 1)
+        else:
+            entry["consecutive_failures"] += 1
+        try:
+            save_stats(stats, path)
+        except OSError:
+            pass
+
+
+def is_skipped(entry, now=None):
+    """
+    Indica se um método falhou vezes demais seguidas para ser tentado agora
+    """
+    if not entry or entry["consecutive_failures"] < SKIP_AFTER_FAILURES:
+        return False
+    now = now or time.time()
+    return now - (entry.get("last_attempt") or 0) < RETRY_AFTER
+
+
+def order_methods(app_id, methods, stats=None):
+    """
+    Ordena os métodos para um app: primeiro os que já funcionaram, do mais
+    rápido para o mais lento; depois os sem histórico de sucesso na ordem
+    padrão. Métodos pulados só entram se todos estiverem pulados.
+    """
+    stats = load_stats() if stats is None else stats
+    app_stats = stats.get(app_id, {})
+
+    def sort_key(item):
+        position, method = item
+        entry = app_stats.get(method)
+        if entry and entry["successes"] and entry["avg_ms"] is not None:
+            return (0, entry["avg_ms"], position)
+        return (1, 0, position)
+
+    ordered = [method for _, method in sorted(enumerate(methods), key=sort_key)]
+    active = [method for method in ordered if not is_skipped(app_stats.get(method))]
+    return active or ordered
+
+
+def summarize(app_id=None, methods=None, stats=None):
+    """
+    Resumo por app: tempo até abrir, taxa de sucesso por método e ordem atual
+    """
+    stats = load_stats() if stats is None else stats
+    summary = {}
+    for current_app, app_stats in sorted(stats.items()):
+        if app_id and current_app != app_id:
+            continue
+        method_summary = {}
+        for method, entry in app_stats.items():
+            method_summary[method] = {
+                "attempts": entry["attempts"],
+                "success_rate": round(entry["successes"] / entry["attempts"], 2) if entry["attempts"] else 0.0,
+                "avg_ms": entry["avg_ms"],
+                "last_ms": entry["last_ms"],
+                "consecutive_failures": entry["consecutive_failures"],
+                "skipped": is_skipped(entry),
+            }
+        successful = [m["avg_ms"] for m in method_summary.values() if m["avg_ms"] is not None]
+        summary[current_app] = {
+            "time_to_launch_ms": min(successful) if successful else None,
+            "methods": method_summary,
+            "order": order_methods(current_app, methods or list(app_stats), stats),
+        }
+    return summary
@@ -4,89 +4,56 @@
 import sys
 import json
 
+import window_snapshot
+
 def list_windows():
     """
     Lista todas as janelas abertas
     """
     try:
-        import pygetwindow as gw
-        
         windows = []
-        for window in gw.getAllWindows():
-            if window.title.strip():  # Ignorar janelas sem título
+        for window in window_snapshot.get_windows():
+            if window['title'].strip():  # Ignorar janelas sem título
                 windows.append({
-                    'title': window.title,
-                    'left': window.left,
-                    'top': window.top,
-                    'width': window.width,
-                    'height': window.height,
-                    'isMinimized': window.isMinimized,
-                    'isMaximized': window.isMaximized,
-                    'isActive': window.isActive
+                    'title': window['title'],
+                    'left': window['left'],
+                    'top': window['top'],
+                    'width': window['width'],
+                    'height': window['height'],
+                    'isMinimized': window['isMinimized'],
+                    'isMaximized': window['isMaximized'],
+                    'isActive': window['isActive']
                 })
         
         if windows:  # Se conseguiu listar janelas
             return windows
         else:
-            raise Exception("Nenhuma janela encontrada com pygetwindow")
+            raise Exception("Nenhuma janela encontrada no snapshot")
         
     except (ImportError, Exception):
         # Fallback: usar PowerShell
         try:
-            import subprocess
+            from shell_session import run_powershell
             
+            # Tipos Win32 (AssistantWin32) já carregados na sessão do pool
             ps_command = """
-            Add-Type -TypeDefinition @"
-            using System;
-            using System.Runtime.InteropServices;
-            using System.Text;
-            public class Win32 {
-                [DllImport("user32.dll")]
-                public static extern bool EnumWindows(EnumWindowsProc enumProc, IntPtr lParam);
-                [DllImport("user32.dll")]
-                public static extern int GetWindowText(IntPtr hWnd, StringBuilder lpString, int nMaxCount);
-                [DllImport("user32.dll")]
-                public static extern int GetWindowTextLength(IntPtr hWnd);
-                [DllImport("user32.dll")]
-                public static extern bool IsWindowVisible(IntPtr hWnd);
-                [DllImport("user32.dll")]
-                public static extern bool GetWindowRect(IntPtr hWnd, out RECT lpRect);
-                [DllImport("user32.dll")]
-                public static extern bool IsIconic(IntPtr hWnd);
-                [DllImport("user32.dll")]
-                public static extern bool IsZoomed(IntPtr hWnd);
-                [DllImport("user32.dll")]
-                public static extern IntPtr GetForegroundWindow();
-                
-                public delegate bool EnumWindowsProc(IntPtr hWnd, IntPtr lParam);
-                
-                [StructLayout(LayoutKind.Sequential)]
-                public struct RECT {
-                    public int Left;
-                    public int Top;
-                    public int Right;
-                    public int Bottom;
-                }
-            }
-"@
-
             $windows = @()
-            [Win32]::EnumWindows({
+            [AssistantWin32]::EnumWindows({
                 param($hWnd, $lParam)
-                if ([Win32]::IsWindowVisible($hWnd)) {
-                    $length = [Win32]::GetWindowTextLength($hWnd)
+                if ([AssistantWin32]::IsWindowVisible($hWnd)) {
+                    $length = [AssistantWin32]::GetWindowTextLength($hWnd)
                     if ($length -gt 0) {
                         $title = New-Object System.Text.StringBuilder -ArgumentList ($length + 1)
-                        [Win32]::GetWindowText($hWnd, $title, $title.Capacity) | Out-Null
+                        [AssistantWin32]::GetWindowText($hWnd, $title, $title.Capacity) | Out-Null
                         $windowTitle = $title.ToString()
                         
                         # Filtrar janelas vazias ou do sistema
                         if ($windowTitle -ne "" -and $windowTitle -notlike "*Default IME*" -and $windowTitle -notlike "*MSCTFIME UI*") {
-                            $rect = New-Object Win32+RECT
-                            [Win32]::GetWindowRect($hWnd, [ref]$rect) | Out-Null
-                            $isMinimized = [Win32]::IsIconic($hWnd)
-                            $isMaximized = [Win32]::IsZoomed($hWnd)
-                            $isActive = $hWnd -eq [Win32]::GetForegroundWindow()
+                            $rect = New-Object AssistantWin32+RECT
+                            [AssistantWin32]::GetWindowRect($hWnd, [ref]$rect) | Out-Null
+                            $isMinimized = [AssistantWin32]::IsIconic($hWnd)
+                            $isMaximized = [AssistantWin32]::IsZoomed($hWnd)
+                            $isActive = $hWnd -eq [AssistantWin32]::GetForegroundWindow()
                             
                             $windows += @{
                                 title = $windowTitle
@@ -113,10 +80,9 @@ def list_windows():
             $windows | ConvertTo-Json -Depth 3
             """
             
-            result = subprocess.run(['powershell', '-Command', ps_command], 
-                                  capture_output=True, text=True, check=True)
+            result = run_powershell(ps_command)
             
-            windows_data = json.loads(result.stdout)
+            windows_data = json.loads(result["output"])
             
             # Se não encontrou janelas, retornar uma lista vazia
             if not windows_data or (len(windows_data) == 1 and "Nenhuma janela" in windows_data[0].get('title', '')):
@@ -130,6 +96,15 @@ def list_windows():
     except Exception as e:
         return [{"error": f"Erro ao listar janelas: {str(e)}"}]
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
     windows = list_windows()
     print(json.dumps(windows, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
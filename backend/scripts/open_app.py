@@ -2,182 +2,423 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import subprocess
 import os
-import time
-import psutil
 import json
 
-def load_apps_config():
+# Pontuação mínima para abrir um app encontrado por busca aproximada
+LAUNCH_MIN_SCORE = 0.6
+
+# Correspondências aproximadas (erro de digitação, alias contido na busca)
+# só abrem um app com pontuação alta; abaixo disso o nome é executado como
+# comando ("bloco de notas" não pode abrir o Notion pela palavra "notas")
+FUZZY_LAUNCH_MIN_SCORE = 0.8
+
+# Tempo (s) aguardando o shell para detectar comando inexistente
+LAUNCH_CHECK_TIMEOUT = 0.3
+
+# Prazo (s) para restaurar e focar uma instância que já está aberta
+FOCUS_DEADLINE = 1.5
+
+# Prazo (s) para um processo novo do app aparecer depois de um método que
+# só digita teclas (Windows + R, menu Iniciar)
+LAUNCH_CONFIRM_TIMEOUT = 3.0
+
+# Métodos que não sabem se o app abriu: o sucesso é conferido pelo processo
+UNVERIFIED_METHODS = {'run_dialog', 'start_menu'}
+
+# Executáveis do shell: estão sempre rodando (ou são hospedeiros de console
+# compartilhados), então "abrir" sempre cria uma janela nova em vez de focar
+NO_FOCUS_EXECUTABLES = {'explorer', 'cmd', 'conhost', 'powershell', 'pwsh', 'windowsterminal', 'wt'}
+
+class MethodUnavailable(Exception):
+    """
+    O método não pode rodar neste ambiente (ex.: sem pyautogui); não conta
+    como falha nas estatísticas
+    """
+
+def find_app(app_name, config=None):
+    """
+    Encontra o melhor aplicativo para o nome; retorna {"id", "app", "score", ...} ou None
+    """
+    import app_index
+    
+    # Configuração explícita: índice só em memória; senão, índice compilado e em cache
+    data = app_index.build_index(config) if config else None
+    for match in app_index.find_apps(app_name, limit=None, min_score=LAUNCH_MIN_SCORE, data=data):
+        if match["match"] != 'fuzzy' or match["score"] >= FUZZY_LAUNCH_MIN_SCORE:
+            return match
+    return None
+
+def find_app_by_keyword(app_name, config=None):
     """
-    Carrega a configuração de aplicativos do arquivo JSON
+    Encontra um aplicativo por ID, nome ou palavra-chave (exata, prefixo ou aproximada)
     """
+    match = find_app(app_name, config)
+    return match["app"] if match else None
+
+def expand_path(path):
+    """
+    Expande variáveis de ambiente no caminho
+    """
+    return os.path.expandvars(path)
+
+def started_ok(process, timeout=LAUNCH_CHECK_TIMEOUT):
+    """
+    Verifica se o processo lançado via shell não falhou logo de cara
+    (comando inexistente faz o shell sair imediatamente com erro)
+    """
+    import subprocess
     try:
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'apps.json')
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return process.wait(timeout=timeout) == 0
+    except subprocess.TimeoutExpired:
+        # Ainda rodando: o aplicativo foi iniciado
+        return True
+
+def load_pyautogui():
+    """
+    Importa o pyautogui ou levanta MethodUnavailable (não instalado, sem tela)
+    """
+    try:
+        import pyautogui
     except Exception as e:
-        print(f"Erro ao carregar configuração: {e}")
+        raise MethodUnavailable(f"pyautogui indisponível: {e}")
+    return pyautogui
+
+def launch_with_command(app_info, app_name_or_path):
+    """
+    Método 1: usar o comando direto
+    """
+    import subprocess
+    
+    command = app_info.get('command')
+    if not command:
+        return None
+    
+    # Para aplicativos especiais como settings
+    if command.startswith('ms-'):
+        process = subprocess.Popen(['start', command], shell=True)
+    else:
+        process = subprocess.Popen([command], shell=True)
+    
+    if not started_ok(process):
+        return None
+    return f"{app_info['name']} aberto com sucesso"
+
+def launch_with_run_dialog(app_info, app_name_or_path):
+    """
+    Método 2: usar pyautogui para abrir via Windows + R
+    """
+    import time
+    pyautogui = load_pyautogui()
+    
+    # Pressionar Windows + R
+    pyautogui.hotkey('win', 'r')
+    time.sleep(0.5)
+    
+    # Digitar o comando
+    pyautogui.write(app_info.get('command') or app_name_or_path)
+    time.sleep(0.2)
+    
+    # Pressionar Enter
+    pyautogui.press('enter')
+    time.sleep(1)
+    
+    return f"{app_info['name']} aberto com sucesso via Windows+R"
+
+def launch_with_start_menu(app_info, app_name_or_path):
+    """
+    Método 3: usar pyautogui para buscar no menu iniciar
+    """
+    import time
+    pyautogui = load_pyautogui()
+    
+    # Pressionar Windows
+    pyautogui.press('win')
+    time.sleep(0.5)
+    
+    # Digitar o nome do aplicativo (ex.: 'chrome' -> 'google chrome')
+    pyautogui.write(app_info['name'].lower())
+    time.sleep(1)
+    
+    # Pressionar Enter
+    pyautogui.press('enter')
+    time.sleep(1)
+    
+    return f"{app_info['name']} aberto com sucesso via Menu Iniciar"
+
+def launch_with_path(app_info, app_name_or_path):
+    """
+    Método 4: usar o caminho específico
+    """
+    import subprocess
+    
+    if not app_info.get('path'):
+        return None
+    expanded_path = expand_path(app_info['path'])
+    if not os.path.exists(expanded_path):
         return None
+    
+    subprocess.Popen([expanded_path], shell=True)
+    return f"{app_info['name']} aberto com sucesso"
 
-def find_app_by_keyword(app_name, config):
+# Métodos de abertura na ordem padrão (usada enquanto não há histórico)
+LAUNCH_METHODS = {
+    'command': launch_with_command,
+    'run_dialog': launch_with_run_dialog,
+    'start_menu': launch_with_start_menu,
+    'path': launch_with_path,
+}
+
+def app_processes(names):
     """
-    Encontra um aplicativo por palavra-chave
+    Processos do app ({(pid, create_time)}); None se não dá para consultar
     """
-    if not config or 'apps' not in config:
+    try:
+        import process_index
+        return {(info['pid'], info['create_time']) for info in process_index.get_index().find(names)}
+    except Exception:
         return None
+
+def confirm_launch(names, before, timeout=None):
+    """
+    Espera um processo do app que não estava em before. True se apareceu,
+    False se o prazo acabou, None se não há como conferir.
+    """
+    import time
     
-    app_name_lower = app_name.lower()
+    if not names or before is None:
+        return None
+    deadline = time.monotonic() + (LAUNCH_CONFIRM_TIMEOUT if timeout is None else timeout)
+    while True:
+        current = app_processes(names)
+        if current is None:
+            return None
+        if current - before:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.1)
+
+def focus_running_instance(names, app_label):
+    """
+    Foca uma janela de um processo já em execução com algum dos nomes de
+    executável; retorna o resultado ou None se não houver janela para focar
+    """
+    import time
+    import process_index
+    import window_snapshot
     
-    # Procurar por palavra-chave exata
-    for app_id, app_info in config['apps'].items():
-        if app_name_lower == app_id.lower():
-            return app_info
-        
-        # Procurar por nome
-        if app_name_lower == app_info['name'].lower():
-            return app_info
-        
-        # Procurar por palavras-chave
-        for keyword in app_info.get('keywords', []):
-            if app_name_lower == keyword.lower():
-                return app_info
+    names = set(names) - NO_FOCUS_EXECUTABLES
+    if not names:
+        return None
+    processes = process_index.get_index().find(names)
+    if not processes:
+        return None
+    windows = window_snapshot.windows_for_pids({info['pid'] for info in processes})
+    if not windows:
+        return None
     
-    return None
+    window = windows[0]
+    active, waits = window_snapshot.focus(window, deadline=time.monotonic() + FOCUS_DEADLINE)
+    if not active:
+        return None
+    return {
+        'message': f"{app_label} já estava aberto; janela focada",
+        'pid': window['pid'],
+        'window_title': window['title'],
+        'waits': {stage: round(seconds * 1000, 1) for stage, seconds in waits.items()},
+    }
 
-def expand_path(path):
+def try_focus(names, app_label):
     """
-    Expande variáveis de ambiente no caminho
+    focus_running_instance sem propagar erros (sem psutil ou sem acesso às
+    janelas, o aplicativo simplesmente é aberto)
     """
-    return os.path.expandvars(path)
+    try:
+        return focus_running_instance(names, app_label) if names else None
+    except Exception:
+        return None
 
-def open_application(app_name_or_path):
+def launch_application(app_name_or_path, force_new=False):
     """
-    Abre um aplicativo pelo nome ou caminho usando pyautogui
+    Abre um aplicativo pelo nome ou caminho. Se ele já estiver em execução
+    com uma janela, foca essa janela em vez de abrir outra instância
+    (force_new=True sempre abre). Sem histórico, tenta os métodos na ordem
+    padrão; depois, primeiro o que abre esse app mais rápido. Métodos
+    indisponíveis no ambiente não contam nas estatísticas, e os que só
+    digitam teclas contam quando um processo novo do app confirma a abertura
+    (sem como conferir, verified=False e nada é registrado).
+    Retorna {"message", "path", "method", "elapsed_ms", ...}; path é
+    "focused", "launched", "path" ou "fallback".
     """
+    import subprocess
+    import time
+    import launch_stats
+    import process_index
+    
+    start = time.perf_counter()
+    
+    def finish(message, path, method=None, **details):
+        return {'message': message, 'path': path, 'method': method,
+                'elapsed_ms': round((time.perf_counter() - start) * 1000, 1), **details}
+    
     try:
-        import pyautogui
-        import time
-        
-        # Carregar configuração
-        config = load_apps_config()
-        
         # Verificar se é um caminho completo
         if os.path.exists(app_name_or_path):
+            if not force_new:
+                focused = try_focus({process_index.normalize_name(app_name_or_path)},
+                                    os.path.basename(app_name_or_path))
+                if focused:
+                    return finish(focused.pop('message'), 'focused', **focused)
             subprocess.Popen([app_name_or_path], shell=True)
-            return f"Aplicativo aberto: {app_name_or_path}"
+            return finish(f"Aplicativo aberto: {app_name_or_path}", 'path')
         
         # Procurar na configuração
-        app_info = find_app_by_keyword(app_name_or_path, config)
+        match = find_app(app_name_or_path)
         
-        if app_info:
-            app_name = app_info['name']
+        if match:
+            app_id, app_info = match["id"], match["app"]
             
-            # Método 1: Tentar usar o comando direto
-            if 'command' in app_info and app_info['command']:
-                command = app_info['command']
-                
-                # Para aplicativos especiais como settings
-                if command.startswith('ms-'):
-                    subprocess.Popen(['start', command], shell=True)
-                    return f"{app_name} aberto com sucesso"
-                else:
-                    try:
-                        subprocess.Popen([command], shell=True)
-                        return f"{app_name} aberto com sucesso"
-                    except:
-                        pass
+            names = process_index.executable_names(app_info)
+            if not force_new:
+                focused = try_focus(names, app_info['name'])
+                if focused:
+                    return finish(focused.pop('message'), 'focused', app=app_id, **focused)
             
-            # Método 2: Usar pyautogui para abrir via Windows + R
-            try:
-                # Pressionar Windows + R
-                pyautogui.hotkey('win', 'r')
-                time.sleep(0.5)
-                
-                # Digitar o comando
-                pyautogui.write(command if 'command' in app_info else app_name_or_path)
-                time.sleep(0.2)
+            for method in launch_stats.order_methods(app_id, list(LAUNCH_METHODS)):
+                before = app_processes(names) if method in UNVERIFIED_METHODS and names else None
+                attempt_start = time.perf_counter()
+                try:
+                    result = LAUNCH_METHODS[method](app_info, app_name_or_path)
+                except MethodUnavailable:
+                    continue
+                except Exception:
+                    result = None
                 
-                # Pressionar Enter
-                pyautogui.press('enter')
-                time.sleep(1)
+                verified = True
+                if result and method in UNVERIFIED_METHODS:
+                    confirmed = confirm_launch(names, before)
+                    if confirmed is None:
+                        verified = False
+                    elif not confirmed:
+                        result = None
+                elapsed_ms = (time.perf_counter() - attempt_start) * 1000
                 
-                return f"{app_name} aberto com sucesso via Windows+R"
-            except:
-                pass
-            
-            # Método 3: Usar pyautogui para buscar no menu iniciar
-            try:
-                # Pressionar Windows
-                pyautogui.press('win')
-                time.sleep(0.5)
-                
-                # Digitar o nome do aplicativo
-                search_term = app_name_or_path.lower()
-                if app_name_or_path == 'chrome':
-                    search_term = 'google chrome'
-                elif app_name_or_path == 'spotify':
-                    search_term = 'spotify'
-                elif app_name_or_path == 'paint':
-                    search_term = 'paint'
-                
-                pyautogui.write(search_term)
-                time.sleep(1)
-                
-                # Pressionar Enter
-                pyautogui.press('enter')
-                time.sleep(1)
-                
-                return f"{app_name} aberto com sucesso via Menu Iniciar"
-            except:
-                pass
-            
-            # Método 4: Tentar usar o caminho específico
-            if 'path' in app_info and app_info['path']:
-                expanded_path = expand_path(app_info['path'])
-                if os.path.exists(expanded_path):
-                    subprocess.Popen([expanded_path], shell=True)
-                    return f"{app_name} aberto com sucesso"
+                if verified:
+                    launch_stats.record_attempt(app_id, method, result is not None, elapsed_ms)
+                if result:
+                    return finish(result, 'launched', method, app=app_id, verified=verified)
         
         # Fallback: tentar abrir como comando genérico
         try:
             subprocess.Popen([app_name_or_path], shell=True)
-            return f"Comando '{app_name_or_path}' executado"
+            return finish(f"Comando '{app_name_or_path}' executado", 'fallback', 'command')
         except:
             # Última tentativa: usar start
             subprocess.Popen(['start', app_name_or_path], shell=True)
-            return f"Aplicativo '{app_name_or_path}' aberto via start"
+            return finish(f"Aplicativo '{app_name_or_path}' aberto via start", 'fallback', 'start')
             
     except Exception as e:
-        return f"Erro ao abrir aplicativo: {str(e)}"
+        return finish(f"Erro ao abrir aplicativo: {str(e)}", 'error')
+
+def open_application(app_name_or_path, force_new=False):
+    """
+    Abre (ou foca, se já estiver aberto) um aplicativo; retorna a mensagem
+    """
+    return launch_application(app_name_or_path, force_new)['message']
 
 def list_running_apps():
     """
-    Lista aplicativos em execução
+    Lista aplicativos em execução (processos com executável conhecido),
+    a partir da tabela incremental de processos
     """
     try:
-        running_apps = []
-        for proc in psutil.process_iter(['pid', 'name', 'exe']):
-            try:
-                if proc.info['exe']:
-                    running_apps.append({
-                        'name': proc.info['name'],
-                        'exe': proc.info['exe'],
-                        'pid': proc.info['pid']
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        import process_index
         
-        return running_apps
+        return [{'name': info['name'], 'exe': info['exe'], 'pid': info['pid']}
+                for info in process_index.get_index().processes(with_exe=True)]
     except Exception as e:
         return f"Erro ao listar aplicativos: {str(e)}"
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python open_app.py <app_name_or_path>")
+def find_running_app(app_name):
+    """
+    Processos do aplicativo (pela configuração ou pelo nome do executável);
+    retorna {"app", "running", "pids", "processes"}
+    """
+    import process_index
+    
+    match = find_app(app_name)
+    names = process_index.executable_names(match["app"]) if match else set()
+    if not names:
+        names = {app_name}
+    processes = process_index.get_index().find(names)
+    return {
+        'app': match["id"] if match else app_name,
+        'running': bool(processes),
+        'pids': [info['pid'] for info in processes],
+        'processes': [{'name': info['name'], 'exe': info['exe'], 'pid': info['pid']} for info in processes],
+    }
+
+def is_app_running(app_name):
+    """
+    Verifica se o aplicativo está em execução
+    """
+    return find_running_app(app_name)['running']
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if len(argv) < 1:
+        print("Uso: python open_app.py <app_name_or_path> [--new] [--json]")
+        print("     python open_app.py --find <termo>")
+        print("     python open_app.py --stats [app]")
+        print("     python open_app.py --running [app]")
+        sys.exit(1)
+    
+    if argv[0] == '--stats':
+        import launch_stats
+        app_id = None
+        if len(argv) > 1:
+            match = find_app(' '.join(argv[1:]))
+            app_id = match["id"] if match else ' '.join(argv[1:])
+        print(json.dumps(launch_stats.summarize(app_id, list(LAUNCH_METHODS)), ensure_ascii=False, indent=2))
+        return
+    
+    if argv[0] == '--running':
+        if len(argv) > 1:
+            result = find_running_app(' '.join(argv[1:]))
+        else:
+            result = list_running_apps()
+        print(json.dumps(result, ensure_ascii=False))
+        return
+    
+    if argv[0] == '--find':
+        import app_index
+        query = ' '.join(argv[1:])
+        matches = app_index.find_apps(query, limit=10)
+        print(json.dumps([{k: m[k] for k in ("id", "score", "match", "alias", "kind")} for m in matches],
+                         ensure_ascii=False))
+        return
+    
+    force_new = '--new' in argv
+    as_json = '--json' in argv
+    args = [arg for arg in argv if arg not in ('--new', '--json')]
+    if not args:
+        print("Uso: python open_app.py <app_name_or_path> [--new] [--json]")
         sys.exit(1)
+    app_name = args[0]
+    
+    if as_json:
+        print(json.dumps(launch_application(app_name, force_new), ensure_ascii=False))
+        return
     
-    app_name = sys.argv[1]
     print(f"Script Python: Tentando abrir aplicativo: {app_name}")
-    result = open_application(app_name)
+    result = open_application(app_name, force_new)
     print(f"Script Python: Resultado: {result}")
+
+if __name__ == "__main__":
+    main()
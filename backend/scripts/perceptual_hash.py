@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hash perceptual (dHash) de capturas de tela.
+
+A imagem é reduzida para (hash_size + 1) x hash_size em tons de cinza e cada
+bit indica se um pixel é mais claro que o vizinho à direita. Telas quase
+iguais (cursor piscando, relógio) geram hashes a poucos bits de distância;
+a comparação (distância de Hamming) é feita no cache das análises
+(utils/analysisCache.js). Com 16 x 16 (256 bits) telas diferentes com o
+mesmo layout ainda ficam distantes, o que 64 bits não garantia.
+"""
+
+import time
+
+# Lado da grade reduzida: hash_size² bits
+HASH_SIZE = 16
+
+
+def dhash(image, hash_size=HASH_SIZE):
+    """
+    dHash da imagem PIL como texto hexadecimal (hash_size² bits)
+    """
+    import numpy as np
+    from PIL import Image
+
+    # Reduzir antes de converter para cinza evita converter a tela inteira
+    small = image.resize((hash_size + 1, hash_size), Image.BOX, reducing_gap=2.0).convert('L')
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    value = int.from_bytes(np.packbits(bits).tobytes(), 'big')
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def timed_dhash(image, hash_size=HASH_SIZE):
+    """
+    Retorna (hash, milissegundos gastos)
+    """
+    start = time.perf_counter()
+    value = dhash(image, hash_size)
+    return value, round((time.perf_counter() - start) * 1000, 2)
+
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tabela incremental de processos em execução.
+
+Em vez de percorrer psutil.process_iter(['pid', 'name', 'exe']) do zero a
+cada chamada, o índice guarda cada processo pela chave (pid, create_time) e
+a cada atualização só compara a lista de PIDs: processos novos têm nome e
+executável resolvidos uma única vez (o exe é o campo caro e sujeito a
+AccessDenied), processos encerrados saem. Um PID reaproveitado por outro
+processo é detectado pelo create_time, conferido nas consultas por app e a
+cada VALIDATE_EVERY atualizações.
+
+Consultas ("o app X está rodando?", "quais PIDs são do app X?") são
+respondidas da memória; a tabela só é atualizada se tiver mais de
+REFRESH_INTERVAL segundos.
+"""
+
+import os
+import time
+import threading
+
+# Idade máxima (s) da tabela antes de uma consulta atualizá-la
+REFRESH_INTERVAL = float(os.environ.get('PROCESS_INDEX_REFRESH_INTERVAL', '0.5'))
+
+# A cada N atualizações, confere o create_time de todos os processos
+VALIDATE_EVERY = 20
+
+
+def normalize_name(name):
+    """
+    Nome de executável comparável: minúsculo e sem .exe
+    """
+    name = os.path.basename(name or '').lower()
+    return name[:-4] if name.endswith('.exe') else name
+
+
+def executable_names(app_info):
+    """
+    Nomes de executável que identificam um app da configuração (apps.json)
+    """
+    names = set()
+    path = app_info.get('path')
+    if path:
+        names.add(normalize_name(os.path.expandvars(path).replace('\\', '/')))
+    command = app_info.get('command')
+    if command and not command.startswith('ms-') and ' ' not in command:
+        names.add(normalize_name(command))
+    names.discard('')
+    return names
+
+
+class PsutilSource:
+    """
+    Processos reais via psutil
+    """
+
+    def __init__(self):
+        import psutil
+        self.psutil = psutil
+
+    def pids(self):
+        return self.psutil.pids()
+
+    def create_time(self, pid):
+        try:
+            return self.psutil.Process(pid).create_time()
+        except (self.psutil.NoSuchProcess, self.psutil.AccessDenied, ValueError):
+            return None
+
+    def inspect(self, pid):
+        """
+        {pid, name, exe, create_time} ou None se o processo já saiu. Campos
+        sem permissão ficam None, mas o processo entra na tabela para não ser
+        consultado de novo a cada atualização.
+        """
+        psutil = self.psutil
+        info = {"pid": pid, "name": None, "exe": None, "create_time": None}
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                for field in ("name", "create_time", "exe"):
+                    try:
+                        info[field] = getattr(process, field)() or None
+                    except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                        pass
+        except (psutil.NoSuchProcess, ValueError):
+            return None
+        return info
+
+
+class ProcessIndex:
+    """
+    Processos por (pid, create_time), com índice por nome de executável
+    """
+
+    def __init__(self, source=None, refresh_interval=REFRESH_INTERVAL, validate_every=VALIDATE_EVERY):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.validate_every = validate_every
+        self.entries = {}
+        self.by_pid = {}
+        self.by_name = {}
+        self.lock = threading.RLock()
+        self.refreshed_at = None
+        self.refreshes = 0
+        self.last_refresh = {}
+
+    def _source(self):
+        if self.source is None:
+            self.source = PsutilSource()
+        return self.source
+
+    def _add(self, info):
+        key = (info["pid"], info["create_time"])
+        self.entries[key] = info
+        self.by_pid[info["pid"]] = key
+        for name in {normalize_name(info["name"]), normalize_name(info["exe"])} - {''}:
+            self.by_name.setdefault(name, set()).add(key)
+
+    def _drop(self, pid):
+        key = self.by_pid.pop(pid, None)
+        info = self.entries.pop(key, None)
+        if info is None:
+            return
+        for name in {normalize_name(info["name"]), normalize_name(info["exe"])} - {''}:
+            keys = self.by_name.get(name)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self.by_name[name]
+
+    def refresh(self, force=False):
+        """
+        Atualiza a tabela se estiver velha (ou sempre, com force).
+        Retorna {added, removed, replaced, refresh_ms, processes}.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if not force and self.refreshed_at is not None and now - self.refreshed_at < self.refresh_interval:
+                return {**self.last_refresh, "skipped": True}
+
+            start = time.perf_counter()
+            source = self._source()
+            current = set(source.pids())
+            known = set(self.by_pid)
+
+            removed = known - current
+            for pid in removed:
+                self._drop(pid)
+
+            added = 0
+            for pid in current - known:
+                info = source.inspect(pid)
+                if info:
+                    self._add(info)
+                    added += 1
+
+            self.refreshes += 1
+            replaced = 0
+            if self.validate_every and self.refreshes % self.validate_every == 0:
+                replaced = self.validate()
+
+            self.refreshed_at = time.monotonic()
+            self.last_refresh = {
+                "added": added, "removed": len(removed), "replaced": replaced,
+                "refresh_ms": round((time.perf_counter() - start) * 1000, 3),
+                "processes": len(self.entries),
+            }
+            return dict(self.last_refresh)
+
+    def validate(self, pids=None):
+        """
+        Confere o create_time dos processos indicados (padrão: todos) e troca
+        os que tiveram o PID reaproveitado. Retorna quantos foram trocados.
+        """
+        with self.lock:
+            source = self._source()
+            replaced = 0
+            for pid in list(self.by_pid if pids is None else pids):
+                key = self.by_pid.get(pid)
+                # Sem create_time (acesso negado) só a lista de PIDs indica a saída
+                if key is None or key[1] is None:
+                    continue
+                create_time = source.create_time(pid)
+                if create_time == key[1]:
+                    continue
+                self._drop(pid)
+                replaced += 1
+                if create_time is not None:
+                    info = source.inspect(pid)
+                    if info:
+                        self._add(info)
+            return replaced
+
+    def processes(self, with_exe=False):
+        """
+        Processos conhecidos ({pid, name, exe, create_time})
+        """
+        self.refresh()
+        with self.lock:
+            return sorted((dict(info) for info in self.entries.values() if info["exe"] or not with_exe),
+                          key=lambda info: info["pid"])
+
+    def find(self, names):
+        """
+        Processos cujo nome ou executável está em names (sem .exe, minúsculo)
+        """
+        self.refresh()
+        with self.lock:
+            keys = set()
+            for name in names:
+                keys |= self.by_name.get(normalize_name(name), set())
+            # PIDs devolvidos são conferidos: um PID reaproveitado não vira falso positivo
+            if self.validate({pid for pid, _ in keys}):
+                keys = set()
+                for name in names:
+                    keys |= self.by_name.get(normalize_name(name), set())
+            return sorted((dict(self.entries[key]) for key in keys), key=lambda info: info["pid"])
+
+    def is_running(self, names):
+        return bool(self.find(names))
+
+    def stats(self):
+        with self.lock:
+            return {"processes": len(self.entries), "names": len(self.by_name),
+                    "refreshes": self.refreshes, "last_refresh": dict(self.last_refresh)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Índice compartilhado do processo (persiste entre chamadas no worker)
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ProcessIndex()
+        return _index
@@ -4,6 +4,28 @@
 import sys
 import subprocess
 import os
+import json
+import time
+import threading
+from collections import deque
+
+# Linhas finais guardadas para o resumo do modo streaming
+TAIL_LINES = 200
+
+# Linhas maiores que isso são emitidas em pedaços (memória constante)
+MAX_LINE_CHARS = 8192
+
+# Comandos simultâneos no modo lote
+BATCH_JOBS = 4
+
+# Timeout padrão (s) de cada comando, o mesmo do modo normal
+COMMAND_TIMEOUT = 30
+
+# Caracteres finais de stdout/stderr guardados por comando no modo lote
+OUTPUT_LIMIT = 4000
+
+# Espera (s) após pedir o encerramento, antes de forçar (SIGKILL)
+KILL_GRACE = 1.0
 
 def run_command(command):
     """
@@ -38,32 +60,326 @@ def run_powershell_command(command):
     Executa um comando PowerShell
     """
     try:
-        result = subprocess.run(
-            ['powershell', '-Command', command],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        # Pool de sessões só para comandos do usuário, sem estado entre
+        # chamadas (stdout e stderr chegam juntos em output)
+        from shell_session import run_powershell
+        result = run_powershell(command, timeout=30, check=False, isolate=True)
         
-        output = result.stdout.strip()
-        error = result.stderr.strip()
+        if result.get("timed_out"):
+            raise subprocess.TimeoutExpired('powershell', 30)
         
-        if result.returncode == 0:
+        output = result["output"].strip()
+        
+        if result["code"] == 0:
             return f"Comando PowerShell executado:\n{output}" if output else "Comando PowerShell executado"
         else:
-            return f"Erro no PowerShell (código {result.returncode}):\n{error if error else output}"
+            return f"Erro no PowerShell (código {result['code']}):\n{output}"
             
     except subprocess.TimeoutExpired:
         return "Comando PowerShell expirou (timeout de 30 segundos)"
     except Exception as e:
         return f"Erro ao executar comando PowerShell: {str(e)}"
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
+def kill_tree(process, grace=KILL_GRACE):
+    """
+    Encerra o processo e seus filhos (o shell e o que ele iniciou). No
+    POSIX pede com SIGTERM e, após grace segundos, força o grupo com SIGKILL.
+    """
+    if process.poll() is not None:
+        return
+    try:
+        if sys.platform == 'win32':
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=grace * 5)
+        else:
+            import signal
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=grace)
+            except subprocess.TimeoutExpired:
+                pass
+            # Filhos que ignoram SIGTERM (ou seguem vivos sem o shell) também saem
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+    except (OSError, subprocess.SubprocessError):
+        process.kill()
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def start_process(command, powershell=False, **options):
+    """
+    Inicia o comando em um grupo de processos próprio (para kill_tree)
+    """
+    args = ['powershell', '-Command', command] if powershell else command
+    if sys.platform == 'win32':
+        options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options['start_new_session'] = True
+    return subprocess.Popen(args, shell=not powershell, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            stdin=subprocess.DEVNULL, text=True, errors='replace', cwd=os.getcwd(), **options)
+
+def stream_command(command, powershell=False, emit=None, cancel=None, timeout=None, tail_lines=TAIL_LINES):
+    """
+    Executa um comando emitindo cada linha de stdout/stderr assim que chega,
+    como eventos {"event": "line", "stream", "line", "t_ms", "seq"}.
+    Só as últimas tail_lines linhas ficam em memória, para o resumo final
+    {"event": "exit", "code", "cancelled", "timed_out", "first_output_ms", ...}.
+    cancel: threading.Event que interrompe o comando; timeout em segundos (None: sem limite).
+    Retorna o resumo.
+    """
+    emit = emit or (lambda event: None)
+    cancel = cancel or threading.Event()
+    write_lock = threading.Lock()
+    tail = deque(maxlen=tail_lines)
+    counters = {"stdout": 0, "stderr": 0, "chars": 0, "seq": 0, "first": None}
+    start = time.perf_counter()
+    
+    try:
+        process = start_process(command, powershell, bufsize=1)
+    except Exception as e:
+        summary = {"event": "exit", "code": None, "error": f"Erro ao executar comando: {str(e)}",
+                   "cancelled": False, "timed_out": False}
+        emit(summary)
+        return summary
+    
+    emit({"event": "started", "pid": process.pid, "command": command, "powershell": powershell})
+    
+    def pump(stream, name):
+        for line in iter(lambda: stream.readline(MAX_LINE_CHARS), ''):
+            line = line.rstrip('\r\n')
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            with write_lock:
+                if counters["first"] is None:
+                    counters["first"] = elapsed
+                counters[name] += 1
+                counters["chars"] += len(line)
+                counters["seq"] += 1
+                tail.append({"stream": name, "line": line})
+                emit({"event": "line", "stream": name, "line": line, "t_ms": elapsed, "seq": counters["seq"]})
+        stream.close()
+    
+    readers = [threading.Thread(target=pump, args=(process.stdout, 'stdout'), daemon=True),
+               threading.Thread(target=pump, args=(process.stderr, 'stderr'), daemon=True)]
+    for reader in readers:
+        reader.start()
+    
+    timed_out = False
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while process.poll() is None:
+        if cancel.wait(0.05):
+            kill_tree(process)
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            timed_out = True
+            kill_tree(process)
+            break
+    
+    try:
+        code = process.wait(timeout=KILL_GRACE)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        code = process.wait()
+    for reader in readers:
+        reader.join(timeout=1)
+    
+    with write_lock:
+        total_lines = counters["stdout"] + counters["stderr"]
+        summary = {
+            "event": "exit",
+            "code": code,
+            "cancelled": cancel.is_set() and not timed_out,
+            "timed_out": timed_out,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "first_output_ms": counters["first"],
+            "lines": {"stdout": counters["stdout"], "stderr": counters["stderr"]},
+            "chars": counters["chars"],
+            "tail": list(tail),
+            "truncated": total_lines - len(tail),
+        }
+        emit(summary)
+    return summary
+
+def truncate_output(text, limit=OUTPUT_LIMIT):
+    """
+    Final da saída com no máximo limit caracteres. Retorna (texto, truncado).
+    """
+    text = text.strip()
+    if len(text) <= limit:
+        return text, False
+    return text[-limit:], True
+
+def run_batch_item(index, spec, timeout=COMMAND_TIMEOUT, deadline=None, output_limit=OUTPUT_LIMIT):
+    """
+    Executa um comando do lote. spec é o texto do comando ('ps:' para
+    PowerShell) ou {"command", "powershell", "timeout"}. status: ok, error,
+    timeout, skipped (prazo total esgotado antes de começar) ou failed.
+    """
+    if isinstance(spec, dict):
+        command = spec.get("command", "")
+        powershell = bool(spec.get("powershell"))
+        timeout = spec.get("timeout") or timeout
+    else:
+        command = str(spec)
+        powershell = False
+    if command.startswith('ps:'):
+        command = command[3:]
+        powershell = True
+    
+    result = {"index": index, "command": command, "powershell": powershell, "status": None, "code": None,
+              "duration_ms": 0.0, "stdout": "", "stderr": "", "truncated": False}
+    
+    limit = timeout
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            result["status"] = "skipped"
+            return result
+        if limit is None or remaining < limit:
+            limit = remaining
+    
+    start = time.perf_counter()
+    try:
+        process = start_process(command, powershell)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"Erro ao executar comando: {str(e)}"
+        return result
+    
+    try:
+        stdout, stderr = process.communicate(timeout=limit)
+        result["status"] = "ok" if process.returncode == 0 else "error"
+    except subprocess.TimeoutExpired:
+        kill_tree(process)
+        try:
+            stdout, stderr = process.communicate(timeout=KILL_GRACE)
+        except subprocess.TimeoutExpired:
+            # Um processo fora do grupo ainda segura os pipes: desiste da saída
+            process.kill()
+            process.wait()
+            stdout, stderr = '', ''
+        result["status"] = "timeout"
+        result["timeout_s"] = round(limit, 3)
+    
+    result["code"] = process.returncode
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["stdout"], stdout_truncated = truncate_output(stdout or '', output_limit)
+    result["stderr"], stderr_truncated = truncate_output(stderr or '', output_limit)
+    result["truncated"] = stdout_truncated or stderr_truncated
+    return result
+
+def run_batch(commands, jobs=BATCH_JOBS, timeout=COMMAND_TIMEOUT, overall_timeout=None, output_limit=OUTPUT_LIMIT):
+    """
+    Executa comandos independentes com no máximo jobs ao mesmo tempo.
+    timeout vale para cada comando; overall_timeout (s) para o lote inteiro:
+    os que ainda rodam são encerrados e os que não começaram saem como skipped.
+    Retorna {success, results (na ordem recebida), jobs, duration_ms, serial_ms}.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    start = time.perf_counter()
+    deadline = None if overall_timeout is None else time.monotonic() + overall_timeout
+    jobs = max(1, min(int(jobs), len(commands) or 1))
+    
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='batch') as executor:
+        futures = [executor.submit(run_batch_item, index, spec, timeout, deadline, output_limit)
+                   for index, spec in enumerate(commands)]
+        results = [future.result() for future in futures]
+    
+    return {
+        "success": all(result["status"] == "ok" for result in results),
+        "results": results,
+        "jobs": jobs,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        # Soma das durações: o tempo aproximado de rodar um por vez
+        "serial_ms": round(sum(result["duration_ms"] for result in results), 1),
+    }
+
+def watch_stdin(cancel):
+    """
+    Cancela quando chegar uma linha "cancel" (ou {"cmd": "cancel"}) no stdin
+    """
+    def run():
+        for line in sys.stdin:
+            line = line.strip()
+            if line == 'cancel' or line.startswith('{') and '"cancel"' in line:
+                cancel.set()
+                return
+    threading.Thread(target=run, name='cancel-watcher', daemon=True).start()
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if len(argv) < 1:
         print("Uso: python run_command.py <command>")
+        print("     python run_command.py --stream [--tail N] [--timeout S] <command>")
+        print("     python run_command.py --batch [--jobs N] [--timeout S] [--overall-timeout S] <json|->")
         sys.exit(1)
     
-    command = sys.argv[1]
+    if argv[0] == '--batch':
+        # Lista JSON de comandos no stdin ('-', em UTF-8) ou como argumento; resultado em JSON
+        options = {"--jobs": BATCH_JOBS, "--timeout": COMMAND_TIMEOUT, "--overall-timeout": None}
+        args = argv[1:]
+        while len(args) > 2 and args[0] in options:
+            options[args[0]] = float(args[1])
+            args = args[2:]
+        if not args:
+            print("Uso: python run_command.py --batch [--jobs N] [--timeout S] [--overall-timeout S] <json|->")
+            sys.exit(1)
+        
+        try:
+            commands = json.loads(sys.stdin.buffer.read().decode('utf-8') if args[0] == '-' else args[0])
+            if not isinstance(commands, list):
+                raise ValueError("esperada uma lista de comandos")
+        except ValueError as e:
+            print(json.dumps({"success": False, "error": f"Lote inválido: {str(e)}"}, ensure_ascii=False))
+            return
+        
+        print(json.dumps(run_batch(commands, int(options["--jobs"]), options["--timeout"],
+                                   options["--overall-timeout"]), ensure_ascii=False))
+        return
+    
+    if argv[0] == '--stream':
+        # Uma linha NDJSON por evento; "cancel" no stdin interrompe o comando
+        tail_lines = TAIL_LINES
+        timeout = None
+        args = argv[1:]
+        while len(args) > 2 and args[0] in ('--tail', '--timeout'):
+            if args[0] == '--tail':
+                tail_lines = int(args[1])
+            else:
+                timeout = float(args[1])
+            args = args[2:]
+        if not args:
+            print("Uso: python run_command.py --stream [--tail N] [--timeout S] <command>")
+            sys.exit(1)
+        
+        command = args[0]
+        powershell = command.startswith('ps:')
+        if powershell:
+            command = command[3:]
+        
+        if hasattr(sys.stdout, 'buffer'):
+            import io
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+        
+        def emit(event):
+            sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+        
+        cancel = threading.Event()
+        watch_stdin(cancel)
+        summary = stream_command(command, powershell, emit, cancel, timeout, tail_lines)
+        sys.exit(0 if summary.get("code") == 0 else 1)
+    
+    command = argv[0]
     
     # Se o comando começar com 'ps:', executar como PowerShell
     if command.startswith('ps:'):
@@ -73,3 +389,6 @@ if __name__ == "__main__":
         result = run_command(command)
     
     print(result)
+
+if __name__ == "__main__":
+    main()
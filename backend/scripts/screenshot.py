@@ -4,43 +4,46 @@
 import sys
 import os
 import time
+import subprocess
 from datetime import datetime
 
+import window_snapshot
+
+def save_screenshot(screenshot, label=None):
+    """
+    Guarda a captura no armazenamento por hash de conteúdo e retorna o caminho
+    """
+    import image_encoding
+    import screenshot_store
+    data, encoded = image_encoding.encode_image(screenshot)
+    stored = screenshot_store.put(data, encoded["extension"], type="full",
+                                  width=encoded["width"], height=encoded["height"], label=label)
+    return stored["path"]
+
 def take_screenshot(filename=None, exclude_assistant=True):
     """
     Captura uma screenshot da tela, opcionalmente excluindo a janela do assistente
     """
     try:
         import pyautogui
-        import pygetwindow as gw
-        
-        # Gerar nome do arquivo se não fornecido
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
-        
-        # Garantir que o diretório existe
-        screenshots_dir = os.path.join(os.path.dirname(__file__), '..', 'screenshots')
-        os.makedirs(screenshots_dir, exist_ok=True)
-        
-        # Caminho completo do arquivo
-        filepath = os.path.join(screenshots_dir, filename)
         
         if exclude_assistant:
             # Tentar encontrar e minimizar a janela do assistente
             try:
                 # Procurar por janelas do Electron/assistente
                 electron_windows = []
-                for window in gw.getAllWindows():
-                    if window.title and ('assistente' in window.title.lower() or 
-                                       'ai-assistente' in window.title.lower() or
-                                       'electron' in window.title.lower()):
+                for window in window_snapshot.get_windows():
+                    if window["title"] and ('assistente' in window["title"].lower() or 
+                                          'ai-assistente' in window["title"].lower() or
+                                          'electron' in window["title"].lower()):
                         electron_windows.append(window)
                 
                 # Minimizar as janelas encontradas
+                minimized_windows = []
                 for window in electron_windows:
-                    if not window.isMinimized:
-                        window.minimize()
+                    if not window["isMinimized"]:
+                        window_snapshot.minimize(window)
+                        minimized_windows.append(window)
                         time.sleep(1.0)  # Aguardar a animação de minimizar
                 
                 # Aguardar um pouco mais para garantir que a janela foi minimizada
@@ -48,20 +51,18 @@ def take_screenshot(filename=None, exclude_assistant=True):
                 
                 # Capturar screenshot
                 screenshot = pyautogui.screenshot()
-                screenshot.save(filepath)
+                filepath = save_screenshot(screenshot, filename)
                 
                 # Aguardar antes de restaurar
                 time.sleep(0.5)
                 
                 # Restaurar as janelas
-                for window in electron_windows:
-                    if window.isMinimized:
-                        window.restore()
-                        time.sleep(0.3)  # Aguardar a animação de restaurar
+                for window in minimized_windows:
+                    window_snapshot.restore(window)
+                    time.sleep(0.3)  # Aguardar a animação de restaurar
                 
                 # Abrir a imagem automaticamente
                 try:
-                    import subprocess
                     subprocess.Popen(['cmd', '/c', 'start', '', filepath], shell=True)
                 except:
                     pass
@@ -71,11 +72,10 @@ def take_screenshot(filename=None, exclude_assistant=True):
             except Exception as e:
                 # Se falhar, capturar normalmente
                 screenshot = pyautogui.screenshot()
-                screenshot.save(filepath)
+                filepath = save_screenshot(screenshot, filename)
                 
                 # Abrir a imagem automaticamente
                 try:
-                    import subprocess
                     subprocess.Popen(['cmd', '/c', 'start', '', filepath], shell=True)
                 except:
                     pass
@@ -84,11 +84,10 @@ def take_screenshot(filename=None, exclude_assistant=True):
         else:
             # Capturar screenshot normalmente
             screenshot = pyautogui.screenshot()
-            screenshot.save(filepath)
+            filepath = save_screenshot(screenshot, filename)
             
             # Abrir a imagem automaticamente
             try:
-                import subprocess
                 subprocess.Popen(['start', filepath], shell=True)
             except:
                 pass
@@ -98,13 +97,11 @@ def take_screenshot(filename=None, exclude_assistant=True):
     except ImportError:
         # Fallback: usar PowerShell
         try:
-            if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"screenshot_{timestamp}.png"
-            
-            screenshots_dir = os.path.join(os.path.dirname(__file__), '..', 'screenshots')
-            os.makedirs(screenshots_dir, exist_ok=True)
-            filepath = os.path.join(screenshots_dir, filename)
+            # Grava em um arquivo temporário e move para o armazenamento por hash
+            import tempfile
+            import screenshot_store
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filepath = os.path.join(tempfile.gettempdir(), f"screenshot_{timestamp}_{os.getpid()}.png")
             
             ps_command = f"""
             Add-Type -AssemblyName System.Windows.Forms
@@ -119,9 +116,9 @@ def take_screenshot(filename=None, exclude_assistant=True):
             $bitmap.Dispose()
             """
             
-            import subprocess
-            subprocess.run(['powershell', '-Command', ps_command], 
-                          capture_output=True, text=True, check=True)
+            from shell_session import run_powershell
+            run_powershell(ps_command)
+            filepath = screenshot_store.put_file(filepath, type="full", label=filename)["path"]
             
             # Abrir a imagem automaticamente
             try:
@@ -137,12 +134,18 @@ def take_screenshot(filename=None, exclude_assistant=True):
     except Exception as e:
         return f"Erro ao capturar screenshot: {str(e)}"
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
     filename = None
     exclude_assistant = True
     
     # Processar argumentos
-    for i, arg in enumerate(sys.argv[1:], 1):
+    for i, arg in enumerate(argv, 1):
         if arg == '--exclude-assistant':
             exclude_assistant = True
         elif not arg.startswith('--'):
@@ -150,3 +153,6 @@ if __name__ == "__main__":
     
     result = take_screenshot(filename, exclude_assistant)
     print(result)
+
+if __name__ == "__main__":
+    main()
@@ -5,77 +5,154 @@ import sys
 import os
 import time
 import json
-from datetime import datetime
 
-def take_screenshot(screenshot_type="full", window_title=None, filename=None, exclude_assistant=True, open_image=True):
+import window_snapshot
+import image_encoding
+
+# Tempo máximo somando todas as esperas de uma captura (segundos)
+WAIT_DEADLINE = 3.0
+
+# Pausa única depois de uma janela minimizar ou restaurar de fato, para a
+# animação do sistema terminar antes da captura (0 desativa)
+SETTLE_DELAY = float(os.environ.get('SCREENSHOT_SETTLE_DELAY', '0.15'))
+
+# Formas de entregar a imagem: arquivo em screenshots/ ou bytes em base64 no
+# próprio JSON (stdout)
+OUTPUT_MODES = ('file', 'stdout')
+
+def wait_stage(waits, stage, condition, windows, deadline, settle=False):
+    """
+    Espera todas as janelas atingirem a condição (wait_until_*) e soma o
+    tempo gasto em waits[stage], em milissegundos. settle só deve ser
+    pedido quando alguma janela minimizou ou restaurou; a pausa só acontece
+    se a mudança foi observada.
+    """
+    start = time.monotonic()
+    reached = True
+    for window in windows:
+        ok, _ = condition(window, deadline=deadline)
+        if not ok:
+            reached = False
+            sys.stderr.write(f"Aviso: tempo esgotado esperando '{window['title']}' ({stage})\n")
+    if settle and windows and reached and SETTLE_DELAY > 0:
+        time.sleep(max(0.0, min(SETTLE_DELAY, deadline - time.monotonic())))
+    waits[stage] = round(waits.get(stage, 0.0) + (time.monotonic() - start) * 1000, 1)
+    return reached
+
+def minimize_assistant(waits=None, deadline=None):
+    """
+    Minimiza as janelas do assistente, espera que fiquem minimizadas e
+    retorna as que foram minimizadas
+    """
+    waits = {} if waits is None else waits
+    deadline = deadline or time.monotonic() + WAIT_DEADLINE
+    minimized = []
+    try:
+        for window in window_snapshot.find_assistant_windows(window_snapshot.get_windows()):
+            sys.stderr.write(f"Janela do assistente encontrada: {window['title']}\n")
+            if not window["isMinimized"]:
+                sys.stderr.write(f"Minimizando assistente: {window['title']}\n")
+                window_snapshot.minimize(window)
+                minimized.append(window)
+            else:
+                sys.stderr.write(f"Assistente já minimizado: {window['title']}\n")
+        wait_stage(waits, "minimize_assistant", window_snapshot.wait_until_minimized,
+                   minimized, deadline, settle=True)
+    except Exception as e:
+        sys.stderr.write(f"Aviso: Não foi possível minimizar assistente: {e}\n")
+    return minimized
+
+def restore_assistant(assistant_windows, waits=None, deadline=None):
+    """
+    Restaura as janelas do assistente que foram minimizadas para a captura
+    """
+    waits = {} if waits is None else waits
+    deadline = deadline or time.monotonic() + WAIT_DEADLINE
+    try:
+        for window in assistant_windows:
+            sys.stderr.write(f"Restaurando assistente: {window['title']}\n")
+            window_snapshot.restore(window)
+        wait_stage(waits, "restore_assistant", window_snapshot.wait_until_restored,
+                   assistant_windows, deadline)
+    except Exception as e:
+        sys.stderr.write(f"Aviso: Não foi possível restaurar assistente: {e}\n")
+
+def find_window_by_handle(handle):
+    """
+    Busca uma janela no snapshot atual pelo handle
+    """
+    for window in window_snapshot.get_windows():
+        if window["handle"] == handle:
+            return window
+    return None
+
+def take_screenshot(screenshot_type="full", window_title=None, filename=None, exclude_assistant=True, open_image=True,
+                    output="file", profile="original", max_dimension=None, image_format=None, quality=None,
+                    compute_hash=False):
     """
     Captura screenshot com diferentes opções:
     - full: Tela inteira
     - window: Janela específica
     - active: Janela ativa
     - area: Área específica (futuro)
+
+    O tempo gasto esperando cada etapa (minimizar/restaurar/ativar) volta
+    em "waits", em milissegundos.
+
+    profile escolhe a codificação (image_encoding.CAPTURE_PROFILES): "original"
+    é PNG em resolução cheia; "analysis" reduz e usa JPEG/WebP. max_dimension,
+    image_format e quality sobrescrevem o perfil. A codificação roda em uma
+    thread enquanto as janelas são restauradas; "encode_ms" e "size" vêm no
+    resultado.
+
+    compute_hash adiciona o hash perceptual da tela ("phash", dHash de 64
+    bits) e o tempo para calculá-lo ("hash_ms"), usado para reaproveitar
+    análises de telas praticamente iguais.
+
+    output define como a imagem é entregue:
+    - file: salva em screenshots/ (screenshot_store) e retorna "filepath"
+    - stdout: retorna os bytes em "image_base64"; só salva se filename for informado
     """
+    if output not in OUTPUT_MODES:
+        return {"success": False, "error": f"Saída '{output}' não suportada"}
+    save_to_disk = output == 'file' or bool(filename)
+    try:
+        image_encoding.resolve_profile(profile, format=image_format)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    encoding_options = {"max_dimension": max_dimension, "format": image_format, "quality": quality}
+    
+    def start_processing(screenshot):
+        # Codificação e hash rodam em threads enquanto as janelas são restauradas
+        encoding = image_encoding.encode_async(screenshot, profile, **encoding_options)
+        hashing = None
+        if compute_hash:
+            import perceptual_hash
+            hashing = image_encoding.run_async(perceptual_hash.timed_dhash, screenshot)
+        return encoding, hashing
+
+    waits = {}
+    deadline = time.monotonic() + WAIT_DEADLINE
     try:
         import pyautogui
-        import pygetwindow as gw
-        
-        # Gerar nome do arquivo se não fornecido
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
         
-        # Garantir que o diretório existe
-        screenshots_dir = os.path.join(os.path.dirname(__file__), '..', 'screenshots')
-        os.makedirs(screenshots_dir, exist_ok=True)
-        
-        # Caminho completo do arquivo
-        filepath = os.path.join(screenshots_dir, filename)
+        # Título da janela capturada, guardado no índice das capturas
+        captured_title = None
         
         if screenshot_type == "full":
             # Screenshot da tela inteira
+            assistant_windows = []
             if exclude_assistant:
                 # Tentar encontrar e minimizar a janela do assistente
-                try:
-                    assistant_windows = []
-                    for window in gw.getAllWindows():
-                        if window.title:
-                            title_lower = window.title.lower()
-                            # Buscar por várias possibilidades de nome da janela
-                            if any(keyword in title_lower for keyword in [
-                                'assistente', 'ai-assistente', 'electron', 
-                                'ai assistente', 'assistente ia', 'widget',
-                                'ai-assitente'  # Nome do projeto
-                            ]):
-                                assistant_windows.append(window)
-                                sys.stderr.write(f"Janela do assistente encontrada: {window.title}\n")
-                    
-                    # Minimizar apenas janelas do assistente
-                    for window in assistant_windows:
-                        if not window.isMinimized:
-                            sys.stderr.write(f"Minimizando APENAS assistente: {window.title}\n")
-                            window.minimize()
-                            time.sleep(0.5)  # Aguardar animação
-                        else:
-                            sys.stderr.write(f"Assistente já minimizado: {window.title}\n")
-                    
-                    time.sleep(1.5)  # Aguardar antes da captura
-                    
-                except Exception as e:
-                    sys.stderr.write(f"Aviso: Não foi possível minimizar janelas do assistente: {e}\n")
+                assistant_windows = minimize_assistant(waits, deadline)
             
             # Capturar screenshot da tela inteira
             screenshot = pyautogui.screenshot()
-            screenshot.save(filepath)
+            encoding, hashing = start_processing(screenshot)
             
             if exclude_assistant:
                 # Restaurar janelas do assistente
-                try:
-                    for window in assistant_windows:
-                        if window.isMinimized:
-                            window.restore()
-                            time.sleep(0.3)  # Aguardar animação
-                except Exception as e:
-                    sys.stderr.write(f"Aviso: Não foi possível restaurar janelas do assistente: {e}\n")
+                restore_assistant(assistant_windows, waits, deadline)
         
         elif screenshot_type == "window":
             # Screenshot de janela específica
@@ -85,156 +162,359 @@ def take_screenshot(screenshot_type="full", window_title=None, filename=None, ex
             # Minimizar assistente primeiro se necessário
             assistant_windows = []
             if exclude_assistant:
-                try:
-                    for window in gw.getAllWindows():
-                        if window.title:
-                            title_lower = window.title.lower()
-                            if any(keyword in title_lower for keyword in [
-                                'assistente', 'ai-assistente', 'electron', 
-                                'ai assistente', 'assistente ia', 'widget',
-                                'ai-assitente'
-                            ]):
-                                assistant_windows.append(window)
-                                if not window.isMinimized:
-                                    sys.stderr.write(f"Minimizando assistente: {window.title}\n")
-                                    window.minimize()
-                                    time.sleep(0.5)
-                except Exception as e:
-                    sys.stderr.write(f"Aviso: Não foi possível minimizar assistente: {e}\n")
+                assistant_windows = minimize_assistant(waits, deadline)
             
-            # Encontrar a janela
-            target_window = None
-            for window in gw.getAllWindows():
-                if window.title and window.visible:
-                    # Busca mais flexível
-                    if (window_title.lower() in window.title.lower() or 
-                        window.title.lower() in window_title.lower()):
-                        target_window = window
-                        break
+            # Encontrar a janela (busca por similaridade no snapshot)
+            matches = window_snapshot.find_windows(window_title, limit=1)
             
-            if not target_window:
+            if not matches:
                 return {"success": False, "error": f"Janela '{window_title}' não encontrada"}
             
-            # Abrir e focar na janela
-            if target_window.isMinimized:
-                target_window.restore()
-                time.sleep(0.5)
+            target_window = matches[0][0]
+            captured_title = target_window["title"]
+            
+            # Abrir e focar na janela (a animação só existe se ela estava minimizada)
+            restored = target_window["isMinimized"]
+            if restored:
+                window_snapshot.restore(target_window)
+                wait_stage(waits, "restore_target", window_snapshot.wait_until_restored,
+                           [target_window], deadline)
             
             # Focar na janela
-            target_window.activate()
-            time.sleep(0.5)
+            window_snapshot.activate(target_window)
+            wait_stage(waits, "activate_target", window_snapshot.wait_until_active,
+                       [target_window], deadline, settle=restored)
+            
+            # Posição atualizada após restaurar
+            target_window = find_window_by_handle(target_window["handle"]) or target_window
             
             # Capturar screenshot da janela
-            left, top, width, height = target_window.left, target_window.top, target_window.width, target_window.height
+            left, top, width, height = target_window["left"], target_window["top"], target_window["width"], target_window["height"]
             screenshot = pyautogui.screenshot(region=(left, top, width, height))
-            
-            # Garantir que o arquivo tem extensão .png
-            if not filepath.endswith('.png'):
-                filepath += '.png'
-            
-            screenshot.save(filepath, 'PNG')
+            encoding, hashing = start_processing(screenshot)
             
             # Minimizar a janela após o screenshot
-            target_window.minimize()
-            time.sleep(0.3)
+            window_snapshot.minimize(target_window)
+            wait_stage(waits, "minimize_target", window_snapshot.wait_until_minimized,
+                       [target_window], deadline)
             
             # Restaurar assistente se foi minimizado
             if exclude_assistant and assistant_windows:
-                try:
-                    for window in assistant_windows:
-                        if window.isMinimized:
-                            sys.stderr.write(f"Restaurando assistente: {window.title}\n")
-                            window.restore()
-                            time.sleep(0.3)
-                except Exception as e:
-                    sys.stderr.write(f"Aviso: Não foi possível restaurar assistente: {e}\n")
+                restore_assistant(assistant_windows, waits, deadline)
         
         elif screenshot_type == "active":
             # Screenshot da janela ativa
-            active_window = gw.getActiveWindow()
+            active_window = window_snapshot.get_active_window(window_snapshot.get_windows())
             if not active_window:
                 return {"success": False, "error": "Nenhuma janela ativa encontrada"}
+            captured_title = active_window["title"]
             
             # Minimizar assistente primeiro se necessário
             assistant_windows = []
             if exclude_assistant:
-                try:
-                    for window in gw.getAllWindows():
-                        if window.title:
-                            title_lower = window.title.lower()
-                            if any(keyword in title_lower for keyword in [
-                                'assistente', 'ai-assistente', 'electron', 
-                                'ai assistente', 'assistente ia', 'widget',
-                                'ai-assitente'
-                            ]):
-                                assistant_windows.append(window)
-                                if not window.isMinimized:
-                                    sys.stderr.write(f"Minimizando assistente: {window.title}\n")
-                                    window.minimize()
-                                    time.sleep(0.5)
-                except Exception as e:
-                    sys.stderr.write(f"Aviso: Não foi possível minimizar assistente: {e}\n")
+                assistant_windows = minimize_assistant(waits, deadline)
             
             # Capturar screenshot da janela ativa
-            left, top, width, height = active_window.left, active_window.top, active_window.width, active_window.height
+            left, top, width, height = active_window["left"], active_window["top"], active_window["width"], active_window["height"]
             screenshot = pyautogui.screenshot(region=(left, top, width, height))
-            
-            # Garantir que o arquivo tem extensão .png
-            if not filepath.endswith('.png'):
-                filepath += '.png'
-            
-            screenshot.save(filepath, 'PNG')
+            encoding, hashing = start_processing(screenshot)
             
             # Restaurar assistente se foi minimizado
             if exclude_assistant and assistant_windows:
-                try:
-                    for window in assistant_windows:
-                        if window.isMinimized:
-                            sys.stderr.write(f"Restaurando assistente: {window.title}\n")
-                            window.restore()
-                            time.sleep(0.3)
-                except Exception as e:
-                    sys.stderr.write(f"Aviso: Não foi possível restaurar assistente: {e}\n")
+                restore_assistant(assistant_windows, waits, deadline)
         
         else:
             return {"success": False, "error": f"Tipo de screenshot '{screenshot_type}' não suportado"}
         
-        # Abrir a imagem automaticamente apenas se solicitado
-        if open_image:
+        data, encoded = encoding.result()
+        
+        result = {
+            "success": True,
+            "message": "Screenshot capturado com sucesso",
+            "type": screenshot_type,
+            "output": output,
+            "profile": profile,
+            "format": encoded["format"],
+            "mime_type": encoded["mime_type"],
+            "width": encoded["width"],
+            "height": encoded["height"],
+            "source_width": encoded["source_width"],
+            "source_height": encoded["source_height"],
+            "size": encoded["size"],
+            "encode_ms": encoded["encode_ms"],
+            "waits": waits
+        }
+        
+        if hashing is not None:
+            result["phash"], result["hash_ms"] = hashing.result()
+        
+        if output == 'stdout':
+            import base64
+            result["image_base64"] = base64.b64encode(data).decode('ascii')
+        
+        if save_to_disk:
+            # Nome pelo hash do conteúdo: capturas idênticas viram um único arquivo;
+            # o nome pedido fica no índice como rótulo
+            import screenshot_store
+            stored = screenshot_store.put(data, encoded["extension"], type=screenshot_type, title=captured_title,
+                                          width=encoded["width"], height=encoded["height"], label=filename)
+            filepath = stored["path"]
+            result["filepath"] = filepath
+            result["digest"] = stored["digest"]
+            result["deduplicated"] = stored["deduplicated"]
+            result["message"] = f"Screenshot capturado com sucesso: {os.path.basename(filepath)}"
+        
+        # Abrir a imagem automaticamente apenas se solicitado (e se foi salva)
+        if open_image and save_to_disk:
             try:
                 import subprocess
                 subprocess.Popen(['cmd', '/c', 'start', '', filepath], shell=True)
             except Exception as e:
                 sys.stderr.write(f"Aviso: Não foi possível abrir a imagem: {e}\n")
         
-        return {
-            "success": True,
-            "message": f"Screenshot capturado com sucesso: {filename}",
-            "filepath": filepath,
-            "type": screenshot_type
-        }
+        return result
         
     except ImportError as e:
         return {"success": False, "error": f"Biblioteca necessária não encontrada: {e}"}
     except Exception as e:
         return {"success": False, "error": f"Erro ao capturar screenshot: {e}"}
 
+def _encode_item(screenshot, target, profile, options, output):
+    """
+    Codifica (e, na saída em arquivo, salva) uma janela do lote; roda na
+    thread de codificação enquanto as próximas janelas são capturadas
+    """
+    data, encoded = image_encoding.encode_image(screenshot, profile, **options)
+    item = {
+        "success": True,
+        "title": target["title"],
+        "format": encoded["format"],
+        "mime_type": encoded["mime_type"],
+        "width": encoded["width"],
+        "height": encoded["height"],
+        "size": encoded["size"],
+        "encode_ms": encoded["encode_ms"],
+    }
+    if output == 'stdout':
+        import base64
+        item["image_base64"] = base64.b64encode(data).decode('ascii')
+    else:
+        import screenshot_store
+        stored = screenshot_store.put(data, encoded["extension"], type="window", title=target["title"],
+                                      width=encoded["width"], height=encoded["height"])
+        item["filepath"] = stored["path"]
+        item["digest"] = stored["digest"]
+        item["deduplicated"] = stored["deduplicated"]
+    return item
+
+def take_screenshots_batch(window_titles, exclude_assistant=True, output="file", profile="original",
+                           max_dimension=None, image_format=None, quality=None):
+    """
+    Captura várias janelas de uma vez: enumera as janelas e minimiza o
+    assistente uma única vez, ativa e captura cada janela em sequência e
+    codifica/salva as imagens nas threads de codificação enquanto as
+    próximas janelas são capturadas. Títulos repetidos (ou que levam à mesma
+    janela) são capturados uma vez só. Ao final as janelas capturadas são
+    minimizadas (como no screenshot de janela única) e o assistente restaurado.
+
+    Retorna {"success", "results": [um resultado por título, na mesma ordem], "waits"}.
+    """
+    if not window_titles:
+        return {"success": False, "error": "Lista de janelas é obrigatória para screenshot em lote"}
+    if output not in OUTPUT_MODES:
+        return {"success": False, "error": f"Saída '{output}' não suportada em lote"}
+    try:
+        image_encoding.resolve_profile(profile, format=image_format)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    options = {"max_dimension": max_dimension, "format": image_format, "quality": quality}
+
+    start = time.monotonic()
+    waits = {}
+    try:
+        import pyautogui
+
+        # Todas as buscas no mesmo snapshot, antes de qualquer janela mudar;
+        # a janela do assistente nunca é um alvo quando vai ser escondida
+        assistant_handles = set()
+        if exclude_assistant:
+            assistant_handles = {w["handle"] for w in
+                                 window_snapshot.find_assistant_windows(window_snapshot.get_windows())}
+        targets = {}
+        for title in dict.fromkeys(window_titles):
+            matches = [window for window, _ in window_snapshot.find_windows(title, limit=5)
+                       if window["handle"] not in assistant_handles]
+            targets[title] = matches[0] if matches else None
+
+        assistant_windows = []
+        if exclude_assistant:
+            assistant_windows = minimize_assistant(waits)
+
+        # Um job por janela (handle), compartilhado pelos títulos que a encontraram
+        jobs = {}
+        captured = []
+        for target in targets.values():
+            if target is None or target["handle"] in jobs:
+                continue
+
+            deadline = time.monotonic() + WAIT_DEADLINE
+            restored = target["isMinimized"]
+            if restored:
+                window_snapshot.restore(target)
+                wait_stage(waits, "restore_target", window_snapshot.wait_until_restored, [target], deadline)
+            window_snapshot.activate(target)
+            wait_stage(waits, "activate_target", window_snapshot.wait_until_active, [target], deadline,
+                       settle=restored)
+
+            # Posição atual direto do sistema, sem nova enumeração
+            try:
+                position = window_snapshot.get_state(target)
+            except Exception:
+                position = target
+            region = (position["left"], position["top"], position["width"], position["height"])
+            screenshot = pyautogui.screenshot(region=region)
+            jobs[target["handle"]] = image_encoding.run_async(_encode_item, screenshot, target, profile,
+                                                              options, output)
+            captured.append(target)
+
+        # Esconder as janelas capturadas e devolver o assistente (esperas únicas)
+        for target in captured:
+            window_snapshot.minimize(target)
+        wait_stage(waits, "minimize_target", window_snapshot.wait_until_minimized,
+                   captured, time.monotonic() + WAIT_DEADLINE)
+        if exclude_assistant and assistant_windows:
+            restore_assistant(assistant_windows, waits)
+
+        results = []
+        for title in window_titles:
+            target = targets[title]
+            if target is None:
+                results.append({"success": False, "error": f"Janela '{title}' não encontrada", "query": title})
+            else:
+                results.append(dict(jobs[target["handle"]].result(), query=title))
+
+        return {
+            "success": any(item["success"] for item in results),
+            "results": results,
+            "waits": waits,
+            "elapsed_ms": round((time.monotonic() - start) * 1000, 1)
+        }
+
+    except ImportError as e:
+        return {"success": False, "error": f"Biblioteca necessária não encontrada: {e}"}
+    except Exception as e:
+        return {"success": False, "error": f"Erro ao capturar janelas: {e}"}
+
+def build_frame_event(frame, frame_number, keyframe, rectangles, profile="original"):
+    """
+    Monta o evento de um quadro do streaming, codificando cada retângulo
+    alterado. Os retângulos não são reduzidos: as coordenadas são as da tela.
+    """
+    import base64
+    from PIL import Image
+
+    tiles = []
+    size = 0
+    for x, y, width, height in rectangles:
+        # max_dimension=0: sem redução, mesmo no perfil de análise
+        data, encoded = image_encoding.encode_image(
+            Image.fromarray(frame[y:y + height, x:x + width]), profile, max_dimension=0)
+        size += len(data)
+        tiles.append({
+            "x": x, "y": y, "width": width, "height": height,
+            "image_base64": base64.b64encode(data).decode('ascii'),
+        })
+
+    return {
+        "type": "keyframe" if keyframe else "delta",
+        "frame": frame_number,
+        "timestamp": time.time(),
+        "width": frame.shape[1],
+        "height": frame.shape[0],
+        "mime_type": encoded["mime_type"] if tiles else None,
+        "tiles": tiles,
+        "size": size,
+    }
+
+def stream_screen(fps=2.0, duration=None, max_frames=None, tile_size=64, keyframe_interval=30,
+                  threshold=0, profile="original", region=None, emit=None, grab=None):
+    """
+    Captura a tela continuamente a `fps` quadros por segundo e emite, por
+    quadro, apenas os blocos que mudaram em relação ao anterior (eventos
+    "delta"), com um quadro inteiro ("keyframe") a cada keyframe_interval
+    quadros. Cada evento vai para emit (padrão: uma linha JSON no stdout).
+    Termina após duration segundos ou max_frames quadros e retorna o resumo.
+    """
+    import numpy as np
+    from frame_diff import FrameDiffer
+
+    if emit is None:
+        def emit(event):
+            sys.stdout.write(json.dumps(event) + "\n")
+            sys.stdout.flush()
+    if grab is None:
+        import pyautogui
+        grab = lambda: pyautogui.screenshot(region=region)
+
+    differ = FrameDiffer(tile_size=tile_size, keyframe_interval=keyframe_interval, threshold=threshold)
+    interval = 1.0 / fps if fps else 0.0
+    start = time.monotonic()
+    next_frame = start
+    frames = 0
+    bytes_emitted = 0
+    tiles_emitted = 0
+
+    try:
+        while True:
+            if max_frames is not None and frames >= max_frames:
+                break
+            if duration is not None and time.monotonic() - start >= duration:
+                break
+
+            frame = np.asarray(grab())
+            keyframe, rectangles = differ.diff(frame)
+            if rectangles:
+                event = build_frame_event(frame, frames, keyframe, rectangles, profile)
+                bytes_emitted += event["size"]
+                tiles_emitted += len(rectangles)
+                emit(event)
+            frames += 1
+
+            # Agenda pelo relógio, sem acumular atraso; quadros perdidos são pulados
+            next_frame += interval
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.monotonic()
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+    elapsed = time.monotonic() - start
+    return {
+        "type": "end",
+        "success": True,
+        "frames": frames,
+        "tiles": tiles_emitted,
+        "bytes": bytes_emitted,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed else 0.0,
+    }
+
 def list_windows():
     """
     Lista todas as janelas disponíveis para screenshot
     """
     try:
-        import pygetwindow as gw
-        
         windows = []
-        for window in gw.getAllWindows():
-            if window.title and window.visible and not window.isMinimized:
+        for window in window_snapshot.get_windows():
+            if window["title"] and window["visible"] and not window["isMinimized"]:
                 windows.append({
-                    "title": window.title,
-                    "left": window.left,
-                    "top": window.top,
-                    "width": window.width,
-                    "height": window.height
+                    "title": window["title"],
+                    "left": window["left"],
+                    "top": window["top"],
+                    "width": window["width"],
+                    "height": window["height"]
                 })
         
         return {
@@ -247,27 +527,83 @@ def list_windows():
     except Exception as e:
         return {"success": False, "error": f"Erro ao listar janelas: {e}"}
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
+def list_screenshots(limit=None, screenshot_type=None):
+    """
+    Lista as capturas guardadas a partir do índice (sem varrer o diretório)
+    """
+    try:
+        import screenshot_store
+        return {
+            "success": True,
+            "screenshots": screenshot_store.list_entries(limit, screenshot_type),
+            "store": screenshot_store.stats()
+        }
+    except Exception as e:
+        return {"success": False, "error": f"Erro ao listar capturas: {e}"}
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if len(argv) < 1:
         print(json.dumps({"success": False, "error": "Parâmetros insuficientes"}))
         sys.exit(1)
     
-    action = sys.argv[1]
+    action = argv[0]
     
     if action == "screenshot":
-        # Parâmetros: screenshot_type, window_title, filename, exclude_assistant, open_image
-        screenshot_type = sys.argv[2] if len(sys.argv) > 2 else "full"
-        window_title = sys.argv[3] if len(sys.argv) > 3 else None
-        filename = sys.argv[4] if len(sys.argv) > 4 else None
-        exclude_assistant = sys.argv[5].lower() == "true" if len(sys.argv) > 5 else True
-        open_image = sys.argv[6].lower() == "true" if len(sys.argv) > 6 else True
+        # Parâmetros: screenshot_type, window_title, filename, exclude_assistant, open_image, output, profile, compute_hash
+        screenshot_type = argv[1] if len(argv) > 1 else "full"
+        window_title = argv[2] if len(argv) > 2 else None
+        filename = argv[3] if len(argv) > 3 else None
+        exclude_assistant = argv[4].lower() == "true" if len(argv) > 4 else True
+        open_image = argv[5].lower() == "true" if len(argv) > 5 else True
+        output = argv[6] if len(argv) > 6 and argv[6] else "file"
+        profile = argv[7] if len(argv) > 7 and argv[7] else "original"
+        compute_hash = argv[8].lower() == "true" if len(argv) > 8 else False
+        
+        result = take_screenshot(screenshot_type, window_title or None, filename or None,
+                                 exclude_assistant, open_image, output, profile, compute_hash=compute_hash)
+        print(json.dumps(result))
+    
+    elif action == "batch":
+        # Parâmetros: titles (lista JSON), exclude_assistant, output, profile
+        titles = json.loads(argv[1]) if len(argv) > 1 and argv[1] else []
+        exclude_assistant = argv[2].lower() == "true" if len(argv) > 2 and argv[2] else True
+        output = argv[3] if len(argv) > 3 and argv[3] else "file"
+        profile = argv[4] if len(argv) > 4 and argv[4] else "original"
         
-        result = take_screenshot(screenshot_type, window_title, filename, exclude_assistant, open_image)
+        result = take_screenshots_batch(titles, exclude_assistant, output, profile)
+        print(json.dumps(result))
+    
+    elif action == "stream":
+        # Parâmetros: fps, duration (s, vazio = até ser interrompido), tile_size, keyframe_interval, profile
+        fps = float(argv[1]) if len(argv) > 1 and argv[1] else 2.0
+        duration = float(argv[2]) if len(argv) > 2 and argv[2] else None
+        tile_size = int(argv[3]) if len(argv) > 3 and argv[3] else 64
+        keyframe_interval = int(argv[4]) if len(argv) > 4 and argv[4] else 30
+        profile = argv[5] if len(argv) > 5 and argv[5] else "original"
+        
+        result = stream_screen(fps, duration, tile_size=tile_size,
+                               keyframe_interval=keyframe_interval, profile=profile)
         print(json.dumps(result))
     
     elif action == "list_windows":
         result = list_windows()
         print(json.dumps(result))
     
+    elif action == "list_screenshots":
+        # Parâmetros: limit, screenshot_type
+        limit = int(argv[1]) if len(argv) > 1 and argv[1] else None
+        screenshot_type = argv[2] if len(argv) > 2 and argv[2] else None
+        result = list_screenshots(limit, screenshot_type)
+        print(json.dumps(result))
+    
     else:
         print(json.dumps({"success": False, "error": f"Ação '{action}' não reconhecida"}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento das capturas de tela em backend/screenshots.
+
+Cada arquivo é nomeado pelo hash do conteúdo (SHA-256), então capturas
+idênticas viram um único arquivo e capturas no mesmo segundo não colidem.
+Um índice compacto (index.json) guarda data, tipo, título da janela,
+dimensões e tamanho de cada captura: listar não precisa varrer o diretório
+nem abrir imagens. Quando o total passa de MAX_BYTES, as capturas mais
+antigas são removidas.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'screenshots')
+INDEX_NAME = 'index.json'
+
+# Limite total em bytes das capturas guardadas
+MAX_BYTES = int(os.environ.get('SCREENSHOT_STORE_MAX_BYTES', str(500 * 1024 * 1024)))
+
+# Tamanho do nome do arquivo (caracteres hexadecimais do SHA-256)
+DIGEST_LENGTH = 32
+
+INDEX_VERSION = 1
+
+_lock = threading.RLock()
+_loaded = {"key": None, "index": None}
+
+
+def _index_path(store_dir):
+    return os.path.join(store_dir, INDEX_NAME)
+
+
+def _empty_index():
+    return {"version": INDEX_VERSION, "total_bytes": 0, "entries": {}}
+
+
+def rebuild_index(store_dir=STORE_DIR):
+    """
+    Reconstrói o índice a partir dos arquivos do diretório (índice ausente
+    ou corrompido). Metadados que só existiam no índice ficam vazios.
+    """
+    index = _empty_index()
+    try:
+        names = os.listdir(store_dir)
+    except FileNotFoundError:
+        return index
+
+    for name in names:
+        digest, extension = os.path.splitext(name)
+        if name == INDEX_NAME or len(digest) != DIGEST_LENGTH:
+            continue
+        stat = os.stat(os.path.join(store_dir, name))
+        index["entries"][digest] = {
+            "file": name, "timestamp": stat.st_mtime, "type": None, "title": None,
+            "width": None, "height": None, "size": stat.st_size,
+        }
+        index["total_bytes"] += stat.st_size
+    return index
+
+
+def load_index(store_dir=STORE_DIR):
+    """
+    Índice atual; reaproveitado em memória enquanto o arquivo não mudar
+    """
+    path = _index_path(store_dir)
+    with _lock:
+        try:
+            stat = os.stat(path)
+            key = (path, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            key = (path, None, None)
+
+        if _loaded["key"] == key:
+            return _loaded["index"]
+
+        index = None
+        if key[1] is not None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get("version") != INDEX_VERSION:
+                    index = None
+            except (OSError, ValueError):
+                index = None
+        if index is None:
+            index = rebuild_index(store_dir)
+            if index["entries"]:
+                save_index(index, store_dir)
+                return index
+
+        _loaded["key"] = key
+        _loaded["index"] = index
+        return index
+
+
+def save_index(index, store_dir=STORE_DIR):
+    """
+    Grava o índice de forma atômica
+    """
+    path = _index_path(store_dir)
+    with _lock:
+        os.makedirs(store_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+        stat = os.stat(path)
+        _loaded["key"] = (path, stat.st_mtime_ns, stat.st_size)
+        _loaded["index"] = index
+
+
+def _evict(index, store_dir, max_bytes, keep):
+    """
+    Remove as capturas mais antigas até o total caber no limite
+    """
+    removed = []
+    if index["total_bytes"] <= max_bytes:
+        return removed
+    for digest, entry in sorted(index["entries"].items(), key=lambda item: item[1]["timestamp"]):
+        if index["total_bytes"] <= max_bytes:
+            break
+        if digest == keep:
+            continue
+        try:
+            os.remove(os.path.join(store_dir, entry["file"]))
+        except FileNotFoundError:
+            pass
+        index["total_bytes"] -= entry["size"]
+        del index["entries"][digest]
+        removed.append(digest)
+    return removed
+
+
+def put(data, extension='.png', store_dir=STORE_DIR, max_bytes=None, **metadata):
+    """
+    Guarda os bytes de uma captura; metadata: type, title, width, height,
+    label. Retorna a entrada do índice com "path", "digest" e "deduplicated".
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    digest = hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+    name = f"{digest}{extension}"
+    path = os.path.join(store_dir, name)
+
+    with _lock:
+        index = load_index(store_dir)
+        entry = index["entries"].get(digest)
+        deduplicated = entry is not None and os.path.exists(os.path.join(store_dir, entry["file"]))
+
+        if not deduplicated:
+            os.makedirs(store_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            if entry is not None:
+                index["total_bytes"] -= entry["size"]
+            index["total_bytes"] += len(data)
+
+        entry = {
+            "file": entry["file"] if deduplicated else name,
+            "timestamp": time.time(),
+            "type": metadata.get("type"),
+            "title": metadata.get("title"),
+            "width": metadata.get("width"),
+            "height": metadata.get("height"),
+            "size": len(data),
+        }
+        if metadata.get("label"):
+            entry["label"] = metadata["label"]
+        # Reinserir mantém o índice em ordem de uso
+        index["entries"].pop(digest, None)
+        index["entries"][digest] = entry
+
+        evicted = _evict(index, store_dir, max_bytes, keep=digest)
+        save_index(index, store_dir)
+
+    return dict(entry, digest=digest, path=os.path.join(store_dir, entry["file"]),
+                deduplicated=deduplicated, evicted=len(evicted))
+
+
+def put_file(source_path, store_dir=STORE_DIR, max_bytes=None, **metadata):
+    """
+    Move um arquivo já gravado (ex.: captura feita pelo PowerShell) para o armazenamento
+    """
+    with open(source_path, 'rb') as f:
+        data = f.read()
+    extension = os.path.splitext(source_path)[1].lower() or '.png'
+    entry = put(data, extension, store_dir, max_bytes, **metadata)
+    if os.path.abspath(source_path) != os.path.abspath(entry["path"]):
+        os.remove(source_path)
+    return entry
+
+
+def list_entries(limit=None, screenshot_type=None, store_dir=STORE_DIR):
+    """
+    Capturas do índice, da mais recente para a mais antiga
+    """
+    index = load_index(store_dir)
+    entries = [dict(entry, digest=digest) for digest, entry in index["entries"].items()
+               if screenshot_type is None or entry["type"] == screenshot_type]
+    entries.sort(key=lambda entry: entry["timestamp"], reverse=True)
+    return entries[:limit] if limit else entries
+
+
+def get_path(digest, store_dir=STORE_DIR):
+    """
+    Caminho do arquivo de uma captura, ou None se não estiver no índice
+    """
+    entry = load_index(store_dir)["entries"].get(digest)
+    return os.path.join(store_dir, entry["file"]) if entry else None
+
+
+def stats(store_dir=STORE_DIR):
+    """
+    Quantidade de capturas, bytes usados e limite
+    """
+    index = load_index(store_dir)
+    return {"count": len(index["entries"]), "total_bytes": index["total_bytes"], "max_bytes": MAX_BYTES}
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de sessões de shell persistentes (PowerShell, pwsh ou bash).
+
+Iniciar "powershell -Command ..." a cada chamada custa centenas de
+milissegundos antes de qualquer trabalho, e cada script ainda recompilava o
+mesmo Add-Type. Aqui cada sessão é um host de shell vivo lendo comandos do
+stdin: o script vai numa única linha (em base64 no PowerShell, num heredoc no
+bash) e a saída de todos os streams é lida até uma linha sentinela
+"<token> <seq> <código>", com um token aleatório por sessão. Definições
+compartilhadas (preload, como WIN32_TYPES) rodam uma vez quando a sessão
+nasce.
+
+Comandos rodam no escopo da sessão (variáveis e diretório atual persistem),
+por isso a sessão é descartada após um erro, um timeout ou MAX_USES usos.
+Comandos do usuário usam um pool próprio com isolate=True: cada um volta ao
+diretório inicial e roda num escopo filho, sem herdar nem deixar estado.
+O dialeto é só o jeito de iniciar o host e enquadrar o comando, então o pool
+funciona igual com bash no Linux.
+"""
+
+import os
+import sys
+import time
+import uuid
+import queue
+import shlex
+import base64
+import atexit
+import threading
+import subprocess
+from collections import deque
+
+# Sessões vivas por pool
+POOL_SIZE = int(os.environ.get('SHELL_POOL_SIZE', '2'))
+
+# Usos antes de reciclar a sessão
+MAX_USES = int(os.environ.get('SHELL_POOL_MAX_USES', '50'))
+
+# Timeout padrão (s) de cada comando
+COMMAND_TIMEOUT = 30
+
+# Timeout (s) do início da sessão, incluindo o preload
+START_TIMEOUT = 30
+
+# SHELL_POOL=false volta a criar um processo por comando
+ENABLED = os.environ.get('SHELL_POOL', 'true').lower() != 'false'
+
+# Tipos Win32 usados pelos scripts (janelas e teclas de volume), compilados
+# uma vez por sessão em vez de um Add-Type por chamada
+WIN32_TYPES = r'''
+if (-not ('AssistantWin32' -as [type])) {
+Add-Type -TypeDefinition @"
+using System;
+using System.Runtime.InteropServices;
+using System.Text;
+public class AssistantWin32 {
+    [DllImport("user32.dll")]
+    public static extern bool EnumWindows(EnumWindowsProc enumProc, IntPtr lParam);
+    [DllImport("user32.dll")]
+    public static extern int GetWindowText(IntPtr hWnd, StringBuilder lpString, int nMaxCount);
+    [DllImport("user32.dll")]
+    public static extern int GetWindowTextLength(IntPtr hWnd);
+    [DllImport("user32.dll")]
+    public static extern bool IsWindowVisible(IntPtr hWnd);
+    [DllImport("user32.dll")]
+    public static extern bool GetWindowRect(IntPtr hWnd, out RECT lpRect);
+    [DllImport("user32.dll")]
+    public static extern bool IsIconic(IntPtr hWnd);
+    [DllImport("user32.dll")]
+    public static extern bool IsZoomed(IntPtr hWnd);
+    [DllImport("user32.dll")]
+    public static extern IntPtr GetForegroundWindow();
+    [DllImport("user32.dll")]
+    public static extern bool PostMessage(IntPtr hWnd, uint Msg, IntPtr wParam, IntPtr lParam);
+    [DllImport("user32.dll")]
+    public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
+
+    public delegate bool EnumWindowsProc(IntPtr hWnd, IntPtr lParam);
+
+    public const uint WM_CLOSE = 0x0010;
+
+    [StructLayout(LayoutKind.Sequential)]
+    public struct RECT {
+        public int Left;
+        public int Top;
+        public int Right;
+        public int Bottom;
+    }
+
+    // Pressiona e solta uma tecla virtual (volume: 0xAF sobe, 0xAE desce, 0xAD mudo)
+    public static void PressKey(byte key, int times, int delayMs) {
+        for (int i = 0; i < times; i++) {
+            keybd_event(key, 0, 0, UIntPtr.Zero);
+            keybd_event(key, 0, 2, UIntPtr.Zero);
+            if (delayMs > 0) System.Threading.Thread.Sleep(delayMs);
+        }
+    }
+}
+"@
+}
+'''
+
+
+class ShellError(RuntimeError):
+    """
+    Comando terminou com código diferente de zero (result tem a saída)
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result or {}
+
+
+class PowerShellDialect:
+    """
+    Windows PowerShell / pwsh lendo comandos do stdin
+    """
+
+    name = 'powershell'
+
+    def __init__(self, executable='powershell'):
+        self.executable = executable
+
+    def argv(self):
+        return [self.executable, '-NoLogo', '-NoProfile', '-NonInteractive', '-Command', '-']
+
+    def setup(self):
+        return ("[Console]::OutputEncoding = [Text.Encoding]::UTF8; "
+                "$ProgressPreference = 'SilentlyContinue'")
+
+    def frame(self, script, marker):
+        encoded = base64.b64encode(script.encode('utf-8')).decode('ascii')
+        return (
+            "$Error.Clear(); $global:LASTEXITCODE = 0; $__code = 0; "
+            "try { . ([ScriptBlock]::Create([Text.Encoding]::UTF8.GetString("
+            f"[Convert]::FromBase64String('{encoded}')))) *>&1 | Out-String -Stream -Width 4096 }} "
+            "catch { $__code = 1; $_ | Out-String -Stream -Width 4096 }; "
+            "if ($__code -eq 0 -and $Error.Count -gt 0) { $__code = 1 } "
+            "elseif ($__code -eq 0 -and $LASTEXITCODE) { $__code = $LASTEXITCODE }; "
+            f"[Console]::Out.WriteLine(''); [Console]::Out.WriteLine('{marker} ' + $__code); "
+            "[Console]::Out.Flush()"
+        )
+
+    def isolate(self, script, cwd):
+        quoted = cwd.replace("'", "''")
+        return f"Set-Location -LiteralPath '{quoted}'\n& {{\n{script}\n}}"
+
+    def one_shot(self, script):
+        return [self.executable, '-NoLogo', '-NoProfile', '-NonInteractive', '-Command', script]
+
+
+class BashDialect:
+    """
+    bash (ou sh) lendo comandos do stdin; útil para testes no Linux
+    """
+
+    name = 'bash'
+
+    def __init__(self, executable='bash'):
+        self.executable = executable
+
+    def argv(self):
+        return [self.executable, '--noprofile', '--norc'] if self.executable.endswith('bash') else [self.executable]
+
+    def setup(self):
+        return ''
+
+    def frame(self, script, marker):
+        delimiter = f"{marker.split()[0]}_EOF"
+        return (
+            f"eval \"$(cat <<'{delimiter}'\n{script}\n{delimiter}\n)\" </dev/null 2>&1; "
+            f"printf '\\n%s %s\\n' '{marker}' \"$?\""
+        )
+
+    def isolate(self, script, cwd):
+        return f"cd -- {shlex.quote(cwd)} && (\n{script}\n)"
+
+    def one_shot(self, script):
+        return [self.executable, '-c', script]
+
+
+DIALECTS = {
+    'powershell': lambda: PowerShellDialect('powershell'),
+    'pwsh': lambda: PowerShellDialect('pwsh'),
+    'bash': lambda: BashDialect('bash'),
+    'sh': lambda: BashDialect('sh'),
+}
+
+
+def default_shell():
+    return os.environ.get('SHELL_POOL_SHELL') or ('powershell' if sys.platform == 'win32' else 'bash')
+
+
+def get_dialect(shell):
+    try:
+        return DIALECTS[shell]()
+    except KeyError:
+        raise ValueError(f"Shell desconhecido: {shell} (use {', '.join(DIALECTS)})")
+
+
+class ShellSession:
+    """
+    Um host de shell vivo que executa um comando por vez
+    """
+
+    def __init__(self, dialect, preload=(), start_timeout=START_TIMEOUT):
+        self.dialect = dialect
+        self.preload = list(preload)
+        self.start_timeout = start_timeout
+        self.token = f"__AIA_{uuid.uuid4().hex}__"
+        self.process = None
+        self.lines = queue.Queue()
+        self.stderr = deque(maxlen=50)
+        self.uses = 0
+        self.seq = 0
+        self.startup_ms = None
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """
+        Inicia o host e roda o preload. Retorna o tempo de início em ms.
+        """
+        start = time.perf_counter()
+        # Grupo próprio: um comando travado é encerrado junto com a sessão
+        if sys.platform == 'win32':
+            options = {'creationflags': subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            options = {'start_new_session': True}
+        self.process = subprocess.Popen(self.dialect.argv(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace',
+                                        bufsize=1, **options)
+        threading.Thread(target=self._pump, args=(self.process.stdout, self.lines.put),
+                         name='shell-stdout', daemon=True).start()
+        threading.Thread(target=self._pump, args=(self.process.stderr, self._stderr_line),
+                         name='shell-stderr', daemon=True).start()
+
+        for script in [self.dialect.setup(), *self.preload]:
+            if script:
+                result = self._execute(script, self.start_timeout)
+                if result["code"] != 0:
+                    self.close()
+                    raise ShellError(f"Falha ao preparar a sessão de {self.dialect.name}: {result['output']}", result)
+        self.startup_ms = round((time.perf_counter() - start) * 1000, 1)
+        return self.startup_ms
+
+    def _stderr_line(self, line):
+        # Só erros do próprio host (os comandos redirecionam stderr para stdout)
+        if line is not None:
+            self.stderr.append(line)
+
+    @staticmethod
+    def _pump(stream, sink):
+        for line in iter(stream.readline, ''):
+            sink(line.rstrip('\r\n'))
+        sink(None)
+
+    def _execute(self, script, timeout):
+        self.seq += 1
+        marker = f"{self.token} {self.seq}"
+        try:
+            self.process.stdin.write(self.dialect.frame(script, marker) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            return {"code": None, "output": '\n'.join(self.stderr), "dead": True}
+
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self.lines.get(timeout=max(remaining, 0)) if remaining > 0 else self.lines.get_nowait()
+            except queue.Empty:
+                return {"code": None, "output": '\n'.join(output), "timed_out": True}
+            if line is None:
+                # Host saiu no meio do comando (exit no script, falha do shell)
+                try:
+                    code = self.process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    code = None
+                return {"code": code, "output": '\n'.join(output + list(self.stderr)), "dead": True}
+            if line.startswith(marker + ' '):
+                code = line[len(marker) + 1:].strip()
+                # A sentinela vem após uma quebra de linha extra
+                if output and output[-1] == '':
+                    output.pop()
+                return {"code": int(code) if code.lstrip('-').isdigit() else 1, "output": '\n'.join(output)}
+            if line.startswith(self.token):
+                # Sentinela de um comando anterior que expirou
+                continue
+            output.append(line)
+
+    def run(self, script, timeout=COMMAND_TIMEOUT):
+        """
+        Executa o script. Retorna {code, output, duration_ms} e, quando a
+        sessão não pode mais ser usada, timed_out ou dead.
+        """
+        start = time.perf_counter()
+        self.uses += 1
+        result = self._execute(script, timeout)
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    def close(self, force=False):
+        """
+        Encerra o host; com force (comando travado) encerra também os filhos
+        """
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return
+        if force:
+            from run_command import kill_tree
+            kill_tree(process)
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=1)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            process.kill()
+
+
+class SessionPool:
+    """
+    Até size sessões do mesmo shell com o mesmo preload. Com isolate, cada
+    comando começa no diretório cwd (padrão: o atual) num escopo próprio.
+    """
+
+    def __init__(self, shell=None, size=POOL_SIZE, max_uses=MAX_USES, preload=(), recycle_on_error=True,
+                 isolate=False, cwd=None):
+        self.shell = shell or default_shell()
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.preload = list(preload)
+        self.recycle_on_error = recycle_on_error
+        self.isolate = isolate
+        self.cwd = cwd or os.getcwd()
+        self.idle = []
+        self.busy = 0
+        self.condition = threading.Condition()
+        self.counters = {"runs": 0, "started": 0, "recycled": 0, "timeouts": 0, "startup_ms": 0.0}
+        get_dialect(self.shell)
+
+    def _acquire(self):
+        with self.condition:
+            while True:
+                while self.idle:
+                    session = self.idle.pop()
+                    if session.alive:
+                        self.busy += 1
+                        return session
+                    self.counters["recycled"] += 1
+                if self.busy < self.size:
+                    self.busy += 1
+                    break
+                self.condition.wait()
+
+        # Sessão nova iniciada fora do lock (o preload pode levar segundos)
+        session = ShellSession(get_dialect(self.shell), self.preload)
+        try:
+            startup_ms = session.start()
+        except Exception:
+            self._release(None)
+            raise
+        with self.condition:
+            self.counters["started"] += 1
+            self.counters["startup_ms"] += startup_ms
+        return session
+
+    def _release(self, session, keep=True, force=False):
+        with self.condition:
+            self.busy -= 1
+            if session is not None:
+                if keep and session.alive and session.uses < self.max_uses:
+                    self.idle.append(session)
+                else:
+                    self.counters["recycled"] += 1
+                    session.close(force)
+            self.condition.notify()
+
+    def run(self, script, timeout=COMMAND_TIMEOUT, check=False):
+        """
+        Executa o script numa sessão livre. Retorna {code, output,
+        duration_ms, session_uses}; com check=True levanta ShellError se o
+        código não for zero.
+        """
+        if self.isolate:
+            script = get_dialect(self.shell).isolate(script, self.cwd)
+        session = self._acquire()
+        # Uma exceção no meio do comando descarta a sessão (estado incerto)
+        keep, force = False, True
+        try:
+            result = session.run(script, timeout)
+            failed = result["code"] != 0
+            with self.condition:
+                self.counters["runs"] += 1
+                if result.get("timed_out"):
+                    self.counters["timeouts"] += 1
+            result["session_uses"] = session.uses
+            force = bool(result.get("timed_out") or result.get("dead"))
+            keep = not (force or (failed and self.recycle_on_error))
+        finally:
+            self._release(session, keep=keep, force=force)
+
+        if check and failed:
+            reason = 'tempo esgotado' if result.get("timed_out") else f"código {result['code']}"
+            raise ShellError(f"Comando de {self.shell} falhou ({reason}): {result['output']}", result)
+        return result
+
+    def warm(self, count=1):
+        """
+        Inicia sessões antes do primeiro comando
+        """
+        sessions = [self._acquire() for _ in range(min(count, self.size))]
+        for session in sessions:
+            self._release(session)
+
+    def stats(self):
+        with self.condition:
+            started = self.counters["started"]
+            return {"shell": self.shell, "size": self.size, "idle": len(self.idle), "busy": self.busy,
+                    "runs": self.counters["runs"], "started": started, "recycled": self.counters["recycled"],
+                    "timeouts": self.counters["timeouts"],
+                    "startup_ms_mean": round(self.counters["startup_ms"] / started, 1) if started else None}
+
+    def close(self):
+        with self.condition:
+            sessions, self.idle = self.idle, []
+        for session in sessions:
+            session.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(shell=None, preload=None, isolate=False):
+    """
+    Pool compartilhado por shell (persiste entre chamadas no worker). O
+    PowerShell já vem com WIN32_TYPES no preload. isolate=True é outro pool,
+    sem preload, para comandos do usuário (ver SessionPool).
+    """
+    shell = shell or default_shell()
+    with _pools_lock:
+        if (shell, isolate) not in _pools:
+            if preload is None:
+                internal = not isolate and isinstance(get_dialect(shell), PowerShellDialect)
+                preload = [WIN32_TYPES] if internal else []
+            _pools[(shell, isolate)] = SessionPool(shell, preload=preload, isolate=isolate)
+        return _pools[(shell, isolate)]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_pools)
+
+
+def run_powershell(script, timeout=COMMAND_TIMEOUT, check=True, isolate=False):
+    """
+    Executa um script PowerShell com WIN32_TYPES disponível. Usa o pool de
+    sessões ou, com SHELL_POOL=false, um processo novo por chamada.
+    isolate=True (comandos do usuário): pool separado, sem WIN32_TYPES e sem
+    estado entre chamadas.
+    """
+    if ENABLED:
+        return get_pool('powershell', isolate=isolate).run(script, timeout, check)
+
+    dialect = get_dialect('powershell')
+    start = time.perf_counter()
+    completed = subprocess.run(dialect.one_shot(script if isolate else WIN32_TYPES + '\n' + script),
+                               capture_output=True, text=True, timeout=timeout)
+    result = {"code": completed.returncode, "output": (completed.stdout + completed.stderr).strip(),
+              "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+    if check and completed.returncode != 0:
+        raise ShellError(f"Comando de powershell falhou (código {completed.returncode}): {result['output']}",
+                         result)
+    return result
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de texto para buscas tolerantes (títulos de janelas, nomes de apps).
+
+Os textos são normalizados (minúsculas, sem acentos, só letras e números) e
+indexados por token. Os tokens distintos (o vocabulário) são indexados por
+trigrama, então erros de digitação e trechos no meio de uma palavra são
+resolvidos no vocabulário, que é bem menor que a lista de entradas.
+
+As buscas retornam candidatos ordenados de forma determinística: primeiro as
+entradas que contêm mais palavras da busca, depois a pontuação e, em caso de
+empate, a entrada que veio primeiro na lista original.
+"""
+
+import unicodedata
+from bisect import bisect_left
+from itertools import chain, combinations
+
+# Similaridade mínima (Dice de trigramas) para um token contar como aproximado
+FUZZY_THRESHOLD = 0.5
+
+# Máximo de palavras da busca consideradas (as mais longas)
+MAX_QUERY_TOKENS = 6
+
+
+def fold(text):
+    """
+    Remove acentos, converte para minúsculas e junta os espaços, mantendo a
+    pontuação ("Notepad++  Câmera" -> "notepad++ camera")
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+
+def normalize(text):
+    """
+    Como fold, trocando também a pontuação por espaço
+    ("Câmera - Configurações" -> "camera configuracoes")
+    """
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in fold(text)).split())
+
+
+def trigrams(normalized):
+    """
+    Trigramas de um texto já normalizado, com bordas marcadas por espaço
+    """
+    padded = f' {normalized} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TextIndex:
+    """
+    Índice por token (com vocabulário indexado por trigrama) sobre uma lista de entradas
+    """
+
+    def __init__(self, entries, key=lambda entry: entry):
+        self.entries = list(entries)
+        self._texts = []
+        self._token_counts = []
+        self._tokens = {}
+
+        for position, entry in enumerate(self.entries):
+            text = normalize(key(entry))
+            tokens = set(text.split())
+            self._texts.append(text)
+            self._token_counts.append(len(tokens))
+            for token in tokens:
+                self._tokens.setdefault(token, []).append(position)
+
+        self._sorted_tokens = sorted(self._tokens)
+        self._token_grams = {}
+        self._vocabulary_grams = {}
+        for token in self._sorted_tokens:
+            grams = trigrams(token)
+            self._token_grams[token] = grams
+            for gram in grams:
+                self._vocabulary_grams.setdefault(gram, []).append(token)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _query_token_positions(self, query_token):
+        """
+        Entradas que casam com um token da busca: {posição: similaridade}.
+        Token igual ou iniciado pelo da busca vale 1; sem nenhum, usa os
+        tokens do vocabulário com trigramas parecidos.
+        """
+        start = bisect_left(self._sorted_tokens, query_token)
+        postings = []
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(query_token):
+                break
+            postings.append(self._tokens[token])
+        if postings:
+            return dict.fromkeys(chain.from_iterable(postings), 1.0)
+
+        query_grams = trigrams(query_token)
+        shared = {}
+        for gram in query_grams:
+            for token in self._vocabulary_grams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+
+        similar = []
+        for token, count in shared.items():
+            similarity = 2 * count / (len(query_grams) + len(self._token_grams[token]))
+            if similarity >= FUZZY_THRESHOLD:
+                similar.append((round(similarity, 4), token))
+
+        # Do menos para o mais parecido, para a melhor similaridade prevalecer
+        positions = {}
+        for similarity, token in sorted(similar):
+            positions.update(dict.fromkeys(self._tokens[token], similarity))
+        return positions
+
+    def _score_tier(self, positions, query, matches, min_score):
+        """
+        Pontua as entradas de uma faixa; retorna [(pontuação, posição)]
+        """
+        texts = self._texts
+        token_counts = self._token_counts
+        query_size = len(matches)
+        query_length = len(query)
+        single = matches[0] if query_size == 1 else None
+
+        scored = []
+        for position in positions:
+            text = texts[position]
+            if text == query:
+                scored.append((1.0, position))
+                continue
+
+            if single is not None:
+                total, found = single[position], 1
+            else:
+                similarities = [m[position] for m in matches if position in m]
+                total, found = sum(similarities), len(similarities)
+            score = 0.75 * total / query_size + 0.2 * min(1.0, found / token_counts[position])
+
+            # Busca contida no texto (ou o contrário) mantém o comportamento antigo
+            # de correspondência parcial, agora com prioridade para o mais parecido
+            if query in text:
+                score = max(score, 0.8 + 0.15 * query_length / len(text))
+            elif text in query:
+                score = max(score, 0.7 + 0.15 * len(text) / query_length)
+            if score >= min_score:
+                scored.append((score, position))
+        return scored
+
+    def search(self, query, limit=5, min_score=0.35):
+        """
+        Retorna [(entrada, pontuação)] ordenado da melhor para a pior
+        """
+        query = normalize(query)
+        if not query or not self.entries:
+            return []
+
+        # Palavras repetidas ou em excesso não mudam o resultado; o limite evita
+        # explosão combinatória nas faixas
+        tokens = sorted(set(query.split()), key=lambda token: (-len(token), token))[:MAX_QUERY_TOKENS]
+        matches = [self._query_token_positions(token) for token in tokens]
+
+        # Faixas por quantidade de palavras da busca contidas na entrada,
+        # da maior para a menor; as menores só são calculadas se as
+        # anteriores não preencherem o limite com resultados acima de
+        # min_score (candidatos descartados não contam)
+        seen = set()
+        scored = []
+        for size in range(len(matches), 0, -1):
+            if limit and len(scored) >= limit:
+                break
+            positions = set()
+            for group in combinations(matches, size):
+                common = set(group[0])
+                for found in group[1:]:
+                    common &= found.keys()
+                positions |= common
+            positions -= seen
+            seen |= positions
+            scored.extend((-size, -score, position)
+                          for score, position in self._score_tier(positions, query, matches, min_score))
+
+        scored.sort()
+        if limit:
+            scored = scored[:limit]
+        return [(self.entries[position], round(-score, 4)) for _, score, position in scored]
@@ -2,185 +2,130 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import subprocess
-import time
+import json
 
-def set_volume(level):
+def describe(state):
     """
-    Define o volume do sistema (0-100)
+    Texto do nível informado pelo backend ('' quando não é conhecido)
+    """
+    if state.get("muted"):
+        return " (silenciado)"
+    return f" ({state['level']}%)" if state.get("level") is not None else ""
+
+def set_volume(level, details=False):
+    """
+    Define o volume do sistema (0-100) com uma única chamada ao backend de
+    áudio (teclas de volume só como último recurso)
     """
     try:
-        # Usar PowerShell para controlar volume
-        ps_command = f"""
-        Add-Type -TypeDefinition @"
-        using System;
-        using System.Runtime.InteropServices;
-        public class Audio {
-            [DllImport("user32.dll")]
-            public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
-            public static void SetVolume(int level) {{
-                int volume = Math.Max(0, Math.Min(100, level));
-                int keyPresses = volume / 2; // Cada tecla aumenta ~2%
-                
-                // Pressionar Ctrl+Alt+Volume Up/Down
-                for (int i = 0; i < keyPresses; i++) {{
-                    keybd_event(0xAF, 0, 0, UIntPtr.Zero); // Volume Up
-                    keybd_event(0xAF, 0, 2, UIntPtr.Zero); // Key Up
-                    System.Threading.Thread.Sleep(50);
-                }}
-            }}
-        }}
-"@
-        [Audio]::SetVolume({level})
-        """
-        
-        subprocess.run(['powershell', '-Command', ps_command], 
-                      capture_output=True, text=True, check=True)
-        
-        return f"Volume definido para {level}%"
-        
+        import audio_backend
+        state = audio_backend.set_level(max(0, min(100, int(level))))
+        message = f"Volume definido para {state['level']}%"
+        return {"success": True, "message": message, **state} if details else message
+
     except Exception as e:
-        return f"Erro ao definir volume: {str(e)}"
+        message = f"Erro ao definir volume: {str(e)}"
+        return {"success": False, "message": message} if details else message
 
-def volume_up():
+def volume_up(details=False):
     """
     Aumenta o volume
     """
     try:
-        # Usar pyautogui para pressionar tecla de volume
-        import pyautogui
-        pyautogui.press('volumeup')
-        return "Volume aumentado"
-    except:
-        # Fallback: usar PowerShell
-        ps_command = """
-        Add-Type -TypeDefinition @"
-        using System;
-        using System.Runtime.InteropServices;
-        public class Audio {
-            [DllImport("user32.dll")]
-            public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
-            public static void VolumeUp() {
-                keybd_event(0xAF, 0, 0, UIntPtr.Zero); // Volume Up
-                keybd_event(0xAF, 0, 2, UIntPtr.Zero); // Key Up
-            }
-        }
-"@
-        [Audio]::VolumeUp()
-        """
-        subprocess.run(['powershell', '-Command', ps_command], 
-                      capture_output=True, text=True, check=True)
-        return "Volume aumentado"
+        import audio_backend
+        state = audio_backend.step('up')
+        message = f"Volume aumentado{describe(state)}"
+        return {"success": True, "message": message, **state} if details else message
+    except Exception as e:
+        message = f"Erro ao aumentar volume: {str(e)}"
+        return {"success": False, "message": message} if details else message
 
-def volume_down():
+def volume_down(details=False):
     """
     Diminui o volume
     """
     try:
-        import pyautogui
-        pyautogui.press('volumedown')
-        return "Volume diminuído"
-    except:
-        ps_command = """
-        Add-Type -TypeDefinition @"
-        using System;
-        using System.Runtime.InteropServices;
-        public class Audio {
-            [DllImport("user32.dll")]
-            public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
-            public static void VolumeDown() {
-                keybd_event(0xAE, 0, 0, UIntPtr.Zero); // Volume Down
-                keybd_event(0xAE, 0, 2, UIntPtr.Zero); // Key Up
-            }
-        }
-"@
-        [Audio]::VolumeDown()
-        """
-        subprocess.run(['powershell', '-Command', ps_command], 
-                      capture_output=True, text=True, check=True)
-        return "Volume diminuído"
+        import audio_backend
+        state = audio_backend.step('down')
+        message = f"Volume diminuído{describe(state)}"
+        return {"success": True, "message": message, **state} if details else message
+    except Exception as e:
+        message = f"Erro ao diminuir volume: {str(e)}"
+        return {"success": False, "message": message} if details else message
 
-def mute_volume():
+def mute_volume(muted=True, details=False):
     """
-    Silencia o volume
+    Silencia (ou reativa, com muted=False) o volume. Com teclas de volume,
+    as duas ações alternam o mudo.
     """
     try:
-        import pyautogui
-        pyautogui.press('volumemute')
-        return "Volume silenciado"
-    except:
-        ps_command = """
-        Add-Type -TypeDefinition @"
-        using System;
-        using System.Runtime.InteropServices;
-        public class Audio {
-            [DllImport("user32.dll")]
-            public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
-            public static void Mute() {
-                keybd_event(0xAD, 0, 0, UIntPtr.Zero); // Volume Mute
-                keybd_event(0xAD, 0, 2, UIntPtr.Zero); // Key Up
-            }
-        }
-"@
-        [Audio]::Mute()
-        """
-        subprocess.run(['powershell', '-Command', ps_command], 
-                      capture_output=True, text=True, check=True)
-        return "Volume silenciado"
+        import audio_backend
+        state = audio_backend.set_mute(muted)
+        message = "Volume silenciado" if muted else "Som reativado"
+        return {"success": True, "message": message, **state} if details else message
+    except Exception as e:
+        message = f"Erro ao {'silenciar' if muted else 'reativar'} volume: {str(e)}"
+        return {"success": False, "message": message} if details else message
 
 def get_volume():
     """
-    Obtém o volume atual
+    Obtém o volume atual: {success, level (0-100), muted, backend}. level é
+    None quando só há teclas de volume, que não informam o nível.
     """
     try:
-        ps_command = """
-        Add-Type -TypeDefinition @"
-        using System;
-        using System.Runtime.InteropServices;
-        public class Audio {
-            [DllImport("user32.dll")]
-            public static extern void keybd_event(byte bVk, byte bScan, uint dwFlags, UIntPtr dwExtraInfo);
-            public static void GetVolume() {
-                // Simular tecla de volume para obter feedback
-                keybd_event(0xAF, 0, 0, UIntPtr.Zero);
-                keybd_event(0xAF, 0, 2, UIntPtr.Zero);
-            }
-        }
-"@
-        [Audio]::GetVolume()
-        """
-        subprocess.run(['powershell', '-Command', ps_command], 
-                      capture_output=True, text=True, check=True)
-        return "Volume obtido (verifique o indicador visual)"
+        import audio_backend
+        state = audio_backend.get_state()
+        if state["level"] is None:
+            return {"success": False, "error": "O backend de teclas não informa o nível do volume", **state}
+        return {"success": True, **state}
     except Exception as e:
-        return f"Erro ao obter volume: {str(e)}"
+        return {"success": False, "error": f"Erro ao obter volume: {str(e)}", "level": None}
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python volume_control.py <action> [value]")
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # --json: resultado completo (nível, mudo, backend) em JSON
+    as_json = '--json' in argv
+    argv = [arg for arg in argv if arg != '--json']
+
+    if len(argv) < 1:
+        print("Uso: python volume_control.py <action> [value] [--json]")
         print("Ações: set, up, down, mute, unmute, get")
         sys.exit(1)
-    
-    action = sys.argv[1].lower()
-    value = int(sys.argv[2]) if len(sys.argv) > 2 else None
-    
+
+    action = argv[0].lower()
+
     if action == 'set':
-        if value is None:
+        if len(argv) < 2:
             print("Erro: Valor necessário para 'set'")
             sys.exit(1)
-        result = set_volume(value)
+        try:
+            value = int(argv[1])
+        except ValueError:
+            print(f"Erro: Valor inválido para 'set': {argv[1]} (use um número de 0 a 100)")
+            sys.exit(1)
+        result = set_volume(value, details=as_json)
     elif action == 'up':
-        result = volume_up()
+        result = volume_up(details=as_json)
     elif action == 'down':
-        result = volume_down()
+        result = volume_down(details=as_json)
     elif action == 'mute':
-        result = mute_volume()
+        result = mute_volume(True, details=as_json)
     elif action == 'unmute':
-        result = mute_volume()  # Toggle mute
+        result = mute_volume(False, details=as_json)
     elif action == 'get':
+        # Sempre JSON: o nível numérico é o resultado
         result = get_volume()
+        as_json = True
     else:
         print("Ação inválida. Use: set, up, down, mute, unmute, get")
         sys.exit(1)
-    
-    print(result)
+
+    print(json.dumps(result, ensure_ascii=False) if as_json else result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Snapshot compartilhado das janelas abertas.
+
+Captura título, posição, tamanho, estado (minimizada/maximizada/ativa/visível)
+e o PID do processo dono de todas as janelas em uma única passada e reaproveita o resultado por um TTL
+curto. Qualquer ação que altera janelas (minimizar, restaurar, ativar, fechar)
+deve passar pelas funções deste módulo, que invalidam o snapshot.
+
+O acesso ao sistema de janelas fica atrás de um backend:
+- Win32Backend: API Win32 direta (uma chamada por atributo por janela)
+- PyGetWindowBackend: pygetwindow, lendo cada propriedade uma única vez
+- FakeWindowBackend: janelas em memória, para testes e benchmarks
+
+As funções wait_until_* consultam o estado real da janela em intervalos curtos
+até a condição ser atingida ou o prazo acabar, no lugar de esperas fixas.
+"""
+
+import sys
+import os
+import time
+import threading
+
+from text_index import TextIndex
+
+# Tempo de vida do snapshot em segundos
+DEFAULT_TTL = float(os.environ.get('WINDOW_SNAPSHOT_TTL', '0.5'))
+
+# Intervalo entre consultas de estado e prazo padrão de uma espera (segundos)
+POLL_INTERVAL = 0.02
+WAIT_TIMEOUT = 1.5
+
+# Palavras que identificam a janela do próprio assistente
+ASSISTANT_KEYWORDS = [
+    'assistente', 'ai-assistente', 'electron',
+    'ai assistente', 'assistente ia', 'widget',
+    'ai-assitente'  # Nome do projeto
+]
+
+# Classes de janela do próprio shell do Windows (área de trabalho e barra de
+# tarefas): pertencem ao explorer.exe mas nunca são a janela de um app
+SHELL_WINDOW_CLASSES = {'Progman', 'WorkerW', 'Shell_TrayWnd', 'Shell_SecondaryTrayWnd'}
+
+class Win32Backend:
+    """
+    Enumera janelas com EnumWindows lendo todos os atributos de uma vez;
+    as ações usam o pygetwindow, que já trata as particularidades do foco
+    """
+
+    name = 'win32'
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+
+    def _rect(self, handle):
+        rect = self._wintypes.RECT()
+        self._user32.GetWindowRect(handle, self._ctypes.byref(rect))
+        return rect
+
+    def _class_name(self, handle):
+        buffer = self._ctypes.create_unicode_buffer(256)
+        return buffer.value if self._user32.GetClassNameW(handle, buffer, 256) else None
+
+    def _pid(self, handle):
+        pid = self._wintypes.DWORD()
+        self._user32.GetWindowThreadProcessId(handle, self._ctypes.byref(pid))
+        return pid.value or None
+
+    def enumerate(self):
+        ctypes = self._ctypes
+        user32 = self._user32
+        foreground = user32.GetForegroundWindow()
+        windows = []
+
+        def callback(hwnd, _):
+            # Mesmo critério do pygetwindow: apenas janelas visíveis
+            if not user32.IsWindowVisible(hwnd):
+                return True
+            length = user32.GetWindowTextLengthW(hwnd)
+            title = ''
+            if length > 0:
+                buffer = ctypes.create_unicode_buffer(length + 1)
+                user32.GetWindowTextW(hwnd, buffer, length + 1)
+                title = buffer.value
+            rect = self._rect(hwnd)
+            windows.append({
+                "handle": hwnd,
+                "title": title,
+                "left": rect.left,
+                "top": rect.top,
+                "width": rect.right - rect.left,
+                "height": rect.bottom - rect.top,
+                "isMinimized": bool(user32.IsIconic(hwnd)),
+                "isMaximized": bool(user32.IsZoomed(hwnd)),
+                "isActive": hwnd == foreground,
+                "visible": True,
+                "pid": self._pid(hwnd),
+                "class_name": self._class_name(hwnd),
+            })
+            return True
+
+        proc = ctypes.WINFUNCTYPE(ctypes.c_bool, self._wintypes.HWND, self._wintypes.LPARAM)(callback)
+        user32.EnumWindows(proc, 0)
+        return windows
+
+    def state(self, handle):
+        user32 = self._user32
+        if not user32.IsWindow(handle):
+            raise LookupError(f"Janela {handle} não existe mais")
+        rect = self._rect(handle)
+        return {
+            "isMinimized": bool(user32.IsIconic(handle)),
+            "isActive": user32.GetForegroundWindow() == handle,
+            "visible": bool(user32.IsWindowVisible(handle)),
+            "left": rect.left,
+            "top": rect.top,
+            "width": rect.right - rect.left,
+            "height": rect.bottom - rect.top,
+        }
+
+    def perform(self, handle, action):
+        import pygetwindow as gw
+        return getattr(gw.Win32Window(handle), action)()
+
+
+class PyGetWindowBackend:
+    """
+    Enumera janelas com pygetwindow, lendo cada propriedade uma única vez
+    """
+
+    name = 'pygetwindow'
+
+    def __init__(self):
+        import pygetwindow
+        self._gw = pygetwindow
+        self._objects = {}
+        win32 = Win32Backend() if sys.platform == 'win32' else None
+        self._pid = win32._pid if win32 else (lambda handle: None)
+        self._class_name = win32._class_name if win32 else (lambda handle: None)
+
+    def enumerate(self):
+        windows = []
+        objects = {}
+        for window in self._gw.getAllWindows():
+            handle = getattr(window, '_hWnd', None) or id(window)
+            objects[handle] = window
+            windows.append({
+                "handle": handle,
+                "title": window.title,
+                "left": window.left,
+                "top": window.top,
+                "width": window.width,
+                "height": window.height,
+                "isMinimized": window.isMinimized,
+                "isMaximized": window.isMaximized,
+                "isActive": window.isActive,
+                "visible": getattr(window, 'visible', True),
+                "pid": self._pid(handle) if getattr(window, '_hWnd', None) else None,
+                "class_name": self._class_name(handle) if getattr(window, '_hWnd', None) else None,
+            })
+        # Mantém os objetos antigos: ações podem chegar depois de outra enumeração
+        self._objects.update(objects)
+        return windows
+
+    def state(self, handle):
+        window = self._objects[handle]
+        return {
+            "isMinimized": window.isMinimized,
+            "isActive": window.isActive,
+            "visible": getattr(window, 'visible', True),
+            "left": window.left,
+            "top": window.top,
+            "width": window.width,
+            "height": window.height,
+        }
+
+    def perform(self, handle, action):
+        return getattr(self._objects[handle], action)()
+
+
+class FakeWindowBackend:
+    """
+    Backend em memória. Cada ação só tem efeito depois de `transition_delay`
+    segundos, imitando a animação do sistema, e fica registrada em `actions`.
+    """
+
+    name = 'fake'
+
+    _EFFECTS = {
+        'minimize': {"isMinimized": True, "isActive": False},
+        'restore': {"isMinimized": False},
+        'activate': {"isMinimized": False, "isActive": True},
+    }
+
+    def __init__(self, windows=(), transition_delay=0.0):
+        self.transition_delay = transition_delay
+        self.actions = []
+        self._windows = {}
+        self._pending = []
+        for handle, window in enumerate(windows, 1):
+            entry = {
+                "handle": handle, "title": '', "left": 0, "top": 0, "width": 800, "height": 600,
+                "isMinimized": False, "isMaximized": False, "isActive": False, "visible": True,
+                "pid": None, "class_name": None,
+            }
+            entry.update(window)
+            self._windows[entry["handle"]] = entry
+
+    def _apply_pending(self):
+        now = time.monotonic()
+        remaining = []
+        for ready_at, handle, changes in self._pending:
+            if ready_at > now:
+                remaining.append((ready_at, handle, changes))
+            elif changes is None:
+                self._windows.pop(handle, None)
+            else:
+                if changes.get("isActive"):
+                    for window in self._windows.values():
+                        window["isActive"] = False
+                if handle in self._windows:
+                    self._windows[handle].update(changes)
+        self._pending = remaining
+
+    def enumerate(self):
+        self._apply_pending()
+        return [dict(window) for window in self._windows.values()]
+
+    def state(self, handle):
+        self._apply_pending()
+        if handle not in self._windows:
+            raise LookupError(f"Janela {handle} não existe mais")
+        return dict(self._windows[handle])
+
+    def perform(self, handle, action):
+        if handle not in self._windows:
+            raise LookupError(f"Janela {handle} não existe mais")
+        self.actions.append((action, handle))
+        changes = None if action == 'close' else self._EFFECTS[action]
+        self._pending.append((time.monotonic() + self.transition_delay, handle, changes))
+
+
+_lock = threading.RLock()
+_cache = {"timestamp": 0.0, "windows": None, "index": None}
+_backend = {"current": None}
+
+
+def get_backend():
+    """
+    Backend em uso; escolhido pela plataforma na primeira chamada
+    """
+    with _lock:
+        if _backend["current"] is None:
+            _backend["current"] = Win32Backend() if sys.platform == 'win32' else PyGetWindowBackend()
+        return _backend["current"]
+
+
+def set_backend(backend):
+    """
+    Troca o backend (ex.: FakeWindowBackend em testes) e descarta o snapshot
+    """
+    with _lock:
+        _backend["current"] = backend
+        invalidate()
+
+
+def get_windows(ttl=DEFAULT_TTL):
+    """
+    Retorna o snapshot atual das janelas, capturando um novo se expirou
+    """
+    with _lock:
+        now = time.monotonic()
+        if _cache["windows"] is not None and now - _cache["timestamp"] < ttl:
+            return _cache["windows"]
+
+        windows = get_backend().enumerate()
+
+        _cache["windows"] = windows
+        _cache["index"] = None
+        _cache["timestamp"] = time.monotonic()
+        return windows
+
+
+def invalidate():
+    """
+    Descarta o snapshot; a próxima leitura enumera as janelas de novo
+    """
+    with _lock:
+        _cache["windows"] = None
+        _cache["index"] = None
+
+
+def find_windows(query, limit=5, min_score=0.35, ttl=DEFAULT_TTL):
+    """
+    Busca janelas visíveis pelo título no snapshot atual; retorna
+    [(janela, pontuação)] da mais parecida para a menos parecida.
+    O índice é construído uma única vez por snapshot.
+    """
+    with _lock:
+        windows = get_windows(ttl)
+        index = _cache["index"]
+        if index is None:
+            index = TextIndex([w for w in windows if w["title"] and w["visible"]],
+                              key=lambda w: w["title"])
+            _cache["index"] = index
+
+    return index.search(query, limit=limit, min_score=min_score)
+
+
+def find_assistant_windows(windows):
+    """
+    Filtra as janelas que pertencem ao assistente
+    """
+    return [w for w in windows
+            if w["title"] and any(keyword in w["title"].lower() for keyword in ASSISTANT_KEYWORDS)]
+
+
+def windows_for_pids(pids, windows=None):
+    """
+    Janelas com título dos processos indicados, na ordem de enumeração
+    (de cima para baixo), sem as janelas do assistente e sem a área de
+    trabalho/barra de tarefas (SHELL_WINDOW_CLASSES)
+    """
+    windows = get_windows() if windows is None else windows
+    assistant = {w["handle"] for w in find_assistant_windows(windows)}
+    return [w for w in windows
+            if w.get("pid") in pids and w["title"] and w["visible"] and w["handle"] not in assistant
+            and w.get("class_name") not in SHELL_WINDOW_CLASSES]
+
+
+def get_active_window(windows):
+    """
+    Retorna a janela em primeiro plano do snapshot, se houver
+    """
+    for window in windows:
+        if window["isActive"]:
+            return window
+    return None
+
+
+def get_state(window):
+    """
+    Estado atual de uma janela consultado direto no sistema (sem snapshot)
+    """
+    return get_backend().state(window["handle"])
+
+
+def _mutate(window, action):
+    try:
+        return get_backend().perform(window["handle"], action)
+    finally:
+        invalidate()
+
+
+def minimize(window):
+    """
+    Minimiza a janela e invalida o snapshot
+    """
+    return _mutate(window, 'minimize')
+
+
+def restore(window):
+    """
+    Restaura a janela e invalida o snapshot
+    """
+    return _mutate(window, 'restore')
+
+
+def activate(window):
+    """
+    Traz a janela para o primeiro plano e invalida o snapshot
+    """
+    return _mutate(window, 'activate')
+
+
+def close(window):
+    """
+    Fecha a janela e invalida o snapshot
+    """
+    return _mutate(window, 'close')
+
+
+def wait_for_state(window, predicate, timeout=WAIT_TIMEOUT, interval=POLL_INTERVAL, deadline=None):
+    """
+    Consulta o estado da janela até predicate(estado) ser verdadeiro.
+    deadline (em time.monotonic) limita a operação inteira, somando várias esperas.
+    Retorna (atingiu, segundos esperados).
+    """
+    start = time.monotonic()
+    limit = start + timeout
+    if deadline is not None:
+        limit = min(limit, deadline)
+
+    while True:
+        try:
+            if predicate(get_state(window)):
+                return True, time.monotonic() - start
+        except Exception:
+            # Janela fechada ou inacessível: não há mais o que esperar
+            return False, time.monotonic() - start
+        if time.monotonic() >= limit:
+            return False, time.monotonic() - start
+        time.sleep(interval)
+
+
+def wait_until_minimized(window, **kwargs):
+    """
+    Espera a janela ficar minimizada
+    """
+    return wait_for_state(window, lambda state: state["isMinimized"], **kwargs)
+
+
+def wait_until_restored(window, **kwargs):
+    """
+    Espera a janela sair do estado minimizado
+    """
+    return wait_for_state(window, lambda state: not state["isMinimized"], **kwargs)
+
+
+def wait_until_active(window, **kwargs):
+    """
+    Espera a janela ficar em primeiro plano
+    """
+    return wait_for_state(window, lambda state: state["isActive"] and not state["isMinimized"], **kwargs)
+
+
+def focus(window, deadline=None):
+    """
+    Restaura (se minimizada) e traz a janela para o primeiro plano, esperando
+    cada etapa pelo estado real. Retorna (ficou ativa, {etapa: segundos}).
+    """
+    waits = {}
+    if get_state(window)["isMinimized"]:
+        restore(window)
+        _, waits["restore"] = wait_until_restored(window, deadline=deadline)
+    activate(window)
+    active, waits["activate"] = wait_until_active(window, deadline=deadline)
+    return active, waits
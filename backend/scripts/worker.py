@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Worker Python persistente para os scripts do assistente.
+
+Mantém um único interpretador vivo (com pyautogui, pygetwindow, psutil etc.
+já importados após o primeiro uso) e atende requisições JSON-RPC 2.0, uma por
+linha, via stdin/stdout.
+
+Uso (a partir de backend/):
+    python -m scripts.worker
+
+Métodos:
+    run      {"script": "open_app.py", "args": ["chrome"]}
+             Executa o main() do script e devolve exatamente o que ele
+             imprimiria: {"code": 0, "output": "...", "error": "..."}
+    call     {"function": "focus_window.focus_window", "args": [...], "kwargs": {...}}
+             Chama a função diretamente e devolve o valor de retorno
+    ping     Verifica se o worker está vivo
+    shutdown Encerra o worker
+"""
+
+import sys
+import os
+import io
+import json
+import threading
+import traceback
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPTS_DIR)
+
+# Os scripts se importam pelo nome simples (como quando executados diretamente)
+for _path in (SCRIPTS_DIR, BACKEND_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+# Módulos que o worker pode hospedar: nome do script -> nome do módulo
+MODULES = {
+    'open_app.py': 'open_app',
+    'volume_control.py': 'volume_control',
+    'screenshot.py': 'screenshot',
+    'screenshot_advanced.py': 'screenshot_advanced',
+    'focus_window.py': 'focus_window',
+    'list_windows.py': 'list_windows',
+    'close_window.py': 'close_window',
+    'run_command.py': 'run_command',
+    'voice_recognition.py': 'voice_recognition',
+}
+
+MAX_WORKERS = int(os.environ.get('PYTHON_WORKER_THREADS', '4'))
+
+
+class _ThreadLocalStream(io.TextIOBase):
+    """
+    Stream que redireciona a escrita para um buffer por thread, permitindo
+    capturar o stdout/stderr de cada requisição mesmo com execução concorrente
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def begin(self):
+        self._local.buffer = io.StringIO()
+
+    def end(self):
+        buffer = getattr(self._local, 'buffer', None)
+        self._local.buffer = None
+        return buffer.getvalue() if buffer else ''
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+        return self._fallback.write(text)
+
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self._fallback.flush()
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+
+def resolve_module(name):
+    """
+    Importa (uma única vez) o módulo de um script pelo nome do arquivo ou módulo
+    """
+    module_name = MODULES.get(name, name)
+    if module_name not in MODULES.values():
+        raise ValueError(f"Script '{name}' não é hospedado pelo worker")
+    return importlib.import_module(module_name)
+
+
+def run_script(stdout, stderr, script, args=None):
+    """
+    Executa o main() de um script capturando a saída, como um processo novo faria
+    """
+    module = resolve_module(os.path.basename(script))
+    argv = ['' if arg is None else str(arg) for arg in (args or [])]
+
+    code = 0
+    stdout.begin()
+    stderr.begin()
+    try:
+        module.main(argv)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        code = 1
+        traceback.print_exc(file=sys.stderr)
+    finally:
+        output = stdout.end()
+        error = stderr.end()
+
+    return {"code": code, "output": output, "error": error}
+
+
+def call_function(function, args=None, kwargs=None):
+    """
+    Chama uma função 'modulo.funcao' de um script hospedado
+    """
+    module_name, _, function_name = function.rpartition('.')
+    if not module_name or function_name.startswith('_'):
+        raise ValueError(f"Função '{function}' inválida")
+    module = resolve_module(module_name)
+    target = getattr(module, function_name, None)
+    if not callable(target):
+        raise ValueError(f"Função '{function}' não encontrada")
+    return target(*(args or []), **(kwargs or {}))
+
+
+def serve(stdin=None, stdout=None):
+    """
+    Loop principal: lê requisições JSON por linha e responde na mesma ordem de conclusão
+    """
+    stdin = stdin or io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+    protocol_out = stdout or io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+
+    # Tudo o que os scripts imprimirem vai para buffers por requisição,
+    # nunca para o canal do protocolo
+    captured_stdout = _ThreadLocalStream(sys.stderr)
+    captured_stderr = _ThreadLocalStream(sys.stderr)
+    sys.stdout = captured_stdout
+    sys.stderr = captured_stderr
+
+    write_lock = threading.Lock()
+
+    def respond(message):
+        line = json.dumps(message, ensure_ascii=False, default=str)
+        with write_lock:
+            protocol_out.write(line + '\n')
+            protocol_out.flush()
+
+    def handle(request):
+        request_id = request.get('id')
+        method = request.get('method')
+        params = request.get('params') or {}
+        try:
+            if method == 'run':
+                result = run_script(captured_stdout, captured_stderr,
+                                    params['script'], params.get('args'))
+            elif method == 'call':
+                captured_stdout.begin()
+                try:
+                    result = call_function(params['function'], params.get('args'), params.get('kwargs'))
+                finally:
+                    captured_stdout.end()
+            elif method == 'ping':
+                result = {"pid": os.getpid(), "modules": sorted(m for m in MODULES.values() if m in sys.modules)}
+            else:
+                raise ValueError(f"Método '{method}' não reconhecido")
+            respond({"jsonrpc": "2.0", "id": request_id, "result": result})
+        except Exception as e:
+            respond({"jsonrpc": "2.0", "id": request_id,
+                     "error": {"code": -32000, "message": str(e)}})
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                respond({"jsonrpc": "2.0", "id": None,
+                         "error": {"code": -32700, "message": f"JSON inválido: {e}"}})
+                continue
+
+            if request.get('method') == 'shutdown':
+                respond({"jsonrpc": "2.0", "id": request.get('id'), "result": {"stopping": True}})
+                break
+
+            executor.submit(handle, request)
+
+    sys.stdout = sys.__stdout__
+    sys.stderr = sys.__stderr__
+
+
+if __name__ == "__main__":
+    serve()
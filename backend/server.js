@@ -15,7 +15,8 @@ const PORT = process.env.PORT || 3001;
 
 // Middleware
 app.use(cors());
-app.use(express.json());
+// Limite maior para imagens enviadas em base64 (ex.: /api/ai/analyze-image)
+app.use(express.json({ limit: '25mb' }));
 
 // Importar rotas
 const aiRoutes = require('./routes/ai');
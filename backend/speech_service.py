@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serviço persistente de reconhecimento de voz.
+
+Mantém o Recognizer e o microfone abertos entre pedidos. A calibração de
+ruído ambiente fica guardada em config/.voice_calibration.json e só é
+refeita quando o nível do ambiente muda (DRIFT_RATIO), verificado em
+segundo plano enquanto o serviço está ocioso.
+
+Protocolo: um comando JSON por linha no stdin e um evento JSON por linha no
+stdout (NDJSON):
+    {"cmd": "listen", "id": 1, "duration": 5}          microfone
+    {"cmd": "listen", "id": 2, "wav": "fala.wav"}       arquivo WAV
+    {"cmd": "cancel", "id": 1}                           abandona o pedido 1
+    {"cmd": "calibrate"} / {"cmd": "ping"} / {"cmd": "shutdown"}
+
+listen e calibrate rodam em ordem numa thread de pedidos; ping, cancel e
+shutdown são atendidos na hora, mesmo com uma escuta em andamento. Sem
+"timeout", a espera pelo início da fala é a própria duração, para uma
+escuta sem fala não prender o microfone indefinidamente. O caminho em "wav"
+é lido como vem: o protocolo é só para o processo que iniciou o serviço.
+
+Eventos: ready, calibrated, listening, phrase-detected, transcript, error, pong.
+
+O fim da frase vem do VAD (vad.py) por padrão; VOICE_ENDPOINTING=energy volta
+ao limiar de energia do SpeechRecognition.
+
+Uso:
+    python speech_service.py [--wav arquivo.wav] [--no-monitor] [--recognizer nome]
+"""
+
+import sys
+import os
+import io
+import json
+import math
+import time
+import array
+import queue
+import threading
+
+import voice_recognition
+
+CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', '.voice_calibration.json')
+
+# Calibração guardada vale por este tempo (segundos)
+CALIBRATION_MAX_AGE = 24 * 60 * 60
+
+# Duração da calibração completa e da amostra de verificação (segundos)
+CALIBRATION_DURATION = 1.0
+SAMPLE_DURATION = 0.25
+
+# Variação do ruído ambiente (para mais ou para menos) que dispara recalibração
+DRIFT_RATIO = 0.5
+
+# Intervalo entre verificações do ruído ambiente com o serviço ocioso
+MONITOR_INTERVAL = float(os.environ.get('VOICE_MONITOR_INTERVAL', '10'))
+
+# No shutdown, espera (s) pela escuta em andamento antes de sair sem ela
+SHUTDOWN_TIMEOUT = 1.0
+
+
+def rms(frames, sample_width=2):
+    """
+    Energia RMS de amostras PCM de 16 bits (sem audioop, removido no Python 3.13)
+    """
+    if sample_width != 2 or not frames:
+        return 0.0
+    samples = array.array('h', frames[:len(frames) - len(frames) % 2])
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+
+def load_calibration(path=CALIBRATION_PATH):
+    """
+    Calibração guardada, se existir e ainda for recente
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            calibration = json.load(f)
+        if time.time() - calibration["timestamp"] < CALIBRATION_MAX_AGE:
+            return calibration
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def save_calibration(calibration, path=CALIBRATION_PATH):
+    """
+    Grava a calibração de forma atômica
+    """
+    try:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(calibration, f)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+class SpeechService:
+    """
+    Reconhecedor de longa duração; eventos vão para emit(dict)
+    """
+
+    def __init__(self, emit, wav=None, monitor=True, engine=None):
+        import speech_recognition as sr
+        import recognizers
+
+        self.sr = sr
+        self.recognizers = recognizers
+        self.engine = engine or recognizers.get_recognizer()
+        self.emit = emit
+        self.wav = wav
+        self.recognizer = sr.Recognizer()
+        self.source = None
+        self.ambient = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        # Pedido em andamento e pedidos cancelados antes de começar
+        self.requests_lock = threading.Lock()
+        self.current_id = None
+        self.cancel_event = threading.Event()
+        self.cancelled = set()
+        self.monitor_thread = None
+        self.monitor = monitor
+        self.endpointing = voice_recognition.ENDPOINTING
+        self.preprocess = voice_recognition.PREPROCESS
+
+    # Fonte de áudio
+
+    def open(self):
+        """
+        Abre o microfone uma única vez e aplica a calibração guardada
+        """
+        if self.wav is None and self.source is None:
+            self.source = self.sr.Microphone()
+            self.source.__enter__()
+
+        calibration = load_calibration()
+        if calibration:
+            self.recognizer.energy_threshold = calibration["energy_threshold"]
+            self.ambient = calibration["ambient"]
+            self.emit({"event": "calibrated", "energy_threshold": self.recognizer.energy_threshold,
+                       "ambient": self.ambient, "cached": True})
+            # Uma amostra curta confirma se o ambiente ainda é o mesmo
+            if self.source is not None:
+                self.check_drift()
+        elif self.source is not None:
+            self.calibrate()
+
+        if self.monitor and self.source is not None:
+            self.monitor_thread = threading.Thread(target=self._monitor, name='voice-monitor', daemon=True)
+            self.monitor_thread.start()
+
+    def close(self):
+        self.stopped.set()
+        if self.source is not None:
+            with self.lock:
+                self.source.__exit__(None, None, None)
+                self.source = None
+
+    def _sample(self, source, duration):
+        chunks = int(math.ceil(duration * source.SAMPLE_RATE / source.CHUNK))
+        return rms(b''.join(source.stream.read(source.CHUNK) for _ in range(chunks)), source.SAMPLE_WIDTH)
+
+    # Calibração
+
+    def calibrate(self, source=None, duration=CALIBRATION_DURATION):
+        """
+        Calibração completa do limiar de energia
+        """
+        with self.lock:
+            source = source or self.source
+            start = time.perf_counter()
+            self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+            self.ambient = self.recognizer.energy_threshold / self.recognizer.dynamic_energy_ratio
+            elapsed = (time.perf_counter() - start) * 1000
+        save_calibration({"energy_threshold": self.recognizer.energy_threshold,
+                          "ambient": self.ambient, "timestamp": time.time()})
+        self.emit({"event": "calibrated", "energy_threshold": round(self.recognizer.energy_threshold, 1),
+                   "ambient": round(self.ambient, 1), "cached": False, "elapsed_ms": round(elapsed, 1)})
+
+    def check_drift(self):
+        """
+        Mede o ruído atual e recalibra apenas se mudou além de DRIFT_RATIO
+        """
+        if self.source is None:
+            return False
+        with self.lock:
+            level = self._sample(self.source, SAMPLE_DURATION)
+        baseline = max(self.ambient or 0.0, 1.0)
+        if abs(level - baseline) / baseline > DRIFT_RATIO:
+            self.calibrate()
+            return True
+        return False
+
+    def _monitor(self):
+        while not self.stopped.wait(MONITOR_INTERVAL):
+            try:
+                self.check_drift()
+            except Exception as e:
+                self.emit({"event": "error", "error": f"Erro ao verificar ruído ambiente: {e}"})
+
+    # Reconhecimento
+
+    def transcribe(self, audio, timings=None):
+        """
+        Converte o áudio capturado em texto com o reconhecedor configurado
+        """
+        return self.recognizers.transcribe(self.recognizer, self.engine, audio, timings)
+
+    def cancel(self, request_id):
+        """
+        Interrompe a escuta do pedido (ou a descarta, se ainda não começou)
+        """
+        with self.requests_lock:
+            if request_id == self.current_id:
+                self.cancel_event.set()
+            else:
+                self.cancelled.add(request_id)
+
+    def _capture(self, source, duration, timeout):
+        """
+        Escuta uma frase; com VAD (vad.py) o ruído de fundo parte da calibração
+        do serviço e a escuta termina assim que o falante para.
+        Retorna (AudioData, info do VAD ou None).
+        """
+        if self.endpointing == 'vad' and source.SAMPLE_WIDTH == 2:
+            try:
+                import vad
+            except ImportError:
+                vad = None
+            if vad is not None:
+                detector = vad.VoiceActivityDetector(max_length_s=duration, noise_floor=self.ambient)
+                return vad.listen(source, detector, timeout=timeout, cancel=self.cancel_event)
+        return self.recognizer.listen(source, timeout=timeout, phrase_time_limit=duration), None
+
+    def listen(self, request_id=None, duration=5, wav=None, timeout=None):
+        """
+        Escuta uma frase (microfone ou WAV) e emite os eventos até a transcrição.
+        wav pode ser um caminho ou um arquivo aberto (stream). timeout (espera
+        pelo início da fala) vale duration quando não é informado.
+        """
+        sr = self.sr
+        wav = wav or self.wav
+        timeout = duration if timeout is None else timeout
+        result = {"event": "transcript", "id": request_id, "duration": duration}
+        with self.requests_lock:
+            if request_id in self.cancelled:
+                self.cancelled.discard(request_id)
+                result.update(success=False, cancelled=True, error="Escuta cancelada")
+                self.emit(result)
+                return result
+            self.current_id = request_id
+            self.cancel_event.clear()
+        try:
+            start = time.perf_counter()
+            endpoint = None
+            if wav is not None:
+                with sr.AudioFile(wav) as source:
+                    self.emit({"event": "listening", "id": request_id, "source": "wav"})
+                    audio, endpoint = self._capture(source, duration, timeout)
+            else:
+                with self.lock:
+                    self.emit({"event": "listening", "id": request_id, "source": "microphone"})
+                    audio, endpoint = self._capture(self.source, duration, timeout)
+
+            phrase_seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            self.emit({"event": "phrase-detected", "id": request_id,
+                       "audio_s": round(phrase_seconds, 2),
+                       "endpointing": "vad" if endpoint else "energy",
+                       "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+            timings = {"capture_ms": round((time.perf_counter() - start) * 1000, 2)}
+            payload = None
+            if self.preprocess:
+                audio, payload = voice_recognition.prepare_audio(audio, timings)
+            try:
+                result.update(success=True, text=self.transcribe(audio, timings))
+            except sr.UnknownValueError:
+                result.update(success=True, text="", error="Não foi possível entender o áudio")
+            except sr.RequestError as e:
+                result.update(success=False, error=f"Erro no serviço de reconhecimento: {e}")
+            if endpoint:
+                timings["end_of_speech_ms"] = round(
+                    endpoint["hangover_ms"] + (time.perf_counter() - endpoint["detected_at"]) * 1000, 2)
+            result["timings"] = timings
+            if payload is not None:
+                result["payload"] = voice_recognition.payload_report(audio, payload)
+        except sr.WaitTimeoutError:
+            result.update(success=True, text="", error="Nenhuma fala detectada")
+        except Exception as e:
+            if self.cancel_event.is_set():
+                # vad.ListenCancelled: o cliente desistiu do pedido
+                result.update(success=False, cancelled=True, error="Escuta cancelada")
+            else:
+                result.update(success=False, error=f"Erro geral: {e}")
+        finally:
+            with self.requests_lock:
+                self.current_id = None
+
+        self.emit(result)
+        return result
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    wav = None
+    monitor = True
+    for position, arg in enumerate(argv):
+        if arg == '--wav' and position + 1 < len(argv):
+            wav = argv[position + 1]
+        elif arg == '--no-monitor':
+            monitor = False
+        elif arg == '--recognizer' and position + 1 < len(argv):
+            os.environ['VOICE_RECOGNIZER'] = argv[position + 1]
+
+    if hasattr(sys.stdout, 'buffer'):
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+    write_lock = threading.Lock()
+
+    def emit(event):
+        with write_lock:
+            sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+
+    try:
+        service = SpeechService(emit, wav=wav, monitor=monitor)
+        service.open()
+    except Exception as e:
+        emit({"event": "error", "error": f"Erro ao iniciar reconhecimento: {e}"})
+        sys.exit(1)
+
+    emit({"event": "ready", "source": "wav" if wav else "microphone"})
+
+    # Escuta e calibração bloqueiam o microfone: rodam numa thread própria
+    requests = queue.Queue()
+
+    def work():
+        while True:
+            command = requests.get()
+            if command is None:
+                return
+            try:
+                if command["cmd"] == "listen":
+                    service.listen(command.get("id"), command.get("duration", 5),
+                                   command.get("wav"), command.get("timeout"))
+                elif service.source is not None:
+                    service.calibrate()
+            except Exception as e:
+                emit({"event": "error", "id": command.get("id"), "error": f"Erro no comando '{command['cmd']}': {e}"})
+
+    worker = threading.Thread(target=work, name='voice-requests', daemon=True)
+    worker.start()
+
+    try:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                command = json.loads(line)
+            except ValueError:
+                emit({"event": "error", "error": "Comando inválido"})
+                continue
+
+            action = command.get("cmd")
+            if action in ("listen", "calibrate"):
+                requests.put(command)
+            elif action == "cancel":
+                service.cancel(command.get("id"))
+            elif action == "ping":
+                emit({"event": "pong", "id": command.get("id"), "pending": requests.qsize()})
+            elif action == "shutdown":
+                break
+            else:
+                emit({"event": "error", "id": command.get("id"), "error": f"Comando '{action}' não reconhecido"})
+    finally:
+        # Pedidos na fila são descartados; uma escuta em andamento segura o
+        # microfone, então só fecha a fonte se ela terminar a tempo
+        while True:
+            try:
+                requests.get_nowait()
+            except queue.Empty:
+                break
+        requests.put(None)
+        worker.join(SHUTDOWN_TIMEOUT)
+        if worker.is_alive():
+            service.stopped.set()
+        else:
+            service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Busca de aplicativos (app_index.find_apps) e escolha do app a abrir
+(open_app.find_app) com uma configuração pequena em memória.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import app_index
+import open_app
+
+CONFIG = {"apps": {
+    "notepad": {"name": "Bloco de Notas", "command": "notepad", "keywords": ["notepad", "editor"]},
+    "notion": {"name": "Notion", "command": "notion", "keywords": ["notas", "documentos"]},
+    "cam": {"name": "Câmera", "command": "microsoft.windows.camera:", "keywords": ["webcam"]},
+    "chrome": {"name": "Google Chrome", "command": "chrome", "keywords": ["chrome", "navegador"]},
+}}
+
+
+def best(query):
+    matches = app_index.find_apps(query, limit=1, data=app_index.build_index(CONFIG))
+    return (matches[0]["id"], matches[0]["match"]) if matches else None
+
+
+class FindAppsTest(unittest.TestCase):
+
+    def test_exact_ignores_case_only(self):
+        self.assertEqual(best('Bloco de Notas'), ('notepad', 'exact'))
+        self.assertEqual(best('CHROME'), ('chrome', 'exact'))
+
+    def test_accents_are_folded_not_exact(self):
+        self.assertEqual(best('camera'), ('cam', 'folded'))
+
+    def test_punctuation_is_not_an_exact_match(self):
+        matches = app_index.find_apps('notepad++', data=app_index.build_index(CONFIG))
+        self.assertEqual(matches[0]["id"], 'notepad')
+        self.assertEqual(matches[0]["match"], 'fuzzy')
+        self.assertLessEqual(matches[0]["score"], app_index.PUNCTUATION_SCORE)
+
+
+class FindAppTest(unittest.TestCase):
+
+    def test_punctuation_variant_is_not_launched(self):
+        self.assertIsNone(open_app.find_app('notepad++', CONFIG))
+
+    def test_weak_fuzzy_match_is_not_launched(self):
+        # "notas" está contido na busca, mas não é o app pedido
+        self.assertIsNone(open_app.find_app('caderno de notas', CONFIG))
+
+    def test_exact_and_prefix_matches_are_launched(self):
+        self.assertEqual(open_app.find_app('bloco de notas', CONFIG)["id"], 'notepad')
+        self.assertEqual(open_app.find_app('navega', CONFIG)["id"], 'chrome')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Preparação do áudio antes do reconhecimento (audio_preprocessing): recorte
+do silêncio, conversão para 16 bits, reamostragem e FLAC em segundo plano.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+    import speech_recognition as sr
+    import audio_preprocessing
+except ImportError:
+    audio_preprocessing = None
+
+
+def tone(seconds, rate, amplitude=8000, frequency=440):
+    return (amplitude * np.sin(2 * np.pi * frequency * np.arange(int(seconds * rate)) / rate)).astype(np.int16)
+
+
+@unittest.skipIf(audio_preprocessing is None, 'numpy ou SpeechRecognition não instalados')
+class ResampleTest(unittest.TestCase):
+
+    def test_44100_to_16000_keeps_duration(self):
+        samples, rate = audio_preprocessing.resample(tone(2.0, 44100), 44100)
+        self.assertEqual(rate, 16000)
+        self.assertEqual(len(samples), 32000)
+        self.assertEqual(samples.dtype, np.int16)
+
+    def test_integer_factor_averages_groups(self):
+        samples, rate = audio_preprocessing.resample(np.array([0, 2, 4, 6, 8, 10], dtype=np.int16), 48000)
+        self.assertEqual(rate, 16000)
+        self.assertEqual(samples.tolist(), [2, 8])
+
+    def test_never_upsamples(self):
+        original = tone(0.1, 8000)
+        samples, rate = audio_preprocessing.resample(original, 8000)
+        self.assertEqual(rate, 8000)
+        self.assertIs(samples, original)
+
+
+@unittest.skipIf(audio_preprocessing is None, 'numpy ou SpeechRecognition não instalados')
+class ToInt16Test(unittest.TestCase):
+
+    def test_widths(self):
+        self.assertEqual(audio_preprocessing.to_int16(bytes([0, 128, 255]), 1).tolist(), [-32768, 0, 32512])
+        self.assertEqual(audio_preprocessing.to_int16(b'\x00\x00\x80', 3).tolist(), [-32768])
+        self.assertEqual(audio_preprocessing.to_int16(b'\x00\x00\xff\x7f', 4).tolist(), [32767])
+        with self.assertRaises(ValueError):
+            audio_preprocessing.to_int16(b'\x00' * 5, 5)
+
+
+@unittest.skipIf(audio_preprocessing is None, 'numpy ou SpeechRecognition não instalados')
+class TrimSilenceTest(unittest.TestCase):
+
+    def test_keeps_margin_around_speech(self):
+        rate = 16000
+        samples = np.concatenate((np.zeros(rate), tone(0.5, rate), np.zeros(rate))).astype(np.int16)
+        trimmed = audio_preprocessing.trim_silence(samples, rate)
+        margin = int(rate * audio_preprocessing.TRIM_MARGIN_MS / 1000)
+        frame = int(rate * 30 / 1000)
+        # Fala entre as amostras 16000 e 24000: recorte em quadros inteiros mais a margem
+        start = 16000 // frame * frame - margin
+        end = -(-24000 // frame) * frame + margin
+        self.assertTrue(np.array_equal(trimmed, samples[start:end]))
+
+    def test_all_silence_is_returned_untouched(self):
+        samples = np.zeros(16000, dtype=np.int16)
+        self.assertIs(audio_preprocessing.trim_silence(samples, 16000), samples)
+
+
+@unittest.skipIf(audio_preprocessing is None, 'numpy ou SpeechRecognition não instalados')
+class PrepareTest(unittest.TestCase):
+
+    def test_prepared_flac_matches_speech_recognition(self):
+        audio = sr.AudioData(tone(1.0, 44100).astype('<i2').tobytes(), 44100, 2)
+        prepared, info = audio_preprocessing.prepare(audio, trim=False)
+        self.assertEqual((prepared.sample_rate, info["sample_rate"]), (16000, 16000))
+        self.assertEqual(info["bytes_pcm"], 32000)
+
+        reference = sr.AudioData(prepared.frame_data, prepared.sample_rate, prepared.sample_width)
+        self.assertEqual(prepared.get_flac_data(), reference.get_flac_data())
+        info = audio_preprocessing.finish(prepared, info)
+        self.assertEqual(info["bytes_after"], len(reference.get_flac_data()))
+        self.assertIsNotNone(info["encode_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
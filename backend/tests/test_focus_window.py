@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Foco de janela (focus_window) com janelas simuladas (FakeWindowBackend):
+as esperas acompanham o estado real da janela, sem pausas fixas.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import focus_window
+import window_snapshot
+
+
+class FocusWindowTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = window_snapshot.FakeWindowBackend([
+            {"title": "Relatório - Bloco de Notas", "isMinimized": True},
+            {"title": "Calculadora", "isActive": True},
+        ], transition_delay=0.05)
+        window_snapshot.set_backend(self.backend)
+
+    def tearDown(self):
+        window_snapshot.set_backend(None)
+
+    def test_restores_and_activates_minimized_window(self):
+        start = time.monotonic()
+        result = focus_window.focus_window('bloco de notas')
+        elapsed = time.monotonic() - start
+        self.assertTrue(result["success"])
+        self.assertEqual([action for action, _ in self.backend.actions], ['restore', 'activate'])
+        self.assertEqual(set(result["waits"]), {'restore', 'activate'})
+        # Antes eram 0,5 s + 0,3 s fixos
+        self.assertLess(elapsed, 0.5)
+
+    def test_visible_window_is_only_activated(self):
+        result = focus_window.focus_window('calculadora')
+        self.assertTrue(result["success"])
+        self.assertEqual([action for action, _ in self.backend.actions], ['activate'])
+
+    def test_window_that_never_activates_is_reported(self):
+        focus_window.FOCUS_DEADLINE, deadline = 0.1, focus_window.FOCUS_DEADLINE
+        self.backend._EFFECTS = dict(self.backend._EFFECTS, activate={})
+        try:
+            result = focus_window.focus_window('bloco de notas')
+        finally:
+            focus_window.FOCUS_DEADLINE = deadline
+        self.assertFalse(result["success"])
+        self.assertIn("error", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Foco de uma instância já aberta (open_app.focus_running_instance) com
+janelas e processos simulados (FakeWindowBackend e uma fonte de processos
+em memória).
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import open_app
+import process_index
+import window_snapshot
+
+
+class MemorySource:
+    """
+    Tabela de processos fixa no formato de process_index.PsutilSource
+    """
+
+    def __init__(self, processes):
+        self.processes = {info["pid"]: dict(info, create_time=1.0) for info in processes}
+
+    def pids(self):
+        return list(self.processes)
+
+    def create_time(self, pid):
+        return self.processes[pid]["create_time"] if pid in self.processes else None
+
+    def inspect(self, pid):
+        return dict(self.processes[pid]) if pid in self.processes else None
+
+
+class FocusRunningInstanceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_index = process_index._index
+        process_index._index = process_index.ProcessIndex(source=MemorySource([
+            {"pid": 10, "name": "explorer.exe", "exe": r"C:\Windows\explorer.exe"},
+            {"pid": 20, "name": "notepad.exe", "exe": r"C:\Windows\notepad.exe"},
+        ]), refresh_interval=0)
+        self.backend = window_snapshot.FakeWindowBackend([
+            {"title": "Program Manager", "pid": 10, "class_name": "Progman"},
+            {"title": "Sem título - Bloco de Notas", "pid": 20, "class_name": "Notepad", "isMinimized": True},
+        ])
+        window_snapshot.set_backend(self.backend)
+
+    def tearDown(self):
+        process_index._index = self.previous_index
+        window_snapshot.set_backend(None)
+
+    def test_focuses_and_restores_app_window(self):
+        result = open_app.focus_running_instance({'notepad'}, 'Bloco de Notas')
+        self.assertIsNotNone(result)
+        self.assertEqual(result["pid"], 20)
+        self.assertEqual([action for action, _ in self.backend.actions], ['restore', 'activate'])
+
+    def test_shell_executables_are_never_focused(self):
+        self.assertIsNone(open_app.focus_running_instance({'explorer'}, 'Explorador de Arquivos'))
+        self.assertEqual(self.backend.actions, [])
+
+    def test_desktop_window_is_not_an_app_window(self):
+        windows = window_snapshot.windows_for_pids({10, 20})
+        self.assertEqual([window["pid"] for window in windows], [20])
+
+
+if __name__ == "__main__":
+    unittest.main()
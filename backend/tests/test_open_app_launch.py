@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estatísticas das tentativas de abertura (open_app.launch_application) com
+métodos e processos simulados: métodos indisponíveis não contam e os de
+teclado só contam sucesso quando um processo novo do app aparece.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import launch_stats
+import open_app
+import process_index
+import window_snapshot
+from test_open_app_focus import MemorySource
+
+
+class LaunchStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.source = MemorySource([])
+        self.previous = (process_index._index, open_app.LAUNCH_METHODS, open_app.LAUNCH_CONFIRM_TIMEOUT,
+                         launch_stats.record_attempt, launch_stats.order_methods)
+        process_index._index = process_index.ProcessIndex(source=self.source, refresh_interval=0)
+        window_snapshot.set_backend(window_snapshot.FakeWindowBackend([]))
+        open_app.LAUNCH_CONFIRM_TIMEOUT = 0.2
+        self.recorded = []
+        launch_stats.record_attempt = lambda app_id, method, success, elapsed_ms: \
+            self.recorded.append((method, success))
+        launch_stats.order_methods = lambda app_id, methods: methods
+
+    def tearDown(self):
+        (process_index._index, open_app.LAUNCH_METHODS, open_app.LAUNCH_CONFIRM_TIMEOUT,
+         launch_stats.record_attempt, launch_stats.order_methods) = self.previous
+        window_snapshot.set_backend(None)
+
+    def start_notepad(self, app_info, app_name):
+        self.source.processes[42] = {"pid": 42, "name": "notepad.exe", "exe": "notepad.exe", "create_time": 1.0}
+        return "aberto"
+
+    def unavailable(self, app_info, app_name):
+        raise open_app.MethodUnavailable("pyautogui indisponível")
+
+    def test_unavailable_method_is_not_recorded(self):
+        open_app.LAUNCH_METHODS = {'command': lambda *args: None, 'run_dialog': self.unavailable,
+                                   'start_menu': self.start_notepad}
+        result = open_app.launch_application('notepad')
+        self.assertEqual((result["method"], result["verified"]), ('start_menu', True))
+        self.assertEqual(self.recorded, [('command', False), ('start_menu', True)])
+
+    def test_keystrokes_without_new_process_count_as_failure(self):
+        open_app.LAUNCH_METHODS = {'run_dialog': lambda *args: "aberto", 'path': lambda *args: "aberto"}
+        result = open_app.launch_application('notepad')
+        self.assertEqual(result["method"], 'path')
+        self.assertEqual(self.recorded, [('run_dialog', False), ('path', True)])
+
+    def test_unverifiable_launch_is_not_recorded(self):
+        app_processes = open_app.app_processes
+        open_app.app_processes = lambda names: None
+        try:
+            open_app.LAUNCH_METHODS = {'start_menu': lambda *args: "aberto"}
+            result = open_app.launch_application('notepad')
+        finally:
+            open_app.app_processes = app_processes
+        self.assertEqual((result["method"], result["verified"]), ('start_menu', False))
+        self.assertEqual(self.recorded, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
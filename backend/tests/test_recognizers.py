@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reconhecedores intercambiáveis (recognizers): escolha pelo nome ou por
+VOICE_RECOGNIZER, o substituto local e o HttpRecognizer contra um servidor
+http.server local no formato da API Web Speech.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import speech_recognition as sr
+except ImportError:
+    sr = None
+
+import recognizers
+
+
+class GetRecognizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = os.environ.pop('VOICE_RECOGNIZER', None)
+
+    def tearDown(self):
+        os.environ.pop('VOICE_RECOGNIZER', None)
+        if self.previous is not None:
+            os.environ['VOICE_RECOGNIZER'] = self.previous
+
+    def test_default_is_google(self):
+        self.assertIsInstance(recognizers.get_recognizer(), recognizers.GoogleRecognizer)
+
+    def test_by_name_with_options(self):
+        engine = recognizers.get_recognizer('stand-in', latency=0.5)
+        self.assertIsInstance(engine, recognizers.StandInRecognizer)
+        self.assertEqual(engine.latency, 0.5)
+
+    def test_environment_variable(self):
+        os.environ['VOICE_RECOGNIZER'] = 'http'
+        self.assertIsInstance(recognizers.get_recognizer(), recognizers.HttpRecognizer)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            recognizers.get_recognizer('whisper-xyz')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Responde como a API Web Speech; o caminho escolhe a resposta
+    """
+
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        StubHandler.requests.append({"path": self.path, "content_type": self.headers['Content-Type'],
+                                     "body": body})
+        if self.path.startswith('/error'):
+            self.send_error(500)
+            return
+        if self.path.startswith('/empty'):
+            lines = [json.dumps({"result": []})]
+        else:
+            lines = [json.dumps({"result": []}),
+                     json.dumps({"result": [{"alternative": [{"transcript": "abrir o navegador"}]}]})]
+        payload = '\n'.join(lines).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(sr is None, 'SpeechRecognition não instalado')
+class HttpRecognizerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubHandler.requests = []
+        self.audio = sr.AudioData(b'\x00\x01' * 1600, 16000, 2)
+
+    def recognize(self, path):
+        engine = recognizers.HttpRecognizer(url=f"{self.base}{path}", timeout=5)
+        return recognizers.transcribe(sr.Recognizer(), engine, self.audio)
+
+    def test_request_and_transcript(self):
+        self.assertEqual(self.recognize('/recognize'), "abrir o navegador")
+        request = StubHandler.requests[0]
+        self.assertEqual(request["path"], '/recognize?lang=pt-BR')
+        self.assertEqual(request["content_type"], 'audio/x-flac; rate=16000')
+        self.assertTrue(request["body"].startswith(b'fLaC'))
+
+    def test_empty_result_is_unknown_value(self):
+        with self.assertRaises(sr.UnknownValueError):
+            self.recognize('/empty')
+
+    def test_server_error_is_request_error(self):
+        with self.assertRaises(sr.RequestError):
+            self.recognize('/error')
+
+    def test_unreachable_server_is_request_error(self):
+        engine = recognizers.HttpRecognizer(url='http://127.0.0.1:9/recognize', timeout=2)
+        with self.assertRaises(sr.RequestError):
+            engine.recognize(None, engine.encode(self.audio))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Encerramento de comandos que expiram (run_command.kill_tree) no POSIX.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import run_command
+
+
+@unittest.skipIf(sys.platform == 'win32', 'sinais POSIX')
+class KillTreeTest(unittest.TestCase):
+
+    def test_process_ignoring_sigterm_is_killed(self):
+        start = time.monotonic()
+        result = run_command.run_batch_item(0, "trap '' TERM; sleep 30", timeout=0.3)
+        self.assertEqual(result["status"], 'timeout')
+        self.assertLess(time.monotonic() - start, run_command.KILL_GRACE * 5)
+
+    def test_stream_timeout_kills_children(self):
+        start = time.monotonic()
+        summary = run_command.stream_command("sleep 30 & sleep 30", timeout=0.3)
+        self.assertTrue(summary["timed_out"])
+        self.assertIsNotNone(summary["code"])
+        self.assertLess(time.monotonic() - start, run_command.KILL_GRACE * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capturas de janela (screenshot_advanced) com janelas simuladas
+(FakeWindowBackend) e um pyautogui falso que devolve imagens em branco.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+import screenshot_advanced
+import window_snapshot
+
+
+@unittest.skipIf(Image is None, 'Pillow não instalado')
+class ScreenshotTestCase(unittest.TestCase):
+
+    windows = [
+        {"title": "Relatório - Bloco de Notas", "isMinimized": True},
+        {"title": "Calculadora"},
+    ]
+
+    def setUp(self):
+        self.grabs = []
+        fake = types.ModuleType('pyautogui')
+
+        def screenshot(region=None):
+            self.grabs.append(region)
+            return Image.new('RGB', (region[2], region[3]) if region else (320, 200), 'white')
+
+        fake.screenshot = screenshot
+        self.previous = sys.modules.get('pyautogui')
+        sys.modules['pyautogui'] = fake
+        self.backend = window_snapshot.FakeWindowBackend(self.windows)
+        window_snapshot.set_backend(self.backend)
+
+    def tearDown(self):
+        if self.previous is None:
+            sys.modules.pop('pyautogui', None)
+        else:
+            sys.modules['pyautogui'] = self.previous
+        window_snapshot.set_backend(None)
+
+
+class BatchTest(ScreenshotTestCase):
+
+    def test_repeated_titles_are_captured_once(self):
+        result = screenshot_advanced.take_screenshots_batch(
+            ['calculadora', 'bloco de notas', 'Calculadora', 'calculadora'],
+            exclude_assistant=False, output='stdout')
+        self.assertTrue(result["success"])
+        self.assertEqual(len(self.grabs), 2)
+        self.assertEqual([item["query"] for item in result["results"]],
+                         ['calculadora', 'bloco de notas', 'Calculadora', 'calculadora'])
+        self.assertEqual(result["results"][0]["image_base64"], result["results"][2]["image_base64"])
+
+    def test_missing_window_keeps_its_position(self):
+        result = screenshot_advanced.take_screenshots_batch(['inexistente xyz', 'calculadora'],
+                                                            exclude_assistant=False, output='stdout')
+        self.assertEqual([item["success"] for item in result["results"]], [False, True])
+
+
+class SettleTest(ScreenshotTestCase):
+
+    def capture(self, title):
+        result = screenshot_advanced.take_screenshot('window', title, exclude_assistant=False,
+                                                     open_image=False, output='stdout')
+        self.assertTrue(result["success"], result.get("error"))
+        return result["waits"]
+
+    def test_no_settle_when_window_was_already_restored(self):
+        waits = self.capture('calculadora')
+        self.assertLess(waits["activate_target"], screenshot_advanced.SETTLE_DELAY * 1000)
+
+    def test_settle_after_observed_restore(self):
+        waits = self.capture('bloco de notas')
+        self.assertIn("restore_target", waits)
+        self.assertGreaterEqual(waits["activate_target"], screenshot_advanced.SETTLE_DELAY * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
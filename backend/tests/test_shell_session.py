@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de sessões de shell (shell_session.SessionPool) com bash no lugar do
+PowerShell: estado da sessão, isolamento, timeout e shell que morre.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import shell_session
+
+
+@unittest.skipUnless(shutil.which('bash'), 'bash não encontrado')
+class SessionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = tempfile.mkdtemp()
+        self.pool = shell_session.SessionPool('bash', size=1, max_uses=50, cwd=self.cwd)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.cwd, ignore_errors=True)
+
+    def test_state_persists_within_a_session(self):
+        self.pool.run('export GREETING=oi; cd /', check=True)
+        result = self.pool.run('echo "$GREETING $PWD"', check=True)
+        self.assertEqual(result["output"], 'oi /')
+        self.assertEqual(self.pool.stats()["started"], 1)
+
+    def test_isolated_pool_resets_location_and_variables(self):
+        pool = shell_session.SessionPool('bash', size=1, isolate=True, cwd=self.cwd)
+        try:
+            pool.run('GREETING=oi; cd /', check=True)
+            result = pool.run('echo "[$GREETING] $PWD"', check=True)
+            self.assertEqual(result["output"], f'[] {os.path.realpath(self.cwd)}')
+            self.assertEqual(pool.stats()["started"], 1)
+        finally:
+            pool.close()
+
+    def test_timeout_recycles_the_session(self):
+        result = self.pool.run('sleep 5', timeout=0.3)
+        self.assertTrue(result["timed_out"])
+        self.assertEqual(self.pool.run('echo ok', timeout=5, check=True)["output"], 'ok')
+        stats = self.pool.stats()
+        self.assertEqual((stats["timeouts"], stats["started"], stats["busy"]), (1, 2, 0))
+
+    def test_dead_shell_is_replaced(self):
+        result = self.pool.run('exit 7')
+        self.assertTrue(result["dead"])
+        self.assertEqual(result["code"], 7)
+        self.assertEqual(self.pool.run('echo ok', check=True)["output"], 'ok')
+
+    def test_exception_releases_the_session(self):
+        original = shell_session.ShellSession.run
+
+        def broken(session, script, timeout=shell_session.COMMAND_TIMEOUT):
+            raise RuntimeError('falha simulada')
+
+        shell_session.ShellSession.run = broken
+        try:
+            for _ in range(3):
+                with self.assertRaises(RuntimeError):
+                    self.pool.run('echo ok')
+        finally:
+            shell_session.ShellSession.run = original
+        self.assertEqual(self.pool.stats()["busy"], 0)
+        self.assertEqual(self.pool.run('echo ok', timeout=5, check=True)["output"], 'ok')
+
+
+if __name__ == "__main__":
+    unittest.main()
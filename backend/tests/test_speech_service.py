@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VAD (vad.py) e serviço de voz (speech_service.SpeechService) com áudio
+sintético: tom de 440 Hz entre trechos de silêncio, em memória ou em WAV,
+e o reconhecedor substituto (recognizers.StandInRecognizer), sem microfone
+nem rede.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import wave
+import shutil
+import tempfile
+import threading
+import unittest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+try:
+    import numpy as np
+    import speech_recognition as sr
+except ImportError:
+    np = sr = None
+
+RATE = 16000
+
+
+def tone_with_silence(before_s, tone_s, after_s, amplitude=8000):
+    """
+    Silêncio, tom de 440 Hz e silêncio, em int16
+    """
+    tone = amplitude * np.sin(2 * np.pi * 440 * np.arange(int(tone_s * RATE)) / RATE)
+    return np.concatenate((np.zeros(int(before_s * RATE)), tone, np.zeros(int(after_s * RATE)))).astype(np.int16)
+
+
+def write_wav(path, samples):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(samples.astype('<i2').tobytes())
+    return path
+
+
+@unittest.skipIf(np is None, 'numpy ou SpeechRecognition não instalados')
+class VoiceActivityDetectorTest(unittest.TestCase):
+
+    def setUp(self):
+        import vad
+        self.vad = vad
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_start_end_and_hangover(self):
+        detector = self.vad.VoiceActivityDetector(sample_rate=RATE, max_length_s=None)
+        self.assertTrue(detector.feed(tone_with_silence(0.5, 1.0, 1.0).tobytes()))
+
+        frame_ms = detector.frame_ms
+        self.assertAlmostEqual(detector.start_frame * frame_ms, 500, delta=frame_ms)
+        self.assertAlmostEqual((detector.last_speech_frame + 1) * frame_ms, 1500, delta=frame_ms)
+        self.assertEqual(detector.end_frame - detector.last_speech_frame, detector.hangover_frames)
+        self.assertEqual(detector.trailing_ms(), detector.hangover_frames * frame_ms)
+
+        # Frase recortada: pre-roll + 1 s de tom, sem o silêncio do fim
+        utterance_ms = len(detector.utterance()) / 2 / RATE * 1000
+        self.assertAlmostEqual(utterance_ms, 1000 + self.vad.PRE_ROLL_MS, delta=2 * frame_ms)
+
+    def test_short_click_is_not_speech(self):
+        detector = self.vad.VoiceActivityDetector(sample_rate=RATE)
+        self.assertFalse(detector.feed(tone_with_silence(0.3, 0.03, 0.5).tobytes()))
+        self.assertFalse(detector.started)
+
+    def test_listen_on_silence_raises_wait_timeout(self):
+        path = write_wav(os.path.join(self.directory, 'silencio.wav'), np.zeros(RATE, dtype=np.int16))
+        with sr.AudioFile(path) as source:
+            with self.assertRaises(sr.WaitTimeoutError):
+                self.vad.listen(source, self.vad.VoiceActivityDetector())
+
+    def test_listen_stops_when_cancelled(self):
+        path = write_wav(os.path.join(self.directory, 'fala.wav'), tone_with_silence(0.5, 1.0, 0.5))
+        cancel = threading.Event()
+        cancel.set()
+        with sr.AudioFile(path) as source:
+            with self.assertRaises(self.vad.ListenCancelled):
+                self.vad.listen(source, self.vad.VoiceActivityDetector(), cancel=cancel)
+
+
+@unittest.skipIf(np is None, 'numpy ou SpeechRecognition não instalados')
+class SpeechServiceWavTest(unittest.TestCase):
+
+    def setUp(self):
+        import recognizers
+        import speech_service
+
+        self.directory = tempfile.mkdtemp()
+        self.events = []
+        self.engine = recognizers.StandInRecognizer({"fala": "abrir o navegador"})
+        self.engine.expect("fala")
+        self.service = speech_service.SpeechService(self.events.append, monitor=False, engine=self.engine)
+        self.service.endpointing = 'vad'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def wav(self, samples, name='fala.wav'):
+        return write_wav(os.path.join(self.directory, name), samples)
+
+    def test_wav_listen_emits_events_in_order(self):
+        result = self.service.listen(7, duration=5, wav=self.wav(tone_with_silence(0.5, 1.0, 1.0)))
+        self.assertEqual([event["event"] for event in self.events], ['listening', 'phrase-detected', 'transcript'])
+        self.assertTrue(all(event["id"] == 7 for event in self.events))
+        self.assertEqual((result["success"], result["text"]), (True, "abrir o navegador"))
+        self.assertEqual(self.events[1]["endpointing"], 'vad')
+
+    def test_silence_ends_without_speech(self):
+        result = self.service.listen(1, duration=2, wav=self.wav(np.zeros(3 * RATE, dtype=np.int16)))
+        self.assertEqual(result["error"], "Nenhuma fala detectada")
+
+    def test_cancelled_request_is_skipped(self):
+        self.service.cancel(3)
+        result = self.service.listen(3, wav=self.wav(tone_with_silence(0.5, 1.0, 1.0)))
+        self.assertTrue(result["cancelled"])
+        self.assertEqual([event["event"] for event in self.events], ['transcript'])
+        # O cancelamento vale só para aquele pedido
+        self.assertTrue(self.service.listen(4, wav=self.wav(tone_with_silence(0.5, 1.0, 1.0)))["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
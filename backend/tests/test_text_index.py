@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Busca do índice de texto (text_index.TextIndex) por faixas.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from text_index import TextIndex
+
+
+class TierSearchTest(unittest.TestCase):
+
+    def test_rejected_candidates_do_not_fill_the_limit(self):
+        # A entrada longa tem as duas palavras (faixa de cima), mas fica abaixo de min_score
+        index = TextIndex(["alpha beta gamma delta epsilon zeta", "alpha"])
+        self.assertEqual(index.search("alpha betx", limit=1, min_score=0.7), [("alpha", 0.775)])
+
+    def test_higher_tier_wins_when_it_passes(self):
+        index = TextIndex(["alpha", "alpha beta"])
+        self.assertEqual([entry for entry, _ in index.search("alpha beta", limit=1)], ["alpha beta"])
+
+
+if __name__ == "__main__":
+    unittest.main()
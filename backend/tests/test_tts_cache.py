@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de falas pré-renderizadas (tts_cache.PhraseCache) com o sintetizador
+substituto (tts_service.StandInSpeaker), que grava silêncio em WAV.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tts_cache
+import tts_service
+
+VOICE = 'voz-teste'
+# Uma palavra a 600 palavras/min: 0,1 s de silêncio a 16 kHz
+RATE = 600
+VOLUME = 0.8
+
+
+class PhraseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.speaker = tts_service.StandInSpeaker(render_factor=0)
+        probe = tts_cache.PhraseCache(os.path.join(self.directory, 'probe'))
+        path, _ = probe.render(self.speaker, 'medida', VOICE, RATE, VOLUME)
+        self.wav_size = os.path.getsize(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def cache(self, entries):
+        # Orçamento para exatamente `entries` falas de uma palavra
+        return tts_cache.PhraseCache(os.path.join(self.directory, 'cache'), max_bytes=entries * self.wav_size)
+
+    def render(self, cache, text):
+        path, _ = cache.render(self.speaker, text, VOICE, RATE, VOLUME)
+        return path
+
+    def test_hit_returns_stored_wav(self):
+        cache = self.cache(3)
+        path = self.render(cache, 'pronto')
+        self.assertEqual(cache.get('pronto', VOICE, RATE, VOLUME), path)
+        self.assertTrue(os.path.exists(path))
+        self.assertIsNone(cache.get('pronto', VOICE, RATE + 1, VOLUME))
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+
+    def test_least_recently_used_is_evicted_first(self):
+        cache = self.cache(3)
+        paths = {text: self.render(cache, text) for text in ('um', 'dois', 'tres')}
+        # Usar "um" o torna o mais recente: "dois" passa a ser o mais antigo
+        cache.get('um', VOICE, RATE, VOLUME)
+
+        self.render(cache, 'quatro')
+        self.assertFalse(cache.contains('dois', VOICE, RATE, VOLUME))
+        self.assertFalse(os.path.exists(paths['dois']))
+        self.assertEqual([entry["text"] for entry in cache.entries.values()], ['tres', 'um', 'quatro'])
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+        self.render(cache, 'cinco')
+        self.assertEqual([entry["text"] for entry in cache.entries.values()], ['um', 'quatro', 'cinco'])
+
+    def test_index_keeps_order_across_reloads(self):
+        cache = self.cache(3)
+        for text in ('um', 'dois', 'tres'):
+            self.render(cache, text)
+        cache.get('um', VOICE, RATE, VOLUME)
+        cache.flush()
+
+        reloaded = self.cache(3)
+        self.assertEqual(reloaded.total_bytes, 3 * self.wav_size)
+        self.render(reloaded, 'quatro')
+        self.assertFalse(reloaded.contains('dois', VOICE, RATE, VOLUME))
+
+
+if __name__ == "__main__":
+    unittest.main()
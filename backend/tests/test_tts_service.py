@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fila do serviço de síntese (tts_service.TtsService) com o sintetizador
+substituto (StandInSpeaker): ordem de chegada, skip e interrupt, sem áudio.
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tts_service
+
+# 600 palavras/min: 0,1 s por palavra
+RATE = 600
+LONG_TEXT = ' '.join(['palavra'] * 30)
+
+
+class TtsServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.events = []
+        self.changed = threading.Condition()
+        self.service = tts_service.TtsService(self.emit, speaker=tts_service.StandInSpeaker())
+        self.service.open()
+
+    def tearDown(self):
+        self.service.close()
+        self.service.thread.join(5)
+
+    def emit(self, event):
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def wait_for(self, event, request_id, timeout=5):
+        """
+        Espera o evento daquele pedido e o devolve
+        """
+        def find():
+            return next((e for e in self.events if e["event"] == event and e.get("id") == request_id), None)
+        with self.changed:
+            self.assertTrue(self.changed.wait_for(find, timeout), f"sem '{event}' para {request_id}")
+            return find()
+
+    def done_ids(self):
+        return [event["id"] for event in self.events if event["event"] == "done"]
+
+    def test_requests_are_spoken_in_order(self):
+        for request_id in (1, 2, 3):
+            self.service.speak(request_id, "olá mundo", rate=RATE)
+        self.wait_for("done", 3)
+        self.assertEqual(self.done_ids(), [1, 2, 3])
+        self.assertTrue(all(e["success"] and e["spoken"] and not e["interrupted"]
+                            for e in self.events if e["event"] == "done"))
+
+    def test_skip_stops_only_the_current_speech(self):
+        self.service.speak(1, LONG_TEXT, rate=RATE)
+        self.service.speak(2, "olá", rate=RATE)
+        self.wait_for("started", 1)
+        self.assertEqual(self.service.skip(), 1)
+
+        first = self.wait_for("done", 1)
+        second = self.wait_for("done", 2)
+        self.assertTrue(first["interrupted"])
+        self.assertLess(first["speech_ms"], 30 * 100)
+        self.assertEqual((second["interrupted"], second["spoken"]), (False, True))
+
+    def test_interrupt_drops_the_queue(self):
+        self.service.speak(1, LONG_TEXT, rate=RATE)
+        self.service.speak(2, "olá", rate=RATE)
+        self.service.speak(3, "tchau", rate=RATE)
+        self.wait_for("started", 1)
+        self.assertEqual(self.service.interrupt(), (1, 2))
+
+        self.assertTrue(self.wait_for("done", 1)["interrupted"])
+        self.assertEqual(sorted(self.done_ids()), [1, 2, 3])
+        dropped = [e for e in self.events if e["event"] == "done" and e["id"] in (2, 3)]
+        self.assertTrue(all(e["interrupted"] and not e["spoken"] for e in dropped))
+        self.assertFalse([e for e in self.events if e["event"] == "started" and e["id"] != 1])
+        self.assertEqual(self.service.depth(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
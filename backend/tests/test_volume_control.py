@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Controle de volume (volume_control e audio_backend) com o volume em memória
+(FakeAudioBackend).
+
+Uso (a partir de backend/):
+    python -m pytest -q tests    (ou python -m unittest discover -s tests)
+"""
+
+import io
+import os
+import sys
+import json
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import audio_backend
+import volume_control
+
+
+class BrokenBackend(audio_backend.FakeAudioBackend):
+    """
+    Dispositivo que sumiu: toda operação falha
+    """
+
+    name = 'broken'
+
+    def get_state(self):
+        raise RuntimeError('dispositivo desconectado')
+
+    set_level = set_mute = get_state
+
+
+class VolumeControlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = audio_backend.FakeAudioBackend(level=50)
+        audio_backend.set_backend(self.backend)
+
+    def tearDown(self):
+        audio_backend.set_backend()
+
+    def run_main(self, *argv):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            volume_control.main(list(argv))
+        return output.getvalue().strip()
+
+    def test_set_is_a_single_absolute_call(self):
+        result = volume_control.set_volume(130, details=True)
+        self.assertEqual((result["success"], result["level"], result["backend"]), (True, 100, 'fake'))
+        self.assertEqual(self.backend.calls, [('set', 100)])
+
+    def test_up_and_down_move_by_one_step(self):
+        self.assertEqual(volume_control.volume_up(details=True)["level"], 50 + audio_backend.STEP)
+        self.assertEqual(volume_control.volume_down(details=True)["level"], 50)
+
+    def test_mute_and_get(self):
+        volume_control.mute_volume(True)
+        self.assertEqual(json.loads(self.run_main('get')),
+                         {"success": True, "level": 50, "muted": True, "backend": 'fake', "absolute": True})
+
+    def test_step_falls_back_to_next_backend(self):
+        audio_backend.set_backend(BrokenBackend(), self.backend)
+        self.assertEqual(audio_backend.step('up')["level"], 50 + audio_backend.STEP)
+
+    def test_step_keeps_backend_errors(self):
+        audio_backend.set_backend(BrokenBackend())
+        with self.assertRaises(RuntimeError) as raised:
+            audio_backend.step('down')
+        self.assertIn('broken: dispositivo desconectado', str(raised.exception))
+        self.assertIn('dispositivo desconectado', volume_control.volume_down())
+
+    def test_invalid_value_is_rejected(self):
+        with self.assertRaises(SystemExit):
+            self.run_main('set', 'alto')
+        self.assertEqual(self.backend.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
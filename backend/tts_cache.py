@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de falas pré-renderizadas do serviço de síntese (tts_service.py).
+
+Frases curtas (confirmações como "Volume aumentado") são renderizadas em WAV
+uma vez e tocadas direto do disco nas repetições. A chave é o SHA-256 de
+(texto, voz, velocidade, volume); o índice (index.json) guarda o último uso
+de cada arquivo (gravado a cada renderização e, para acertos, no máximo a
+cada SAVE_INTERVAL ou em flush()) e, quando o total passa de MAX_BYTES, as falas usadas há
+mais tempo são removidas (LRU). Só o serviço escreve no cache.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')
+INDEX_NAME = 'index.json'
+
+# Limite total em bytes dos WAVs guardados
+MAX_BYTES = int(os.environ.get('TTS_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# Textos maiores que isso são falados ao vivo (respostas longas raramente se repetem)
+MAX_CHARS = int(os.environ.get('TTS_CACHE_MAX_CHARS', '120'))
+
+DIGEST_LENGTH = 32
+
+# Intervalo mínimo (s) entre gravações do índice por causa de acertos; o uso
+# das entradas fica em memória e vai para o disco em flush()
+SAVE_INTERVAL = 30.0
+
+PHRASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'tts_phrases.txt')
+APPS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'apps.json')
+
+
+def cache_key(text, voice, rate, volume):
+    data = json.dumps([text, voice, rate, round(float(volume), 3)], ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:DIGEST_LENGTH]
+
+
+def load_phrases(path=PHRASES_PATH, apps_path=APPS_PATH):
+    """
+    Frases para aquecer o cache, uma por linha ('#' comenta). Linhas com
+    {app} são repetidas para o nome de cada aplicativo de config/apps.json.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+    except OSError:
+        return []
+
+    names = []
+    if any('{app}' in line for line in lines):
+        try:
+            with open(apps_path, 'r', encoding='utf-8') as f:
+                names = [app["name"] for app in json.load(f).get("apps", {}).values() if app.get("name")]
+        except (OSError, ValueError, AttributeError):
+            names = []
+
+    phrases = []
+    for line in lines:
+        if not line or line.startswith('#'):
+            continue
+        if '{app}' in line:
+            phrases.extend(line.replace('{app}', name) for name in names)
+        else:
+            phrases.append(line)
+    return list(dict.fromkeys(phrases))
+
+
+class PhraseCache:
+    """
+    WAVs renderizados em disco com remoção LRU por orçamento de bytes
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, max_chars=MAX_CHARS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.render_ms = 0.0
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        self._load()
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_NAME)
+
+    def _load(self):
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                entries = json.load(f).get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            entries = {}
+
+        # Mais antigo primeiro; arquivos apagados por fora saem do índice
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get("last_used", 0)):
+            if os.path.exists(os.path.join(self.cache_dir, entry.get("file", ""))):
+                self.entries[key] = entry
+                self.total_bytes += entry.get("size", 0)
+
+    def _save(self):
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self._index_path()}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"entries": self.entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self._index_path())
+        except OSError:
+            pass
+
+    def cacheable(self, text):
+        return 0 < len(text) <= self.max_chars and self.max_bytes > 0
+
+    def get(self, text, voice, rate, volume):
+        """
+        Caminho do WAV guardado (marcando o uso) ou None
+        """
+        key = cache_key(text, voice, rate, volume)
+        with self.lock:
+            entry = self.entries.get(key)
+            path = os.path.join(self.cache_dir, entry["file"]) if entry else None
+            if entry is None or not os.path.exists(path):
+                if entry is not None:
+                    self.total_bytes -= entry.get("size", 0)
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.dirty = True
+            if time.monotonic() - self.saved_at >= SAVE_INTERVAL:
+                self._save()
+            return path
+
+    def render(self, speaker, text, voice, rate, volume):
+        """
+        Renderiza a fala com speaker.render e guarda no cache. Retorna
+        (caminho, render_ms).
+        """
+        key = cache_key(text, voice, rate, volume)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        name = f"{key}.wav"
+        path = os.path.join(self.cache_dir, name)
+        temp_path = f"{path}.{os.getpid()}.tmp.wav"
+
+        start = time.perf_counter()
+        speaker.render(text, rate, volume, temp_path)
+        os.replace(temp_path, path)
+        elapsed = round((time.perf_counter() - start) * 1000, 2)
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous:
+                self.total_bytes -= previous.get("size", 0)
+            size = os.path.getsize(path)
+            self.entries[key] = {"file": name, "text": text, "voice": voice, "rate": rate, "volume": volume,
+                                 "size": size, "render_ms": elapsed, "last_used": time.time(), "hits": 0}
+            self.total_bytes += size
+            self.renders += 1
+            self.render_ms += elapsed
+            self._evict()
+            self._save()
+        return path, elapsed
+
+    def flush(self):
+        """
+        Grava o índice se houver usos ainda não salvos
+        """
+        with self.lock:
+            if self.dirty:
+                self._save()
+
+    def contains(self, text, voice, rate, volume):
+        return cache_key(text, voice, rate, volume) in self.entries
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry.get("size", 0)
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "renders": self.renders,
+            "render_ms_mean": round(self.render_ms / self.renders, 2) if self.renders else None,
+        }
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serviço persistente de síntese de voz.
+
+Inicializa o pyttsx3 uma única vez; a voz em português escolhida fica
+guardada em config/.tts_voice.json para não percorrer todas as vozes
+instaladas a cada início. As falas entram numa fila atendida por uma thread
+própria, na ordem de chegada.
+
+Protocolo: um comando JSON por linha no stdin e um evento JSON por linha no
+stdout (NDJSON):
+    {"cmd": "speak", "id": 1, "text": "Olá", "rate": 150, "volume": 0.8}
+    {"cmd": "skip"}         interrompe a fala atual e segue a fila
+    {"cmd": "interrupt"}    interrompe a fala atual e esvazia a fila
+    {"cmd": "status"} / {"cmd": "ping"} / {"cmd": "shutdown"}
+
+Eventos: ready, queued, started (com first_audio_ms), done, skipped, interrupted,
+status, warmed, error.
+
+Frases curtas são tocadas do cache de WAVs pré-renderizados (tts_cache.py);
+uma frase que não está no cache é falada ao vivo e renderizada depois, com
+a fila vazia. Também com a fila vazia, o serviço pré-renderiza as frases de config/tts_phrases.txt
+(ou de --warmup / TTS_WARMUP; "false" desliga). TTS_CACHE=false ou
+--no-cache falam sempre ao vivo.
+
+Uso:
+    python tts_service.py [--engine stand-in] [--warmup frases.txt] [--no-cache]
+    python tts_service.py --say "texto"     fala uma vez e sai
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import wave
+import queue
+import threading
+import subprocess
+from collections import deque
+
+VOICE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', '.tts_voice.json')
+
+DEFAULT_RATE = 150
+DEFAULT_VOLUME = 0.8
+
+
+def load_voice(path=VOICE_CACHE_PATH):
+    """
+    Voz guardada, se existir
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("voice_id")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def save_voice(voice_id, path=VOICE_CACHE_PATH):
+    """
+    Grava a voz escolhida de forma atômica
+    """
+    try:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"voice_id": voice_id, "timestamp": time.time()}, f)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def wav_duration(path):
+    with wave.open(path, 'rb') as f:
+        return f.getnframes() / float(f.getframerate() or 1)
+
+
+def play_wav(path, on_audio, should_stop, interval=0.02):
+    """
+    Toca um WAV (winsound no Windows, aplay/afplay/paplay nos demais),
+    parando assim que should_stop() for verdadeiro
+    """
+    deadline = time.perf_counter() + wav_duration(path)
+    if sys.platform == 'win32':
+        import winsound
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+        on_audio()
+        while time.perf_counter() < deadline:
+            if should_stop():
+                winsound.PlaySound(None, winsound.SND_PURGE)
+                return
+            time.sleep(interval)
+        return
+
+    player = ['afplay'] if sys.platform == 'darwin' else ['aplay', '-q']
+    try:
+        process = subprocess.Popen(player + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        process = subprocess.Popen(['paplay', path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    on_audio()
+    while process.poll() is None:
+        if should_stop():
+            process.terminate()
+            return
+        time.sleep(interval)
+
+
+class Pyttsx3Speaker:
+    """
+    Fala com o pyttsx3. A interrupção acontece no callback de palavra, que é
+    onde o pyttsx3 aceita engine.stop() com segurança.
+    """
+
+    name = 'pyttsx3'
+
+    def __init__(self):
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+        self.voice_id = self._select_voice()
+        self.on_audio = None
+        self.should_stop = None
+        self.engine.connect('started-utterance', self._started)
+        self.engine.connect('started-word', self._word)
+
+    def _select_voice(self):
+        voice_id = load_voice()
+        if voice_id:
+            try:
+                self.engine.setProperty('voice', voice_id)
+                return voice_id
+            except Exception:
+                pass
+
+        # Configurar voz em português se disponível
+        for voice in self.engine.getProperty('voices'):
+            if 'portuguese' in voice.name.lower() or 'pt' in voice.id.lower():
+                self.engine.setProperty('voice', voice.id)
+                save_voice(voice.id)
+                return voice.id
+        return None
+
+    def _started(self, name):
+        if self.on_audio:
+            self.on_audio()
+            self.on_audio = None
+
+    def _word(self, name, location, length):
+        if self.on_audio:
+            self.on_audio()
+            self.on_audio = None
+        if self.should_stop and self.should_stop():
+            self.engine.stop()
+
+    def say(self, text, rate, volume, on_audio, should_stop):
+        self.on_audio = on_audio
+        self.should_stop = should_stop
+        self.engine.setProperty('rate', rate)
+        self.engine.setProperty('volume', volume)
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def render(self, text, rate, volume, path):
+        """
+        Renderiza a fala em um arquivo WAV, sem tocar
+        """
+        self.on_audio = None
+        self.should_stop = None
+        self.engine.setProperty('rate', rate)
+        self.engine.setProperty('volume', volume)
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+
+    def play(self, path, on_audio, should_stop):
+        play_wav(path, on_audio, should_stop)
+
+
+class StandInSpeaker:
+    """
+    Substituto sem áudio para testes: "fala" cada palavra em 60/rate segundos;
+    renderizar custa render_factor do tempo da fala e grava silêncio
+    """
+
+    name = 'stand-in'
+
+    def __init__(self, startup=0.0, render_factor=0.1):
+        self.voice_id = None
+        self.render_factor = render_factor
+        if startup:
+            time.sleep(startup)
+
+    def _duration(self, text, rate):
+        return len(text.split()) * 60.0 / max(rate, 1)
+
+    def say(self, text, rate, volume, on_audio, should_stop):
+        for word in text.split():
+            on_audio()
+            if should_stop():
+                return
+            time.sleep(60.0 / max(rate, 1))
+
+    def render(self, text, rate, volume, path, sample_rate=16000):
+        duration = self._duration(text, rate)
+        time.sleep(duration * self.render_factor)
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(sample_rate)
+            f.writeframes(b'\x00\x00' * int(duration * sample_rate))
+
+    def play(self, path, on_audio, should_stop, interval=0.02):
+        deadline = time.perf_counter() + wav_duration(path)
+        on_audio()
+        while time.perf_counter() < deadline and not should_stop():
+            time.sleep(interval)
+
+
+SPEAKERS = {
+    Pyttsx3Speaker.name: Pyttsx3Speaker,
+    StandInSpeaker.name: StandInSpeaker,
+}
+
+
+def get_speaker(name=None, **options):
+    """
+    Instancia o sintetizador pelo nome (padrão: TTS_ENGINE ou pyttsx3)
+    """
+    name = name or os.environ.get('TTS_ENGINE', Pyttsx3Speaker.name)
+    if name not in SPEAKERS:
+        raise ValueError(f"Sintetizador '{name}' não suportado")
+    return SPEAKERS[name](**options)
+
+
+class TtsService:
+    """
+    Fila de falas atendida por uma thread; eventos vão para emit(dict)
+    """
+
+    def __init__(self, emit, speaker=None, cache=None, warmup=None):
+        self.emit = emit
+        self.speaker = speaker
+        self.cache = cache
+        self.warmup = deque(warmup or [])
+        # Falas que faltaram no cache: renderizadas com a fila vazia
+        self.fills = deque()
+        self.fill_keys = set()
+        self.queue = queue.Queue()
+        self.current = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def open(self):
+        """
+        Inicia a thread da fila, que cria o sintetizador (o SAPI do pyttsx3
+        precisa rodar na mesma thread em que foi criado). Retorna o tempo de
+        inicialização em ms; erros da inicialização são relançados.
+        """
+        start = time.perf_counter()
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            try:
+                if self.speaker is None:
+                    self.speaker = get_speaker()
+            except Exception as e:
+                failure.append(e)
+                return
+            finally:
+                ready.set()
+            self._run()
+
+        self.thread = threading.Thread(target=run, name='tts-queue', daemon=True)
+        self.thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        return round((time.perf_counter() - start) * 1000, 1)
+
+    def close(self):
+        if self.cache:
+            self.cache.flush()
+        self.stopped.set()
+        self.interrupt()
+        self.queue.put(None)
+
+    def depth(self):
+        return self.queue.qsize() + (1 if self.current else 0)
+
+    def speak(self, request_id=None, text="", rate=DEFAULT_RATE, volume=DEFAULT_VOLUME, cache=True):
+        """
+        Enfileira uma fala; cache=False sempre fala ao vivo
+        """
+        item = {"id": request_id, "text": text, "rate": rate, "volume": volume, "cache": cache,
+                "received": time.perf_counter(), "cancelled": False}
+        self.queue.put(item)
+        self.emit({"event": "queued", "id": request_id, "depth": self.depth()})
+        return item
+
+    def skip(self):
+        """
+        Interrompe apenas a fala atual
+        """
+        with self.lock:
+            if self.current:
+                self.current["cancelled"] = True
+                return self.current["id"]
+        return None
+
+    def interrupt(self):
+        """
+        Interrompe a fala atual e descarta as que estão na fila
+        """
+        dropped = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                continue
+            item["cancelled"] = True
+            dropped.append(item)
+        current = self.skip()
+        for item in dropped:
+            self.emit({"event": "done", "id": item["id"], "success": True, "interrupted": True, "spoken": False})
+        return current, len(dropped)
+
+    def status(self):
+        current = self.current
+        return {"event": "status", "depth": self.depth(),
+                "current": current["id"] if current else None,
+                "engine": self.speaker.name if self.speaker else None,
+                "voice": self.speaker.voice_id if self.speaker else None,
+                "warmup_pending": len(self.warmup),
+                "fill_pending": len(self.fills),
+                "cache": self.cache.stats() if self.cache else None}
+
+    def _warm_one(self):
+        """
+        Renderiza uma frase de aquecimento que ainda não está no cache
+        """
+        text = self.warmup.popleft()
+        voice = self.speaker.voice_id
+        if self.cache.cacheable(text) and not self.cache.contains(text, voice, DEFAULT_RATE, DEFAULT_VOLUME):
+            try:
+                self.cache.render(self.speaker, text, voice, DEFAULT_RATE, DEFAULT_VOLUME)
+            except Exception as e:
+                self.emit({"event": "error", "error": f"Erro ao pré-renderizar '{text}': {e}"})
+        if not self.warmup:
+            self.emit({"event": "warmed", "cache": self.cache.stats()})
+
+    def _fill_one(self):
+        """
+        Renderiza para o cache uma fala que já foi dita ao vivo
+        """
+        key = self.fills.popleft()
+        self.fill_keys.discard(key)
+        if not self.cache.contains(*key):
+            try:
+                self.cache.render(self.speaker, *key)
+            except Exception as e:
+                self.emit({"event": "error", "error": f"Erro ao guardar '{key[0]}' no cache: {e}"})
+
+    def _run(self):
+        while not self.stopped.is_set():
+            # Aquecimento e preenchimento do cache só com a fila vazia:
+            # pedidos reais passam na frente
+            if (self.warmup or self.fills) and self.cache:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    if self.fills:
+                        self._fill_one()
+                    else:
+                        self._warm_one()
+                    continue
+            else:
+                item = self.queue.get()
+            if item is None:
+                break
+            if item["cancelled"]:
+                continue
+            with self.lock:
+                self.current = item
+            self._say(item)
+            with self.lock:
+                self.current = None
+
+    def _say(self, item):
+        started = {}
+        depth = self.queue.qsize()
+
+        def on_audio():
+            if not started:
+                started["at"] = time.perf_counter()
+                self.emit({"event": "started", "id": item["id"], "depth": depth,
+                           "first_audio_ms": round((started["at"] - item["received"]) * 1000, 1)})
+
+        result = {"event": "done", "id": item["id"]}
+        should_stop = lambda: item["cancelled"]
+        try:
+            if item["cache"] and self.cache and self.cache.cacheable(item["text"]):
+                # Frase curta: toca do cache; na falta, fala ao vivo (sem esperar
+                # a renderização) e guarda no cache quando a fila esvaziar
+                key = (item["text"], self.speaker.voice_id, item["rate"], item["volume"])
+                path = self.cache.get(*key)
+                result["cached"] = path is not None
+                if path is not None:
+                    self.speaker.play(path, on_audio, should_stop)
+                else:
+                    self.speaker.say(item["text"], item["rate"], item["volume"], on_audio, should_stop)
+                    if key not in self.fill_keys:
+                        self.fill_keys.add(key)
+                        self.fills.append(key)
+            else:
+                self.speaker.say(item["text"], item["rate"], item["volume"], on_audio, should_stop)
+            result.update(success=True, interrupted=item["cancelled"], spoken=bool(started))
+        except Exception as e:
+            result.update(success=False, error=f"Erro na síntese de voz: {e}")
+        finished = time.perf_counter()
+        if started:
+            result["first_audio_ms"] = round((started["at"] - item["received"]) * 1000, 1)
+            result["speech_ms"] = round((finished - started["at"]) * 1000, 1)
+        result["total_ms"] = round((finished - item["received"]) * 1000, 1)
+        self.emit(result)
+
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    say = None
+    use_cache = os.environ.get('TTS_CACHE', 'true').lower() != 'false'
+    warmup_path = os.environ.get('TTS_WARMUP') or None
+    for position, arg in enumerate(argv):
+        if arg == '--engine' and position + 1 < len(argv):
+            os.environ['TTS_ENGINE'] = argv[position + 1]
+        elif arg == '--say' and position + 1 < len(argv):
+            say = argv[position + 1]
+        elif arg == '--warmup' and position + 1 < len(argv):
+            warmup_path = argv[position + 1]
+        elif arg == '--no-cache':
+            use_cache = False
+
+    if hasattr(sys.stdout, 'buffer'):
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+    write_lock = threading.Lock()
+    finished = threading.Event()
+
+    def emit(event):
+        with write_lock:
+            sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+        if say is not None and event.get("event") == "done":
+            finished.set()
+
+    cache = None
+    warmup = None
+    if use_cache:
+        import tts_cache
+        cache = tts_cache.PhraseCache()
+        if say is None and warmup_path != 'false':
+            warmup = tts_cache.load_phrases(warmup_path or tts_cache.PHRASES_PATH)
+
+    service = TtsService(emit, cache=cache, warmup=warmup)
+    try:
+        startup_ms = service.open()
+    except Exception as e:
+        emit({"event": "error", "error": f"Erro ao iniciar síntese de voz: {e}"})
+        sys.exit(1)
+
+    if say is not None:
+        service.speak(text=say)
+        finished.wait()
+        service.close()
+        return
+
+    emit({"event": "ready", "engine": service.speaker.name, "voice": service.speaker.voice_id,
+          "startup_ms": startup_ms, "warmup": len(warmup or []),
+          "cache": cache.stats() if cache else None})
+
+    try:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                command = json.loads(line)
+            except ValueError:
+                emit({"event": "error", "error": "Comando inválido"})
+                continue
+
+            action = command.get("cmd")
+            if action == "speak":
+                if not command.get("text"):
+                    emit({"event": "error", "id": command.get("id"), "error": "Texto é obrigatório"})
+                    continue
+                service.speak(command.get("id"), command["text"], command.get("rate", DEFAULT_RATE),
+                              command.get("volume", DEFAULT_VOLUME), command.get("cache", True))
+            elif action == "skip":
+                emit({"event": "skipped", "id": command.get("id"), "current": service.skip()})
+            elif action == "interrupt":
+                current, dropped = service.interrupt()
+                emit({"event": "interrupted", "id": command.get("id"), "current": current, "dropped": dropped})
+            elif action == "status":
+                emit({**service.status(), "id": command.get("id")})
+            elif action == "ping":
+                emit({"event": "pong", "id": command.get("id")})
+            elif action == "shutdown":
+                break
+            else:
+                emit({"event": "error", "id": command.get("id"), "error": f"Comando '{action}' não reconhecido"})
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
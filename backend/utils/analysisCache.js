@@ -0,0 +1,130 @@
+// Cache das análises de tela indexado pelo hash perceptual da captura (dHash)
+// Telas praticamente iguais (a poucos bits de distância) com o mesmo prompt
+// reaproveitam a resposta anterior em vez de chamar o modelo de visão de novo.
+// A distância aceita é uma fração dos bits do hash (256 bits por padrão), e
+// hashes de tamanhos diferentes nunca são comparados.
+// Remoção por LRU (tamanho máximo) e por TTL.
+
+const hammingDistance = (first, second) => {
+  let value = BigInt(`0x${first}`) ^ BigInt(`0x${second}`);
+  let count = 0;
+  while (value) {
+    value &= value - 1n;
+    count += 1;
+  }
+  return count;
+};
+
+class AnalysisCache {
+  constructor(options = {}) {
+    this.maxEntries = options.maxEntries || parseInt(process.env.ANALYSIS_CACHE_SIZE || '64', 10);
+    this.ttlMs = options.ttlMs || parseInt(process.env.ANALYSIS_CACHE_TTL_MS || '300000', 10);
+    // Fração dos bits que pode diferir: 0.03 aceita até 7 dos 256 bits
+    this.maxDistanceRatio = options.maxDistanceRatio !== undefined
+      ? options.maxDistanceRatio
+      : parseFloat(process.env.ANALYSIS_CACHE_MAX_DISTANCE_RATIO || '0.03');
+    // Map mantém a ordem de inserção: o primeiro item é o menos usado
+    this.entries = new Map();
+    this.counters = { hits: 0, misses: 0, evictions: 0, expired: 0, hashes: 0, hashMsTotal: 0 };
+  }
+
+  key(hash, prompt) {
+    return `${prompt}\u0000${hash}`;
+  }
+
+  // Bits que podem diferir para um hash hexadecimal desse tamanho
+  maxDistance(hash) {
+    return Math.floor(hash.length * 4 * this.maxDistanceRatio);
+  }
+
+  isExpired(entry, now) {
+    return now - entry.createdAt > this.ttlMs;
+  }
+
+  // Procura uma análise para a tela: mesmo hash ou, se não houver, o mais
+  // próximo dentro de maxDistance(hash) bits
+  get(hash, prompt) {
+    const now = Date.now();
+    const maxDistance = this.maxDistance(hash);
+    let found = null;
+    let foundKey = null;
+    let bestDistance = Infinity;
+
+    for (const [key, entry] of this.entries) {
+      if (this.isExpired(entry, now)) {
+        this.entries.delete(key);
+        this.counters.expired += 1;
+        continue;
+      }
+      if (entry.prompt !== prompt || entry.hash.length !== hash.length) continue;
+      const distance = entry.hash === hash ? 0 : hammingDistance(entry.hash, hash);
+      if (distance <= maxDistance && distance < bestDistance) {
+        found = entry;
+        foundKey = key;
+        bestDistance = distance;
+        if (distance === 0) break;
+      }
+    }
+
+    if (!found) {
+      this.counters.misses += 1;
+      return null;
+    }
+
+    // Reinserir marca como usado recentemente
+    this.entries.delete(foundKey);
+    this.entries.set(foundKey, found);
+    this.counters.hits += 1;
+    return { value: found.value, distance: bestDistance, ageMs: now - found.createdAt };
+  }
+
+  set(hash, prompt, value) {
+    const key = this.key(hash, prompt);
+    this.entries.delete(key);
+    this.entries.set(key, { hash, prompt, value, createdAt: Date.now() });
+
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+      this.counters.evictions += 1;
+    }
+  }
+
+  recordHashTime(ms) {
+    if (typeof ms !== 'number') return;
+    this.counters.hashes += 1;
+    this.counters.hashMsTotal += ms;
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  stats() {
+    const { hits, misses, evictions, expired, hashes, hashMsTotal } = this.counters;
+    return {
+      entries: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlMs: this.ttlMs,
+      maxDistanceRatio: this.maxDistanceRatio,
+      hits,
+      misses,
+      hitRate: hits + misses ? Number((hits / (hits + misses)).toFixed(3)) : 0,
+      evictions,
+      expired,
+      hashes,
+      avgHashMs: hashes ? Number((hashMsTotal / hashes).toFixed(2)) : 0
+    };
+  }
+}
+
+let analysisCache = null;
+
+// Instância compartilhada pelas rotas
+const getAnalysisCache = () => {
+  if (!analysisCache) {
+    analysisCache = new AnalysisCache();
+  }
+  return analysisCache;
+};
+
+module.exports = { AnalysisCache, getAnalysisCache, hammingDistance };
@@ -0,0 +1,116 @@
+const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
+
+// Cliente do worker Python persistente (scripts/worker.py)
+// Fala JSON-RPC 2.0 com uma mensagem por linha via stdin/stdout
+class PythonWorker {
+  constructor(options = {}) {
+    this.pythonPath = options.pythonPath || process.env.PYTHON_PATH || 'python';
+    this.module = options.module || 'scripts.worker';
+    this.cwd = options.cwd || path.join(__dirname, '..');
+    this.timeout = options.timeout || 120000;
+    this.process = null;
+    this.nextId = 1;
+    this.pending = new Map();
+  }
+
+  start() {
+    if (this.process) return this.process;
+
+    const child = spawn(this.pythonPath, ['-m', this.module], {
+      cwd: this.cwd,
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+    });
+
+    readline.createInterface({ input: child.stdout }).on('line', (line) => {
+      let message;
+      try {
+        message = JSON.parse(line);
+      } catch (error) {
+        console.error('Worker Python: resposta inválida:', line);
+        return;
+      }
+
+      const request = this.pending.get(message.id);
+      if (!request) return;
+      this.pending.delete(message.id);
+      clearTimeout(request.timer);
+
+      if (message.error) {
+        request.reject(new Error(message.error.message));
+      } else {
+        request.resolve(message.result);
+      }
+    });
+
+    child.stderr.on('data', (data) => {
+      console.log('Worker Python stderr:', data.toString());
+    });
+
+    const fail = (reason) => {
+      if (this.process !== child) return;
+      this.process = null;
+      for (const request of this.pending.values()) {
+        clearTimeout(request.timer);
+        request.reject(new Error(reason));
+      }
+      this.pending.clear();
+    };
+
+    child.on('exit', (code) => fail(`Worker Python finalizado com código ${code}`));
+    child.on('error', (error) => fail(error.message));
+
+    this.process = child;
+    return child;
+  }
+
+  request(method, params = {}) {
+    const child = this.start();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Tempo esgotado aguardando o worker (${method})`));
+      }, this.timeout);
+
+      this.pending.set(id, { resolve, reject, timer });
+      child.stdin.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+    });
+  }
+
+  // Executa o main() de um script e devolve { code, output, error }
+  run(scriptPath, args = []) {
+    return this.request('run', {
+      script: path.basename(scriptPath),
+      args: args.map((arg) => (arg === null || arg === undefined ? '' : String(arg)))
+    });
+  }
+
+  // Chama uma função 'modulo.funcao' diretamente
+  call(functionName, args = [], kwargs = {}) {
+    return this.request('call', { function: functionName, args, kwargs });
+  }
+
+  stop() {
+    if (!this.process) return;
+    this.process.stdin.write(JSON.stringify({ jsonrpc: '2.0', id: 0, method: 'shutdown' }) + '\n');
+    this.process.stdin.end();
+    this.process = null;
+  }
+}
+
+let sharedWorker = null;
+
+// Worker compartilhado entre as rotas
+const getPythonWorker = () => {
+  if (!sharedWorker) {
+    sharedWorker = new PythonWorker();
+    process.on('exit', () => sharedWorker && sharedWorker.stop());
+  }
+  return sharedWorker;
+};
+
+module.exports = { PythonWorker, getPythonWorker };
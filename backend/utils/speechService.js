@@ -0,0 +1,118 @@
+const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
+
+// Cliente do serviço persistente de reconhecimento de voz (speech_service.py)
+// Envia um comando JSON por linha e recebe eventos NDJSON; os pedidos são
+// atendidos em ordem pelo serviço, um de cada vez. Um pedido que expira é
+// cancelado no serviço, para não prender o microfone nem a fila
+class SpeechService {
+  constructor(options = {}) {
+    this.pythonPath = options.pythonPath || process.env.PYTHON_PATH || 'python';
+    this.script = options.script || path.join(__dirname, '..', 'speech_service.py');
+    this.args = options.args || [];
+    this.timeout = options.timeout || 60000;
+    this.process = null;
+    this.nextId = 1;
+    this.pending = new Map();
+    this.listeners = new Set();
+  }
+
+  start() {
+    if (this.process) return this.process;
+
+    const child = spawn(this.pythonPath, [this.script, ...this.args], {
+      cwd: path.join(__dirname, '..'),
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+    });
+
+    readline.createInterface({ input: child.stdout }).on('line', (line) => {
+      let event;
+      try {
+        event = JSON.parse(line);
+      } catch (error) {
+        console.error('Serviço de voz: evento inválido:', line);
+        return;
+      }
+
+      for (const listener of this.listeners) listener(event);
+
+      const request = this.pending.get(event.id);
+      if (!request) return;
+      if (request.onEvent) request.onEvent(event);
+
+      if (event.event === 'transcript') {
+        this.pending.delete(event.id);
+        clearTimeout(request.timer);
+        request.resolve(event);
+      }
+    });
+
+    child.stderr.on('data', (data) => {
+      console.log('Serviço de voz stderr:', data.toString());
+    });
+
+    const fail = (reason) => {
+      if (this.process !== child) return;
+      this.process = null;
+      for (const request of this.pending.values()) {
+        clearTimeout(request.timer);
+        request.reject(new Error(reason));
+      }
+      this.pending.clear();
+    };
+
+    child.on('exit', (code) => fail(`Serviço de voz finalizado (código ${code})`));
+    child.on('error', (error) => fail(error.message));
+
+    this.process = child;
+    return child;
+  }
+
+  // Escuta uma frase; onEvent recebe listening/phrase-detected/transcript
+  listen({ duration = 5, wav = null, timeout = null, onEvent = null } = {}) {
+    const child = this.start();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        if (this.process === child) {
+          child.stdin.write(JSON.stringify({ cmd: 'cancel', id }) + '\n');
+        }
+        reject(new Error('Tempo esgotado aguardando o reconhecimento de voz'));
+      }, this.timeout + duration * 1000);
+
+      this.pending.set(id, { resolve, reject, timer, onEvent });
+      child.stdin.write(JSON.stringify({ cmd: 'listen', id, duration, wav, timeout }) + '\n');
+    });
+  }
+
+  // Eventos sem pedido associado (ready, calibrated, error)
+  onEvent(listener) {
+    this.listeners.add(listener);
+    return () => this.listeners.delete(listener);
+  }
+
+  stop() {
+    if (!this.process) return;
+    const child = this.process;
+    this.process = null;
+    child.stdin.write(JSON.stringify({ cmd: 'shutdown' }) + '\n');
+    child.stdin.end();
+  }
+}
+
+let speechService = null;
+
+// Instância compartilhada, iniciada no primeiro uso
+const getSpeechService = () => {
+  if (!speechService) {
+    speechService = new SpeechService();
+    process.on('exit', () => speechService && speechService.stop());
+  }
+  return speechService;
+};
+
+module.exports = { SpeechService, getSpeechService };
@@ -0,0 +1,133 @@
+const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
+
+// Cliente do serviço persistente de síntese de voz (tts_service.py)
+// Envia um comando JSON por linha e recebe eventos NDJSON; as falas são
+// atendidas em fila pelo serviço e podem ser puladas ou interrompidas
+class TtsService {
+  constructor(options = {}) {
+    this.pythonPath = options.pythonPath || process.env.PYTHON_PATH || 'python';
+    this.script = options.script || path.join(__dirname, '..', 'tts_service.py');
+    this.args = options.args || [];
+    this.timeout = options.timeout || 120000;
+    this.process = null;
+    this.nextId = 1;
+    this.pending = new Map();
+    this.listeners = new Set();
+  }
+
+  start() {
+    if (this.process) return this.process;
+
+    const child = spawn(this.pythonPath, [this.script, ...this.args], {
+      cwd: path.join(__dirname, '..'),
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+    });
+
+    readline.createInterface({ input: child.stdout }).on('line', (line) => {
+      let event;
+      try {
+        event = JSON.parse(line);
+      } catch (error) {
+        console.error('Serviço de síntese de voz: evento inválido:', line);
+        return;
+      }
+
+      for (const listener of this.listeners) listener(event);
+
+      const request = this.pending.get(event.id);
+      if (!request) return;
+      if (request.onEvent) request.onEvent(event);
+
+      if (request.until.includes(event.event)) {
+        this.pending.delete(event.id);
+        clearTimeout(request.timer);
+        request.resolve(event);
+      }
+    });
+
+    child.stderr.on('data', (data) => {
+      console.log('Serviço de síntese de voz stderr:', data.toString());
+    });
+
+    const fail = (reason) => {
+      if (this.process !== child) return;
+      this.process = null;
+      for (const request of this.pending.values()) {
+        clearTimeout(request.timer);
+        request.reject(new Error(reason));
+      }
+      this.pending.clear();
+    };
+
+    child.on('exit', (code) => fail(`Serviço de síntese de voz finalizado (código ${code})`));
+    child.on('error', (error) => fail(error.message));
+
+    this.process = child;
+    return child;
+  }
+
+  // Envia um comando e resolve no primeiro evento do mesmo id listado em until
+  request(command, until, onEvent = null) {
+    const child = this.start();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error('Tempo esgotado aguardando a síntese de voz'));
+      }, this.timeout);
+
+      this.pending.set(id, { resolve, reject, timer, onEvent, until: [...until, 'error'] });
+      child.stdin.write(JSON.stringify({ ...command, id }) + '\n');
+    });
+  }
+
+  // Fala um texto; com wait=false resolve assim que entra na fila
+  speak({ text, rate, volume, wait = true, onEvent = null } = {}) {
+    return this.request({ cmd: 'speak', text, rate, volume }, wait ? ['done'] : ['queued'], onEvent);
+  }
+
+  // Interrompe a fala atual e segue para a próxima da fila
+  skip() {
+    return this.request({ cmd: 'skip' }, ['skipped']);
+  }
+
+  // Interrompe a fala atual e esvazia a fila
+  interrupt() {
+    return this.request({ cmd: 'interrupt' }, ['interrupted']);
+  }
+
+  status() {
+    return this.request({ cmd: 'status' }, ['status']);
+  }
+
+  // Eventos sem pedido associado (ready, error)
+  onEvent(listener) {
+    this.listeners.add(listener);
+    return () => this.listeners.delete(listener);
+  }
+
+  stop() {
+    if (!this.process) return;
+    const child = this.process;
+    this.process = null;
+    child.stdin.write(JSON.stringify({ cmd: 'shutdown' }) + '\n');
+    child.stdin.end();
+  }
+}
+
+let ttsService = null;
+
+// Instância compartilhada, iniciada no primeiro uso
+const getTtsService = () => {
+  if (!ttsService) {
+    ttsService = new TtsService();
+    process.on('exit', () => ttsService && ttsService.stop());
+  }
+  return ttsService;
+};
+
+module.exports = { TtsService, getTtsService };
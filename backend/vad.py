@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecção de atividade de voz (VAD) para encerrar a escuta assim que a fala termina.
+
+O áudio é dividido em quadros de FRAME_MS; para cada bloco recebido, energia
+(RMS) e taxa de cruzamentos por zero de todos os quadros são calculadas de
+uma vez com NumPy. Um quadro é fala quando a energia passa de energy_ratio
+vezes o ruído de fundo e a taxa de cruzamentos não é de ruído branco. A fala
+começa após min_speech_ms de quadros de fala e termina após hangover_ms sem
+fala (ou ao atingir max_length_s); a frase vai para o reconhecedor recortada,
+com pre_roll_ms antes do início.
+"""
+
+import os
+import time
+
+import numpy as np
+
+FRAME_MS = 30
+HANGOVER_MS = int(os.environ.get('VOICE_VAD_HANGOVER_MS', '300'))
+MIN_SPEECH_MS = 90
+PRE_ROLL_MS = 150
+
+# Energia mínima absoluta (amostras de 16 bits) para não disparar em silêncio digital
+MIN_ENERGY = 100.0
+
+# Taxa de cruzamentos por zero acima disso é tratada como ruído
+MAX_ZERO_CROSSING_RATE = 0.45
+
+
+def frame_features(samples, frame_length):
+    """
+    Energia RMS e taxa de cruzamentos por zero de cada quadro completo
+    """
+    count = len(samples) // frame_length
+    if count == 0:
+        return np.empty(0), np.empty(0)
+    frames = samples[:count * frame_length].reshape(count, frame_length).astype(np.float32)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zero_crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
+    return energy, zero_crossings
+
+
+class VoiceActivityDetector:
+    """
+    Endpointing incremental sobre áudio PCM mono de 16 bits
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=FRAME_MS, hangover_ms=HANGOVER_MS,
+                 min_speech_ms=MIN_SPEECH_MS, pre_roll_ms=PRE_ROLL_MS, max_length_s=10.0,
+                 energy_ratio=3.0, noise_floor=None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.hangover_frames = max(1, int(round(hangover_ms / frame_ms)))
+        self.min_speech_frames = max(1, int(round(min_speech_ms / frame_ms)))
+        self.pre_roll_frames = int(round(pre_roll_ms / frame_ms))
+        self.max_frames = int(max_length_s * 1000 / frame_ms) if max_length_s else None
+        self.energy_ratio = energy_ratio
+        self.noise_floor = noise_floor
+        self.reset()
+
+    def reset(self):
+        """
+        Prepara para uma nova frase (mantém o ruído de fundo)
+        """
+        # Blocos de áudio guardados (unidos só em utterance) e o índice do
+        # primeiro quadro guardado
+        self.chunks = []
+        self.base_frame = 0
+        self.pending = np.empty(0, dtype=np.int16)
+        self.frame_index = 0
+        self.speech_run = 0
+        self.silence_run = 0
+        self.start_frame = None
+        self.last_speech_frame = None
+        self.end_frame = None
+        self.forced = False
+
+    @property
+    def frame_length(self):
+        return int(self.sample_rate * self.frame_ms / 1000)
+
+    @property
+    def started(self):
+        return self.start_frame is not None
+
+    @property
+    def finished(self):
+        return self.end_frame is not None
+
+    def calibrate(self, samples):
+        """
+        Define o ruído de fundo a partir de um trecho sem fala
+        """
+        energy, _ = frame_features(np.asarray(samples, dtype=np.int16), self.frame_length)
+        if len(energy):
+            self.noise_floor = float(np.median(energy))
+        return self.noise_floor
+
+    def threshold(self):
+        return max(MIN_ENERGY, (self.noise_floor or 0.0) * self.energy_ratio)
+
+    def feed(self, chunk):
+        """
+        Processa um bloco de áudio (bytes ou array int16); retorna True
+        quando o fim da fala foi detectado
+        """
+        if self.finished:
+            return True
+        samples = np.frombuffer(chunk, dtype='<i2') if isinstance(chunk, (bytes, bytearray)) else chunk
+        data = np.concatenate((self.pending, samples))
+        usable = len(data) - len(data) % self.frame_length
+        self.pending = data[usable:]
+        if not usable:
+            return False
+        self.chunks.append(data[:usable])
+
+        energy, zero_crossings = frame_features(data[:usable], self.frame_length)
+        speech = (energy > self.threshold()) & (zero_crossings < MAX_ZERO_CROSSING_RATE)
+
+        for is_speech, frame_energy in zip(speech.tolist(), energy.tolist()):
+            index = self.frame_index
+            self.frame_index += 1
+            if not self.started:
+                if is_speech:
+                    self.speech_run += 1
+                    if self.speech_run >= self.min_speech_frames:
+                        self.start_frame = index - self.speech_run + 1
+                        self.last_speech_frame = index
+                else:
+                    self.speech_run = 0
+                    # Ruído de fundo acompanha o ambiente enquanto ninguém fala
+                    if self.noise_floor is None:
+                        self.noise_floor = frame_energy
+                    else:
+                        self.noise_floor = 0.95 * self.noise_floor + 0.05 * frame_energy
+                continue
+
+            if is_speech:
+                self.last_speech_frame = index
+                self.silence_run = 0
+            else:
+                self.silence_run += 1
+            if self.silence_run >= self.hangover_frames:
+                self.end_frame = index
+                return True
+            if self.max_frames and index - self.start_frame + 1 >= self.max_frames:
+                self.end_frame = index
+                self.forced = True
+                return True
+
+        if not self.started:
+            self._trim()
+        return False
+
+    def _trim(self):
+        """
+        Antes da fala só o pre-roll e a sequência de quadros de fala em curso
+        ficam guardados (memória constante com o microfone ocioso)
+        """
+        keep = (self.pre_roll_frames + self.speech_run) * self.frame_length
+        held = sum(len(chunk) for chunk in self.chunks)
+        if held <= keep:
+            return
+        data = np.concatenate(self.chunks)[held - keep:] if keep else np.empty(0, dtype=np.int16)
+        self.chunks = [data] if keep else []
+        self.base_frame = self.frame_index - keep // self.frame_length
+
+    def utterance(self):
+        """
+        Áudio da frase recortado (pre-roll até o último quadro de fala), em bytes
+        """
+        if not self.started:
+            return b''
+        buffer = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=np.int16)
+        start = max(0, self.start_frame - self.pre_roll_frames - self.base_frame) * self.frame_length
+        end = (self.last_speech_frame + 1 - self.base_frame) * self.frame_length
+        return buffer[start:end].astype('<i2').tobytes()
+
+    def trailing_ms(self):
+        """
+        Áudio lido depois do último quadro de fala até a detecção do fim (hangover)
+        """
+        if self.last_speech_frame is None or self.end_frame is None:
+            return 0.0
+        return (self.end_frame - self.last_speech_frame) * self.frame_ms
+
+
+class ListenCancelled(Exception):
+    """
+    Escuta interrompida por cancel (o pedido foi abandonado)
+    """
+
+
+def calibrate(source, detector, duration):
+    """
+    Lê `duration` segundos da fonte e usa como ruído de fundo do detector
+    """
+    chunks = max(1, int(np.ceil(duration * source.SAMPLE_RATE / source.CHUNK)))
+    data = b''.join(source.stream.read(source.CHUNK) for _ in range(chunks))
+    detector.sample_rate = source.SAMPLE_RATE
+    return detector.calibrate(np.frombuffer(data[:len(data) - len(data) % 2], dtype='<i2'))
+
+
+def listen(source, detector, timeout=None, chunk_frames=None, cancel=None):
+    """
+    Lê blocos de uma fonte do SpeechRecognition (Microphone ou AudioFile de
+    16 bits) até o VAD detectar o fim da fala. Retorna (AudioData, info) com
+    info = {speech_ms, hangover_ms, detected_at (time.perf_counter), forced}.
+    Lança WaitTimeoutError se não houver fala em `timeout` segundos de áudio
+    e ListenCancelled quando o threading.Event cancel é sinalizado.
+    """
+    import speech_recognition as sr
+
+    if source.SAMPLE_WIDTH != 2:
+        raise ValueError("VAD suporta apenas áudio de 16 bits")
+    chunk_frames = chunk_frames or source.CHUNK
+    detector.sample_rate = source.SAMPLE_RATE
+    detector.reset()
+
+    read_seconds = 0.0
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise ListenCancelled("Escuta cancelada")
+        chunk = source.stream.read(chunk_frames)
+        if not chunk:
+            # Fim do arquivo: a fala termina onde o áudio acaba
+            if detector.started and detector.end_frame is None:
+                detector.end_frame = detector.frame_index
+            break
+        read_seconds += len(chunk) / (2 * source.SAMPLE_RATE)
+        if detector.feed(chunk):
+            break
+        if timeout and not detector.started and read_seconds > timeout:
+            raise sr.WaitTimeoutError("Nenhuma fala detectada")
+
+    detected_at = time.perf_counter()
+    if not detector.started:
+        raise sr.WaitTimeoutError("Nenhuma fala detectada")
+
+    data = detector.utterance()
+    return sr.AudioData(data, source.SAMPLE_RATE, 2), {
+        "speech_ms": round(len(data) / (2 * source.SAMPLE_RATE) * 1000, 1),
+        "hangover_ms": detector.trailing_ms(),
+        "detected_at": detected_at,
+        "forced": detector.forced,
+    }
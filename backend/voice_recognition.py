@@ -1,34 +1,125 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import speech_recognition as sr
 import sys
+import os
 import json
-import time
 import io
+import time
+
+# Duração da calibração de ruído ambiente em segundos
+CALIBRATION_DURATION = 1.0
+
+# Fim da frase: "vad" (vad.py, encerra assim que o falante para) ou "energy"
+# (limiar de energia do SpeechRecognition com phrase_time_limit)
+ENDPOINTING = os.environ.get('VOICE_ENDPOINTING', 'vad')
+
+# Recorte, 16 kHz mono e FLAC em segundo plano antes do envio (audio_preprocessing.py)
+PREPROCESS = os.environ.get('VOICE_PREPROCESS', 'true').lower() != 'false'
+
+def prepare_audio(audio, timings=None):
+    """
+    Prepara o áudio capturado para o envio. Retorna (áudio, info do payload
+    ou None se o preparo não estiver disponível); preprocess_ms vai para timings.
+    """
+    try:
+        import audio_preprocessing
+    except ImportError:
+        return audio, None
+    prepared, payload = audio_preprocessing.prepare(audio)
+    if timings is not None:
+        timings["preprocess_ms"] = payload.pop("preprocess_ms")
+    return prepared, payload
+
+def payload_report(audio, payload):
+    """
+    Tamanhos antes/depois e tempo de codificação do áudio preparado
+    """
+    import audio_preprocessing
+    return audio_preprocessing.finish(audio, payload)
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 2)
 
-def recognize_speech(duration=5):
+def recognize_speech(duration=5, wav=None, engine=None, calibration=CALIBRATION_DURATION,
+                     endpointing=None, hangover_ms=None, preprocess=None):
     """
-    Reconhece fala usando Python SpeechRecognition
+    Reconhece fala usando Python SpeechRecognition.
+
+    wav: caminho ou arquivo WAV usado no lugar do microfone (o início do
+    arquivo é consumido pela calibração, se houver).
+    engine: reconhecedor de recognizers.py (padrão: VOICE_RECOGNIZER).
+    endpointing: "vad" ou "energy" (padrão: VOICE_ENDPOINTING). Com VAD,
+    duration é o tamanho máximo da frase e hangover_ms o silêncio que a encerra.
+    preprocess: prepara o áudio antes do envio (padrão: VOICE_PREPROCESS); o
+    resultado traz "payload" com bytes_before, bytes_after e encode_ms.
+    O resultado traz "timings" com o tempo de cada etapa: calibration_ms,
+    capture_ms (escuta até o fim da frase), encoding_ms e recognition_ms; com
+    VAD também end_of_speech_ms (do fim da fala até o resultado).
     """
+    timings = {}
+    detector = None
+    if preprocess is None:
+        preprocess = PREPROCESS
     try:
+        import speech_recognition as sr
+        import recognizers
+
+        engine = engine or recognizers.get_recognizer()
+
+        if (endpointing or ENDPOINTING) == 'vad':
+            try:
+                import vad
+                options = {"max_length_s": duration}
+                if hangover_ms is not None:
+                    options["hangover_ms"] = hangover_ms
+                detector = vad.VoiceActivityDetector(**options)
+            except ImportError:
+                detector = None
+
         # Inicializar o reconhecedor
         r = sr.Recognizer()
-        
-        # Usar microfone padrão
-        with sr.Microphone() as source:
-            print("Ajustando para ruído ambiente...", file=sys.stderr)
-            r.adjust_for_ambient_noise(source, duration=1)
-            
+
+        # Usar microfone padrão ou o arquivo informado
+        source = sr.AudioFile(wav) if wav is not None else sr.Microphone()
+        endpoint = None
+        with source:
+            if source.SAMPLE_WIDTH != 2:
+                detector = None
+            start = time.perf_counter()
+            if calibration:
+                print("Ajustando para ruído ambiente...", file=sys.stderr)
+                if detector is not None:
+                    vad.calibrate(source, detector, calibration)
+                else:
+                    r.adjust_for_ambient_noise(source, duration=calibration)
+            timings["calibration_ms"] = elapsed_ms(start)
+
             print("Ouvindo...", file=sys.stderr)
-            # Escutar por X segundos - sem timeout para ser mais tolerante
-            audio = r.listen(source, timeout=None, phrase_time_limit=duration)
-            
+            start = time.perf_counter()
+            if detector is not None:
+                # Sem timeout para ser mais tolerante; termina quando o falante para
+                try:
+                    audio, endpoint = vad.listen(source, detector)
+                except sr.WaitTimeoutError:
+                    timings["capture_ms"] = elapsed_ms(start)
+                    return {"success": True, "text": "", "duration": duration,
+                            "error": "Nenhuma fala detectada", "timings": timings}
+            else:
+                # Escutar por X segundos - sem timeout para ser mais tolerante
+                audio = r.listen(source, timeout=None, phrase_time_limit=duration)
+            timings["capture_ms"] = elapsed_ms(start)
+
         print("Processando áudio...", file=sys.stderr)
-        
-        # Tentar reconhecer usando Google (gratuito)
+
+        captured = audio
+        payload = None
+        if preprocess:
+            audio, payload = prepare_audio(audio, timings)
+
+        # Tentar reconhecer (Google por padrão, gratuito)
         try:
-            text = r.recognize_google(audio, language='pt-BR')
+            text = recognizers.transcribe(r, engine, audio, timings)
             result = {
                 "success": True,
                 "text": text,
@@ -47,28 +138,79 @@ def recognize_speech(duration=5):
                 "error": f"Erro no serviço de reconhecimento: {e}",
                 "duration": duration
             }
-            
+
+        result["audio_s"] = round(len(captured.frame_data) / (captured.sample_rate * captured.sample_width), 2)
+        if payload is not None:
+            result["payload"] = payload_report(audio, payload)
+        result["endpointing"] = "vad" if endpoint else "energy"
+        if endpoint:
+            # Silêncio ouvido até detectar o fim (hangover) + processamento depois disso
+            timings["end_of_speech_ms"] = round(endpoint["hangover_ms"] + elapsed_ms(endpoint["detected_at"]), 2)
+            result["max_length_reached"] = endpoint["forced"]
+
     except Exception as e:
         result = {
             "success": False,
             "error": f"Erro geral: {str(e)}",
             "duration": duration
         }
-    
-    # Configurar stdout para UTF-8
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    
-    # Retornar resultado como JSON com codificação UTF-8
-    print(json.dumps(result, ensure_ascii=False))
+
+    result["timings"] = timings
     return result
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
     # Obter duração dos argumentos da linha de comando
+    # Uso: voice_recognition.py [duração] [--wav arquivo.wav] [--recognizer nome]
+    #      [--endpointing vad|energy] [--hangover ms] [--no-preprocess]
     duration = 5
-    if len(sys.argv) > 1:
+    wav = None
+    engine = None
+    endpointing = None
+    hangover_ms = None
+    preprocess = None
+    positional = []
+    position = 0
+    while position < len(argv):
+        arg = argv[position]
+        if arg in ('--wav', '--recognizer', '--endpointing', '--hangover') and position + 1 < len(argv):
+            if arg == '--wav':
+                wav = argv[position + 1]
+            elif arg == '--endpointing':
+                endpointing = argv[position + 1]
+            elif arg == '--hangover':
+                hangover_ms = int(argv[position + 1])
+            else:
+                import recognizers
+                engine = recognizers.get_recognizer(argv[position + 1])
+            position += 2
+            continue
+        if arg == '--no-preprocess':
+            preprocess = False
+        else:
+            positional.append(arg)
+        position += 1
+
+    if positional:
         try:
-            duration = int(sys.argv[1])
+            duration = int(positional[0])
         except ValueError:
             duration = 5
-    
-    recognize_speech(duration)
+
+    result = recognize_speech(duration, wav, engine, endpointing=endpointing, hangover_ms=hangover_ms,
+                              preprocess=preprocess)
+
+    # Configurar stdout para UTF-8 (apenas quando for o stdout real do processo)
+    if hasattr(sys.stdout, 'buffer'):
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    # Retornar resultado como JSON com codificação UTF-8
+    print(json.dumps(result, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()